@@ -6,22 +6,28 @@ set -e
 
 echo "--- Starting Monthly Update Cycle: $(date) ---"
 
-# 1. Discovery: Neue Dokumente von Easy-Online crawlen
-echo "Step 1/3: Crawling Easy-Online..."
-docker exec app-backend-1 python src/discovery/easy_crawler.py
+# Crawl -> Parse -> Graph -> Embedding -> Vector Store & BM25 laufen als
+# Streaming-Pipeline: neue Dokumente werden bereits verarbeitet, während der
+# Crawler noch läuft. Abgeschlossene Dokumente werden in
+# data/pipeline_state.json festgehalten, ein Abbruch kann fortgesetzt werden.
+echo "Running streaming pipeline (crawl + parse + index)..."
+docker exec app-backend-1 python -m src.streaming_pipeline --crawl
 
-# 2. Parsing & Graph: Neue Dokumente verarbeiten (Graph Update)
-# Hinweis: Docling_engine wird hier vorausgesetzt für die Extraktion
-echo "Step 2/3: Parsing new documents..."
-docker exec app-backend-1 python src/parser/docling_engine.py
-
-# 3. Indexing: Vector Store & BM25 aktualisieren
-echo "Step 3/3: Updating Vector Index & BM25..."
-docker exec app-backend-1 python src/parser/vector_store.py
-docker exec app-backend-1 python src/parser/bm25_index.py
-
-# Backend neustarten, um neue Indizes (BM25) zu laden
-echo "Restarting backend to apply changes..."
-docker compose restart backend
+# Neue Indizes (Graph, BM25) im laufenden Backend aktivieren (Hot Reload).
+# Anfragen werden währenddessen weiter bedient; Neustart nur als Fallback.
+# Die übrigen Worker-Prozesse folgen über data/.reload_marker (wenige Sekunden).
+echo "Reloading indexes in running backend..."
+docker exec app-backend-1 python -c "
+import os, urllib.request
+req = urllib.request.Request(
+    'http://localhost:5001/admin/reload',
+    method='POST',
+    headers={'X-Admin-Token': os.environ['ADMIN_TOKEN']},
+)
+print(urllib.request.urlopen(req, timeout=900).read().decode())
+" || {
+    echo "Hot reload failed, restarting backend instead..."
+    docker compose restart backend
+}
 
 echo "--- Update Cycle Completed Successfully: $(date) ---"
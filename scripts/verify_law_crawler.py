@@ -0,0 +1,236 @@
+"""
+Verifies the LawCrawler against a local fixture HTTP server.
+
+Checks that:
+- XML laws and HTML-fallback laws are crawled via crawl_laws()
+- HTML sections keep TOC order
+- in-flight requests per host never exceed the configured limit
+- mirrored archives are revalidated with conditional GETs (304)
+- archive downloads hold the per-host slot until the body is fully read
+"""
+
+import io
+import re
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Setup path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.discovery.law_crawler import LawCrawler
+
+NUM_SECTIONS = 12
+PER_HOST_LIMIT = 3
+SLOW_BODY_DELAY = 0.2
+LAW_ETAG = '"bho-v1"'
+
+LAW_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<dokumente>
+  <norm><metadaten><enbez>§ 1</enbez><titel>Geltungsbereich</titel></metadaten>
+    <textdaten><text><Content><P>Dieses Gesetz gilt für den Bund.</P></Content></text></textdaten></norm>
+  <norm><metadaten><enbez>§ 44</enbez><titel>Zuwendungen</titel></metadaten>
+    <textdaten><text><Content><P>Zuwendungen dürfen nur unter Voraussetzungen gewährt werden.</P></Content></text></textdaten></norm>
+</dokumente>
+"""
+
+
+def _zip_bytes(xml: str) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as z:
+        z.writestr("BJNR000010000.xml", xml)
+    return buf.getvalue()
+
+
+class FixtureState:
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    requests = 0
+    not_modified = 0
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        with FixtureState.lock:
+            FixtureState.in_flight += 1
+            FixtureState.requests += 1
+            FixtureState.max_in_flight = max(
+                FixtureState.max_in_flight, FixtureState.in_flight
+            )
+        try:
+            time.sleep(0.05)  # Simulated server latency
+            self._route()
+        finally:
+            with FixtureState.lock:
+                FixtureState.in_flight -= 1
+
+    def _send(self, status: int, body: bytes, content_type: str = "text/html"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self):
+        if self.path == "/bho/xml.zip":
+            if self.headers.get("If-None-Match") == LAW_ETAG:
+                with FixtureState.lock:
+                    FixtureState.not_modified += 1
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = _zip_bytes(LAW_XML)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/zip")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", LAW_ETAG)
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if re.fullmatch(r"/slow\d+/xml\.zip", self.path):
+            # Headers arrive at once, the body trickles in afterwards
+            body = _zip_bytes(LAW_XML)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/zip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body[: len(body) // 2])
+            self.wfile.flush()
+            time.sleep(SLOW_BODY_DELAY)
+            self.wfile.write(body[len(body) // 2 :])
+            return
+        if self.path == "/vob_a/index.html":
+            links = "".join(
+                f'<a href="__{i}.html">§ {i}</a>' for i in range(1, NUM_SECTIONS + 1)
+            )
+            return self._send(200, f"<html><body>{links}</body></html>".encode())
+        if self.path.startswith("/vob_a/__"):
+            nr = self.path.split("__")[1].split(".")[0]
+            html = (
+                f'<div class="jnheader"><h1>§ {nr} Abschnitt {nr}</h1></div>'
+                f'<div class="jurAbsatz">Inhalt von Paragraph {nr}.</div>'
+            )
+            return self._send(200, html.encode())
+        self._send(404, b"not found")
+
+
+def _start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _crawler(base: str, mirror_dir: Path, mirror_max_age: float) -> LawCrawler:
+    return LawCrawler(
+        base_url=base + "/{abbr}/xml.zip",
+        html_base_url=base,
+        max_workers=8,
+        per_host_concurrency=PER_HOST_LIMIT,
+        per_host_delay=0.01,
+        mirror_dir=mirror_dir,
+        mirror_max_age=mirror_max_age,
+    )
+
+
+def test_concurrent_crawl():
+    print("=== Testing concurrent LawCrawler against fixture server ===")
+    server, base = _start_server()
+
+    try:
+        crawler = _crawler(base, Path(tempfile.mkdtemp()), mirror_max_age=0)
+
+        start = time.time()
+        results = crawler.crawl_laws(["BHO", "VOB_A", "MISSING"])
+        elapsed = time.time() - start
+
+        print(f"Crawled {list(results.keys())} in {elapsed:.2f}s")
+        print(f"Requests: {FixtureState.requests}, max in-flight: {FixtureState.max_in_flight}")
+
+        assert len(results["BHO"]) == 2
+        assert results["BHO"][1]["paragraph"] == "§ 44"
+
+        vob = results["VOB_A"]
+        assert len(vob) == NUM_SECTIONS
+        assert [n["paragraph"] for n in vob] == [
+            f"§ {i}" for i in range(1, NUM_SECTIONS + 1)
+        ]
+        assert "MISSING" not in results
+
+        assert FixtureState.max_in_flight <= PER_HOST_LIMIT
+        assert FixtureState.max_in_flight > 1, "Expected concurrent section fetches"
+        print("✅ Concurrent crawl respects per-host limits.")
+    finally:
+        server.shutdown()
+
+
+def test_conditional_mirror():
+    print("\n=== Testing law mirror with conditional GET ===")
+    server, base = _start_server()
+    mirror_dir = Path(tempfile.mkdtemp())
+
+    try:
+        # 1. Cold mirror: full download
+        first = _crawler(base, mirror_dir, mirror_max_age=0).crawl_law_hybrid("bho")
+        assert len(first) == 2
+        assert (mirror_dir / "bho" / "xml.zip").exists()
+
+        # 2. Expired mirror: conditional GET answered with 304, norms reused
+        before = FixtureState.not_modified
+        second = _crawler(base, mirror_dir, mirror_max_age=0).crawl_law_hybrid("bho")
+        assert second == first
+        assert FixtureState.not_modified == before + 1
+
+        # 3. Fresh mirror: no request at all
+        requests_before = FixtureState.requests
+        third = _crawler(base, mirror_dir, mirror_max_age=3600).crawl_law_hybrid("bho")
+        assert third == first
+        assert FixtureState.requests == requests_before
+
+        print("✅ Mirror revalidates with 304 and skips requests while fresh.")
+    finally:
+        server.shutdown()
+
+
+def test_slow_archive_body():
+    print("\n=== Testing per-host limit during slow archive downloads ===")
+    server, base = _start_server()
+
+    try:
+        crawler = LawCrawler(
+            base_url=base + "/{abbr}/xml.zip",
+            html_base_url=base,
+            max_workers=4,
+            per_host_concurrency=1,
+            per_host_delay=0,
+            mirror_dir=Path(tempfile.mkdtemp()),
+            mirror_max_age=0,
+        )
+        with FixtureState.lock:
+            FixtureState.max_in_flight = 0
+
+        laws = ["SLOW1", "SLOW2", "SLOW3", "SLOW4"]
+        start = time.time()
+        results = crawler.crawl_laws(laws)
+        elapsed = time.time() - start
+
+        print(f"Crawled {len(results)} archives in {elapsed:.2f}s, max in-flight: {FixtureState.max_in_flight}")
+        assert sorted(results) == laws
+        assert FixtureState.max_in_flight == 1, "Archive bodies were read outside the slot"
+        assert elapsed >= len(laws) * SLOW_BODY_DELAY
+        print("✅ Archive downloads keep the per-host slot until the body is read.")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_concurrent_crawl()
+    test_conditional_mirror()
+    test_slow_archive_body()
@@ -0,0 +1,254 @@
+"""
+Verifies the pooled LLM provider layer against a local OpenAI-compatible stub.
+
+Checks that:
+- sync chat()/generate_json() reuse keep-alive connections
+- async achat()/agenerate_json() work concurrently and reuse connections
+- the EmbeddingEngine shares the pooled session
+- stream_chat()/astream_chat() of both providers decode UTF-8 SSE deltas and
+  feed SuggestionSplitter correctly
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Setup path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.api.streaming import SuggestionSplitter
+from src.llm.anthropic_provider import AnthropicProvider
+from src.llm.base_provider import AsyncBaseLLMProvider, Message
+from src.llm.openai_provider import OpenAIProvider
+from src.parser.embedding_engine import EmbeddingEngine
+
+NUM_REQUESTS = 20
+
+# Marker split across deltas, umlauts in answer and suggestions
+STREAM_DELTAS = [
+    "Zuwendungen für ",
+    "Rückforderungen regelt § 44 BHO.",
+    "\n---SUGG",
+    "ESTIONS---\n- Was gilt für Förderbescheide?\n",
+    "- Wie läuft die Prüfung?",
+]
+STREAM_ANSWER = "Zuwendungen für Rückforderungen regelt § 44 BHO."
+STREAM_SUGGESTIONS = ["Was gilt für Förderbescheide?", "Wie läuft die Prüfung?"]
+
+
+class StubState:
+    lock = threading.Lock()
+    requests = 0
+    connections = set()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Keep-alive requires HTTP/1.1
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        with StubState.lock:
+            StubState.requests += 1
+            StubState.connections.add(self.client_address)
+        time.sleep(0.02)  # Simulated model latency
+
+        if payload.get("stream"):
+            return self._send_stream()
+
+        if self.path.endswith("/embeddings"):
+            body = {
+                "data": [
+                    {"index": i, "embedding": [float(i), 0.5]}
+                    for i in range(len(payload["input"]))
+                ]
+            }
+        else:
+            if payload.get("response_format", {}).get("type") == "json_object":
+                content = json.dumps({"sub_queries": ["a", "b"]})
+            else:
+                content = f"Echo: {payload['messages'][-1]['content']}"
+            body = {
+                "model": payload.get("model"),
+                "choices": [
+                    {"message": {"content": content}, "finish_reason": "stop"}
+                ],
+                "usage": {"total_tokens": 7},
+            }
+
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self):
+        if self.path.endswith("/messages"):
+            events = [
+                'event: message_start\ndata: {"type": "message_start"}'
+            ] + [
+                "event: content_block_delta\ndata: "
+                + json.dumps(
+                    {"type": "content_block_delta", "delta": {"type": "text_delta", "text": d}},
+                    ensure_ascii=False,
+                )
+                for d in STREAM_DELTAS
+            ] + ['event: message_stop\ndata: {"type": "message_stop"}']
+        else:
+            events = [
+                "data: "
+                + json.dumps({"choices": [{"delta": {"content": d}}]}, ensure_ascii=False)
+                for d in STREAM_DELTAS
+            ] + ["data: [DONE]"]
+        data = "".join(e + "\n\n" for e in events).encode("utf-8")
+
+        self.send_response(200)
+        # Real servers often omit the charset on event streams
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        # Small writes so multi-byte characters straddle network reads
+        for i in range(0, len(data), 7):
+            self.wfile.write(data[i : i + 7])
+            self.wfile.flush()
+
+
+class StubServer(ThreadingHTTPServer):
+    # Default backlog (5) would delay concurrent connects by SYN retries
+    request_queue_size = 64
+    daemon_threads = True
+
+
+def _start_server():
+    server = StubServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def _reset():
+    with StubState.lock:
+        StubState.requests = 0
+        StubState.connections = set()
+
+
+def test_sync_pooling(base: str):
+    print("\n=== Testing sync provider pooling ===")
+    _reset()
+    provider = OpenAIProvider(api_key="test", model="stub-model", api_url=base)
+
+    for i in range(NUM_REQUESTS):
+        response = provider.chat([Message(role="user", content=f"Frage {i}")])
+        assert response.content == f"Echo: Frage {i}"
+    assert provider.generate_json("Zerlege die Frage")["sub_queries"] == ["a", "b"]
+
+    print(f"Requests: {StubState.requests}, connections: {len(StubState.connections)}")
+    assert StubState.requests == NUM_REQUESTS + 1
+    assert len(StubState.connections) == 1, "Expected one keep-alive connection"
+    print("✅ Sequential sync calls share one connection.")
+
+
+def test_async_pooling(base: str):
+    print("\n=== Testing async provider pooling ===")
+    _reset()
+    provider = OpenAIProvider(api_key="test", model="stub-model", api_url=base)
+    assert isinstance(provider, AsyncBaseLLMProvider)
+
+    async def run():
+        # Serial baseline; also warms up the client
+        start = time.time()
+        for i in range(NUM_REQUESTS):
+            await provider.agenerate(f"Frage {i}")
+        serial = time.time() - start
+
+        start = time.time()
+        first = await asyncio.gather(
+            *(provider.agenerate(f"Frage {i}") for i in range(NUM_REQUESTS))
+        )
+        elapsed = time.time() - start
+        # Second wave must reuse the connections opened by the first
+        second = await asyncio.gather(
+            *(provider.achat([Message(role="user", content=f"Frage {i}")]) for i in range(NUM_REQUESTS))
+        )
+        parsed = await provider.agenerate_json("Zerlege die Frage")
+        return first, second, parsed, serial, elapsed
+
+    first, second, parsed, serial, elapsed = asyncio.run(run())
+    assert [r.content for r in first] == [f"Echo: Frage {i}" for i in range(NUM_REQUESTS)]
+    assert [r.content for r in second] == [r.content for r in first]
+    assert parsed["sub_queries"] == ["a", "b"]
+
+    print(
+        f"Requests: {StubState.requests}, connections: {len(StubState.connections)}, "
+        f"serial: {serial:.2f}s, first wave: {elapsed:.2f}s"
+    )
+    assert StubState.requests == 3 * NUM_REQUESTS + 1
+    assert len(StubState.connections) <= NUM_REQUESTS
+    assert elapsed < serial / 3, "Expected concurrent async requests"
+    print("✅ Async calls run concurrently on pooled connections.")
+
+
+def test_embedding_session(base: str):
+    print("\n=== Testing EmbeddingEngine on the shared session ===")
+    _reset()
+    engine = EmbeddingEngine(api_key="test")
+    engine.api_url = f"{base}/embeddings"
+
+    for _ in range(5):
+        embeddings = engine.get_embeddings(["eins", "zwei"])
+        assert embeddings == [[0.0, 0.5], [1.0, 0.5]]
+
+    assert len(StubState.connections) == 1
+    print("✅ Embedding requests reuse the pooled connection.")
+
+
+def _split_stream(deltas):
+    splitter = SuggestionSplitter()
+    answer = "".join(splitter.feed(d) for d in deltas)
+    tail, suggestions = splitter.finish()
+    return (answer + tail).strip(), suggestions
+
+
+def test_streaming(base: str):
+    print("\n=== Testing streamed chat (SSE) ===")
+    providers = [
+        OpenAIProvider(api_key="test", model="stub-model", api_url=base),
+        AnthropicProvider(api_key="test", model="stub-model", api_url=f"{base}/messages"),
+    ]
+    messages = [Message(role="user", content="Rückforderung?")]
+
+    async def collect(provider):
+        return [d async for d in provider.astream_chat(messages)]
+
+    for provider in providers:
+        name = provider.get_provider_name()
+        for mode, deltas in (
+            ("sync", list(provider.stream_chat(messages))),
+            ("async", asyncio.run(collect(provider))),
+        ):
+            assert "".join(deltas) == "".join(STREAM_DELTAS), f"{name} {mode}: {deltas!r}"
+            answer, suggestions = _split_stream(deltas)
+            assert answer == STREAM_ANSWER, f"{name} {mode}: {answer!r}"
+            assert suggestions == STREAM_SUGGESTIONS, f"{name} {mode}: {suggestions!r}"
+            print(f"{name} {mode}: {len(deltas)} deltas, {len(suggestions)} suggestions")
+
+    print("✅ Streams decode UTF-8 and split suggestions.")
+
+
+if __name__ == "__main__":
+    server, base = _start_server()
+    try:
+        test_sync_pooling(base)
+        test_async_pooling(base)
+        test_embedding_session(base)
+        test_streaming(base)
+    finally:
+        server.shutdown()
@@ -0,0 +1,102 @@
+"""
+Verifies that the int8 ONNX reranker matches the PyTorch cross-encoder.
+
+Checks that:
+- scores agree within tolerance (int8 quantization shifts them slightly)
+- the ranking (top-k order) is preserved for every query
+- memory and latency of both backends (reported, not asserted)
+
+Covers the XLM-R default and a BERT model (MiniLM-L6): BERT tokenizers also
+emit token_type_ids, so a mis-wired export only shows up there.
+
+Needs sentence-transformers, torch, transformers and onnxruntime. The ONNX
+model is exported to data/onnx_models/ on first run.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import psutil
+
+# Setup path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.parser.onnx_reranker import OnnxReranker
+from src.parser.reranker import Reranker
+
+MAX_ABS_DIFF = 0.05
+TOP_K = 3
+MODELS = ["mmarco-mMiniLM-L12", "ms-marco-MiniLM-L6"]
+
+QUERIES = [
+    "Schwellenwerte für Vergaben",
+    "Welche Reisekosten sind zuwendungsfähig?",
+    "Besserstellungsverbot bei Personalausgaben",
+]
+
+CHUNKS = [
+    {"id": "chunk_1", "text": "Die Schwellenwerte für öffentliche Vergaben betragen 1000 Euro."},
+    {"id": "chunk_2", "text": "Zuwendungen werden nach Maßgabe des Haushaltsplans gewährt."},
+    {"id": "chunk_3", "text": "Bei Bagatellvergaben unter 1000 Euro entfällt das förmliche Verfahren."},
+    {"id": "chunk_4", "text": "Die Förderrichtlinie tritt am 1. Januar in Kraft."},
+    {"id": "chunk_5", "text": "Reisekosten sind nach dem Bundesreisekostengesetz (BRKG) abzurechnen."},
+    {"id": "chunk_6", "text": "Der Zuwendungsempfänger darf seine Beschäftigten nicht besser stellen als vergleichbare Bundesbedienstete."},
+    {"id": "chunk_7", "text": "Personalausgaben sind nur bis zur Höhe des TVöD zuwendungsfähig."},
+    {"id": "chunk_8", "text": "Aufträge sind nach der UVgO zu vergeben, soweit der Auftragswert 100.000 Euro übersteigt."},
+]
+
+
+def get_memory_usage():
+    process = psutil.Process(os.getpid())
+    return process.memory_info().rss / 1024 / 1024  # MB
+
+
+def profile_backend(name, reranker):
+    # No cache/batching: measure the model itself
+    start_mem = get_memory_usage()
+    reranker._lazy_init()
+    assert reranker.model is not None, f"{name} backend failed to load"
+    load_mem = get_memory_usage() - start_mem
+
+    scores = {}
+    start = time.time()
+    for query in QUERIES:
+        scores[query] = reranker.score(query, CHUNKS)
+    duration = (time.time() - start) / len(QUERIES)
+
+    print(f"[{name}]")
+    print(f"  Load Memory: {load_mem:+.2f} MB")
+    print(f"  Avg Rerank: {duration * 1000:.1f} ms ({len(CHUNKS)} pairs)")
+    return scores
+
+
+def test_parity(model_name):
+    print(f"=== Testing ONNX reranker parity: {model_name} ===")
+    options = {"model_name": model_name, "cache_size": 0, "batch_window_ms": 0}
+    torch_scores = profile_backend("torch", Reranker(**options))
+    onnx_scores = profile_backend("onnx-int8", OnnxReranker(**options))
+
+    worst = 0.0
+    for query in QUERIES:
+        expected, actual = torch_scores[query], onnx_scores[query]
+        worst = max(worst, max(abs(a - b) for a, b in zip(expected, actual)))
+
+        expected_top = sorted(range(len(CHUNKS)), key=lambda i: -expected[i])[:TOP_K]
+        actual_top = sorted(range(len(CHUNKS)), key=lambda i: -actual[i])[:TOP_K]
+        print(f"{query}: top-{TOP_K} torch={expected_top} onnx={actual_top}")
+        assert expected_top == actual_top, f"Ranking differs for '{query}'"
+
+    print(f"Max score difference: {worst:.4f}")
+    assert worst <= MAX_ABS_DIFF, f"Scores differ by more than {MAX_ABS_DIFF}"
+
+    # Same contract as the torch backend
+    reranked = OnnxReranker(model_name=model_name).rerank(QUERIES[0], CHUNKS, top_k=TOP_K)
+    assert len(reranked) == TOP_K and "reranker_score" in reranked[0]
+    print(f"✅ ONNX reranker matches the PyTorch cross-encoder ({model_name}).")
+
+
+if __name__ == "__main__":
+    for model_name in MODELS:
+        test_parity(model_name)
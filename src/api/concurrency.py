@@ -0,0 +1,138 @@
+"""
+Concurrency model of the API.
+
+- Blocking work (search pipeline, reranking, compliance mapping, PDF parsing)
+  runs on one bounded thread pool instead of the event loop. When more jobs
+  are waiting than max_queue allows, new requests are rejected instead of
+  piling up.
+- Every endpoint group has a cap on requests in flight; requests above the
+  cap are shed with 503 + Retry-After.
+- LLM calls are I/O and are awaited on the async clients (src/llm).
+
+Threads rather than processes: the engines hold the graph, BM25 index and
+models in memory, and the heavy parts (torch, numpy, network I/O) release the
+GIL.
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from src.config_loader import settings
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed; the API answers 503 + Retry-After."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class BlockingExecutor:
+    """
+    Bounded thread pool with a queue-depth limit.
+
+    Example:
+        >>> executor = BlockingExecutor(max_workers=4, max_queue=32)
+        >>> results = await executor.run(engine.search_v2, query, limit=5)
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, retry_after: int = 2):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.retry_after = retry_after
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="api-worker"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise Overloaded("Worker queue full", self.retry_after)
+            self._pending += 1
+        # Counted until the job finishes, even if the client disconnects
+        future = self._pool.submit(functools.partial(fn, *args, **kwargs))
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class EndpointLimiter:
+    """
+    Caps requests in flight for one endpoint group; excess requests are shed
+    immediately instead of queueing behind slow ones.
+
+    Example:
+        >>> limiter = EndpointLimiter("chat", limit=8)
+        >>> async with limiter:
+        ...     ...
+    """
+
+    def __init__(self, name: str, limit: int, retry_after: int = 2):
+        self.name = name
+        self.limit = max(1, limit)
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.rejected = 0
+
+    def acquire(self):
+        # Only touched from the event loop thread: no lock needed
+        if self.in_flight >= self.limit:
+            self.rejected += 1
+            raise Overloaded(f"Too many concurrent {self.name} requests", self.retry_after)
+        self.in_flight += 1
+
+    def release(self):
+        self.in_flight -= 1
+
+    async def __aenter__(self):
+        self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"limit": self.limit, "in_flight": self.in_flight, "rejected": self.rejected}
+
+
+def create_executor() -> BlockingExecutor:
+    workers = settings.get("api.concurrency.workers") or os.cpu_count() or 4
+    return BlockingExecutor(
+        max_workers=int(os.getenv("API_WORKER_THREADS", workers)),
+        max_queue=settings.get("api.concurrency.max_queue", 32),
+        retry_after=settings.get("api.concurrency.retry_after_seconds", 2),
+    )
+
+
+def create_limiters() -> Dict[str, EndpointLimiter]:
+    limits = settings.get("api.concurrency.limits", {}) or {}
+    retry_after = settings.get("api.concurrency.retry_after_seconds", 2)
+    defaults = {"search": 32, "search_advanced": 16, "chat": 8, "upload": 4, "graph": 8}
+    return {
+        name: EndpointLimiter(name, limits.get(name, default), retry_after)
+        for name, default in defaults.items()
+    }
@@ -1,14 +1,35 @@
-from fastapi import FastAPI, Query, HTTPException
+from fastapi import FastAPI, Query, HTTPException, Header, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import (
+    FileResponse,
+    HTMLResponse,
+    JSONResponse,
+    StreamingResponse,
+)
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
+from src.api.concurrency import (
+    EndpointLimiter,
+    Overloaded,
+    create_executor,
+    create_limiters,
+)
+from src.api.streaming import (
+    SSE_HEADERS,
+    SUGGESTIONS_MARKER,
+    SuggestionSplitter,
+    astream_text,
+    parse_suggestions,
+    sse_event,
+)
 from src.parser.hybrid_search import HybridSearchEngine
 from src.parser.rule_extractor import RuleExtractor
+from src.parser.answer_cache import AnswerCache, CacheLookup
 from src.graph.compliance_mapper import ComplianceMapper
 from src.models.schemas import ExpandContextRequest, ExpandContextResponse
 from src.config_loader import settings
+from src.llm.http_client import aclose_async_client
 import logging
 
 # Setup Logging
@@ -72,6 +93,9 @@ else:
 engine = HybridSearchEngine(
     graph_path=Path(settings.get("paths.knowledge_graph")),
     db_path=settings.get("paths.chroma_db"),
+    query_thesaurus_path=Path(
+        settings.get("paths.query_thesaurus", "data/query_thesaurus.json")
+    ),
 )
 answer_engine = RuleExtractor()
 if not answer_engine.provider:
@@ -83,6 +107,235 @@ compliance_mapper = ComplianceMapper(
 )
 
 
+# --- Concurrency ---
+# Blocking engine calls run on a bounded worker pool, never on the event loop.
+# Each endpoint group has a cap on requests in flight (see src/api/concurrency.py).
+executor = create_executor()
+LIMITERS = create_limiters()
+
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    logger.warning(f"Shedding {request.url.path}: {exc.reason}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"Server ausgelastet: {exc.reason}. Bitte später erneut versuchen."},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+# --- Answer Cache ---
+# Repeat questions over the same chunks are answered without an LLM call.
+def _embed_query(query: str) -> List[float]:
+    return engine.vector_store.embedding_engine.get_embeddings([query])[0]
+
+
+answer_cache = AnswerCache.from_settings(embed_fn=_embed_query)
+ANSWER_CACHE_ENABLED = settings.get("api.answer_cache.enabled", True)
+CHAT_PROMPT_VERSION = "chat-v1"
+
+
+async def _cache_lookup(
+    query: str, context_ids: List[str], template: str
+) -> Optional[CacheLookup]:
+    if not (ANSWER_CACHE_ENABLED and answer_engine.provider):
+        return None
+    args = (
+        query,
+        context_ids,
+        engine.generation.version,
+        f"{template}:{answer_engine.provider.model}",
+    )
+    if answer_cache.semantic_enabled:
+        # The semantic tier embeds the query (remote call)
+        return await executor.run(answer_cache.lookup, *args)
+    return answer_cache.lookup(*args)
+
+
+def _cache_store(lookup: Optional[CacheLookup], value: Any):
+    if lookup is not None:
+        answer_cache.store(lookup, value)
+
+
+async def _cached_answer(
+    query: str, results: List[Dict[str, Any]], template: str, with_score: bool
+) -> Tuple[str, bool]:
+    """Returns (answer, served_from_cache) for the top results."""
+    lookup = await _cache_lookup(query, [r["id"] for r in results], template)
+    if lookup is not None and lookup.hit:
+        return lookup.value, True
+
+    answer = await answer_engine.agenerate_answer(
+        query, _context_chunks(results, with_score=with_score)
+    )
+    if answer and answer not in (
+        RuleExtractor.ANSWER_UNAVAILABLE,
+        RuleExtractor.ANSWER_FAILED,
+    ):
+        _cache_store(lookup, answer)
+    return answer, False
+
+
+def limited(name: str):
+    """Dependency that holds a slot of the endpoint group for the request."""
+    limiter = LIMITERS[name]
+
+    async def dependency():
+        limiter.acquire()
+        try:
+            yield
+        finally:
+            limiter.release()
+
+    return dependency
+
+
+# --- Hot Reload ---
+# New data (graph, BM25) is swapped in while requests keep being served from
+# the previous index generation, instead of restarting the container.
+import asyncio
+import hashlib
+import json
+import secrets
+import time
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+RELOAD_STATE: Dict[str, Any] = {
+    "running": False,
+    "last_reload": None,
+    "last_trigger": None,
+    "last_error": None,
+}
+# Last reload marker this worker has acted on (see _broadcast_reload)
+_reload_marker_seen: Optional[str] = None
+
+
+def _reload_indexes() -> Dict[str, Any]:
+    """Builds the next index generation and swaps it into all consumers."""
+    generation = engine.reload()
+    compliance_mapper.reload(graph=generation.graph)
+    return generation.get_stats()
+
+
+async def _run_reload(trigger: str) -> Dict[str, Any]:
+    if RELOAD_STATE["running"]:
+        raise HTTPException(status_code=409, detail="Reload already in progress.")
+    RELOAD_STATE["running"] = True
+    try:
+        # Loading runs in a worker thread; the event loop keeps serving requests
+        stats = await asyncio.to_thread(_reload_indexes)
+        RELOAD_STATE.update(
+            {
+                "last_reload": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "last_trigger": trigger,
+                "last_error": None,
+            }
+        )
+        return stats
+    except Exception as e:
+        RELOAD_STATE["last_error"] = str(e)
+        raise
+    finally:
+        RELOAD_STATE["running"] = False
+
+
+def _reload_marker_path() -> Path:
+    return Path(settings.get("paths.reload_marker", "data/.reload_marker"))
+
+
+def _read_reload_marker() -> Optional[str]:
+    try:
+        return _reload_marker_path().read_text(encoding="utf-8").strip() or None
+    except OSError:
+        return None
+
+
+def _broadcast_reload():
+    """
+    Tells the other worker processes to reload as well: each one polls the
+    marker file and reloads when its content changes.
+    """
+    global _reload_marker_seen
+    marker = f"{time.time():.6f}-{os.getpid()}"
+    path = _reload_marker_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(".tmp")
+    temp_path.write_text(marker, encoding="utf-8")
+    os.replace(temp_path, path)
+    _reload_marker_seen = marker
+
+
+async def _watch_reload_marker(interval: float):
+    global _reload_marker_seen
+    _reload_marker_seen = _read_reload_marker()
+    while True:
+        await asyncio.sleep(interval)
+        marker = _read_reload_marker()
+        if marker is None or marker == _reload_marker_seen or RELOAD_STATE["running"]:
+            # A running reload defers the marker to the next poll
+            continue
+        _reload_marker_seen = marker
+        try:
+            logger.info("Reload requested by another worker, reloading...")
+            await _run_reload("broadcast")
+        except Exception as e:
+            logger.error(f"Hot reload failed, keeping current generation: {e}")
+
+
+def _index_mtimes() -> tuple:
+    paths = [
+        Path(settings.get("paths.knowledge_graph")),
+        Path(settings.get("paths.bm25_index", "data/bm25_index.pkl")),
+    ]
+    return tuple(p.stat().st_mtime if p.exists() else None for p in paths)
+
+
+async def _watch_index_files(interval: float):
+    """Reloads once graph/BM25 files changed and stayed unchanged for one interval."""
+    last = _index_mtimes()
+    pending = None
+    while True:
+        await asyncio.sleep(interval)
+        current = _index_mtimes()
+        if current == last:
+            pending = None
+            continue
+        if current != pending:
+            # Writer may still be saving the other file; wait for a stable state
+            pending = current
+            continue
+        try:
+            logger.info("Index files changed on disk, reloading...")
+            await _run_reload("file-watch")
+        except Exception as e:
+            logger.error(f"Hot reload failed, keeping current generation: {e}")
+        last, pending = current, None
+
+
+@app.on_event("startup")
+async def start_index_watcher():
+    watch = os.getenv("HOT_RELOAD_WATCH")
+    enabled = (
+        watch.lower() in ("1", "true", "yes")
+        if watch is not None
+        else settings.get("api.hot_reload.watch", False)
+    )
+    if enabled:
+        interval = settings.get("api.hot_reload.poll_interval_seconds", 30)
+        logger.info(f"Watching index files for hot reload (every {interval}s)")
+        asyncio.create_task(_watch_index_files(interval))
+    # With several worker processes, /admin/reload reaches only one of them
+    asyncio.create_task(
+        _watch_reload_marker(settings.get("api.hot_reload.broadcast_poll_seconds", 5))
+    )
+
+
+@app.on_event("shutdown")
+async def close_llm_clients():
+    await aclose_async_client()
+    executor.shutdown()
+
+
 # Serve UI (Dashboard) at the very root of the domain
 @app.get("/", include_in_schema=False)
 async def serve_ui():
@@ -136,25 +389,37 @@ async def health_check():
     return {"status": "healthy", "service": "Bund-ZuwendungsGraph"}
 
 
-@app.get("/search")
-async def search(
-    q: str = Query(..., description="Die Suchanfrage"),
-    limit: int = Query(5, description="Maximale Anzahl der Ergebnisse"),
-    ministerium: Optional[str] = Query(None, description="Filter nach Ministerium"),
-    kuerzel: Optional[str] = Query(None, description="Filter nach Kürzel"),
-    stand_after: Optional[str] = Query(
-        None, description="Filter nach Datum (Stand nach)"
-    ),
-):
+@app.post("/admin/reload", tags=["System"])
+async def admin_reload(x_admin_token: Optional[str] = Header(None)):
     """
-    Führt eine hybride Suche (Vektor + Graph) durch und generiert optional eine KI-Antwort.
+    Lädt Knowledge Graph und BM25-Index neu und tauscht sie atomar aus,
+    ohne laufende Anfragen zu unterbrechen. Erfordert den Header `X-Admin-Token`.
     """
-    if not q:
-        return []
+    if not ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=403, detail="Admin endpoints disabled (ADMIN_TOKEN not set)."
+        )
+    if not secrets.compare_digest(x_admin_token or "", ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token.")
+
+    try:
+        stats = await _run_reload("admin")
+        _broadcast_reload()
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Hot reload failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Reload failed: {e}")
+
+    return {"status": "reloaded", "generation": stats}
 
-    results = engine.search(q, limit=limit)
 
-    # Apply filters to results
+def _apply_filters(
+    results: List[Dict[str, Any]],
+    ministerium: Optional[str],
+    kuerzel: Optional[str],
+    stand_after: Optional[str],
+) -> List[Dict[str, Any]]:
     filtered_results = []
     for res in results:
         match = True
@@ -173,35 +438,69 @@ async def search(
 
         if match:
             filtered_results.append(res)
+    return filtered_results
 
-    # Generate RAG Answer if results found and query is complex enough
-    if filtered_results and len(q.split()) > 2:
-        top_results = filtered_results[:3]
-        context_chunks = []
-        for r in top_results:
-            # Primary Chunk
+
+def _context_chunks(results: List[Dict[str, Any]], with_score: bool = False) -> List[str]:
+    """Formats search results plus their graph neighbours as LLM context."""
+    context_chunks = []
+    for r in results:
+        # Primary Chunk
+        score = f"[Score: {r.get('score', 0):.3f}] " if with_score else ""
+        context_chunks.append(
+            f"{score}Titel: {r.get('doc_title', 'Unbekannt')}\nText: {r.get('text', '')}"
+        )
+        # Graph-based Neighbor Context (Multi-Hop)
+        for neighbor in r.get("neighbor_context", []):
+            n_type = neighbor.get("type", "reference").upper()
             context_chunks.append(
-                f"Titel: {r.get('doc_title', 'Unbekannt')}\nText: {r.get('text', '')}"
+                f"[{n_type}] Quelle: {neighbor.get('breadcrumbs', 'Verknüpftes Dokument')}\nText: {neighbor.get('text', '')}"
             )
-            # Graph-based Neighbor Context (Multi-Hop)
-            for neighbor in r.get("neighbor_context", []):
-                n_type = neighbor.get("type", "reference").upper()
-                context_chunks.append(
-                    f"[{n_type}] Quelle: {neighbor.get('breadcrumbs', 'Verknüpftes Dokument')}\nText: {neighbor.get('text', '')}"
-                )
+    return context_chunks
 
-        try:
-            answer = answer_engine.generate_answer(q, context_chunks)
-            if answer:
-                return {"answer": answer, "results": filtered_results}
-        except Exception as e:
-            logger.error(f"Answer generation failed: {e}")
 
-    return filtered_results
+def _resolve_scope_whitelist(
+    context_doc_id: Optional[str], text_limit: int
+) -> Optional[List[str]]:
+    """
+    Scope-Constraint: the context document plus everything it references,
+    always resolved to the latest version.
+    """
+    if not context_doc_id:
+        return None
+
+    scope_whitelist = []
+
+    # Case A: Document is in Knowledge Graph
+    if context_doc_id in engine.graph:
+        scope_whitelist.append(context_doc_id)
+        for _, target_id, edata in engine.graph.out_edges(context_doc_id, data=True):
+            if edata.get("relation") == "REFERENCES":
+                scope_whitelist.append(target_id)
+
+    # Case B: Document is in Upload Cache (extracted text)
+    elif context_doc_id in UPLOAD_CACHE:
+        text = UPLOAD_CACHE[context_doc_id]
+        # Use ComplianceMapper logic to find citations
+        req = ExpandContextRequest(
+            context_label="scope_extraction", text_chunks=[text[:text_limit]]
+        )
+        expansion = compliance_mapper.expand_context(req)
+        for reg in expansion.mapped_regulations:
+            if reg.doc_id:
+                scope_whitelist.append(reg.doc_id)
+
+    if scope_whitelist:
+        # Smart Version Resolution: always use latest
+        scope_whitelist = list(
+            {compliance_mapper._find_latest_version(d_id) for d_id in scope_whitelist}
+        )
+        logger.info(f"Active Scope Whitelist: {scope_whitelist}")
+    return scope_whitelist
 
 
-@app.get("/search/advanced")
-async def search_advanced(
+@app.get("/search", dependencies=[Depends(limited("search"))])
+async def search(
     q: str = Query(..., description="Die Suchanfrage"),
     limit: int = Query(5, description="Maximale Anzahl der Ergebnisse"),
     ministerium: Optional[str] = Query(None, description="Filter nach Ministerium"),
@@ -209,148 +508,192 @@ async def search_advanced(
     stand_after: Optional[str] = Query(
         None, description="Filter nach Datum (Stand nach)"
     ),
-    context_doc_id: Optional[str] = Query(
-        None,
-        description="Scope-Constraint: Suche auf referenzierte Gesetze dieses Dokuments einschränken",
-    ),
-    use_bm25: bool = Query(True, description="BM25 Sparse Retrieval aktivieren"),
-    use_reranking: bool = Query(True, description="Cross-Encoder Reranking aktivieren"),
-    use_query_enhancement: bool = Query(
-        False, description="LLM-basierte Query-Optimierung (HyDE) aktivieren (langsam!)"
-    ),
-    multi_hop: bool = Query(True, description="Multi-Hop Graph Traversal aktivieren"),
-    generate_answer: bool = Query(True, description="KI-Antwort generieren"),
 ):
     """
-    PHASE 1 GRAPH RAG: Advanced Hybrid Search with BM25 + RRF + Reranking.
-
-    Pipeline:
-    1. Multi-Retrieval: BM25 (sparse) + Vector (dense)
-    2. RRF Fusion: Reciprocal Rank Fusion
-    3. Cross-Encoder Reranking: Semantic reranking for German legal text
-    4. Graph Expansion: Multi-hop context (REFERENCES, SUPERSEDES)
-    5. Answer Generation: LLM-based answer with provenance
-
-    Returns:
-        {
-            "answer": str (if generate_answer=true),
-            "results": List[Dict],
-            "metadata": {
-                "retrieval_strategy": "bm25+vector+reranking",
-                "num_results": int,
-                "features_enabled": {...}
-            }
-        }
+    Führt eine hybride Suche (Vektor + Graph) durch und generiert optional eine KI-Antwort.
     """
     if not q:
-        return {"error": "Query cannot be empty"}
+        return []
 
-    # Resolve scope whitelist if context_doc_id is provided
-    scope_whitelist = None
-    if context_doc_id:
-        scope_whitelist = []
-
-        # Case A: Document is in Knowledge Graph
-        if context_doc_id in engine.graph:
-            scope_whitelist.append(context_doc_id)
-            for _, target_id, edata in engine.graph.out_edges(
-                context_doc_id, data=True
-            ):
-                if edata.get("relation") == "REFERENCES":
-                    scope_whitelist.append(target_id)
+    results = await executor.run(
+        engine.search,
+        q,
+        limit=limit,
+        ministerium=ministerium,
+        kuerzel=kuerzel,
+        stand_after=stand_after,
+    )
 
-        # Case B: Document is in Upload Cache (extracted text)
-        elif context_doc_id in UPLOAD_CACHE:
-            text = UPLOAD_CACHE[context_doc_id]
-            # Use ComplianceMapper logic to find citations
-            from src.models.schemas import ExpandContextRequest
+    # Filters are pushed down into retrieval; this is only a safety net
+    filtered_results = _apply_filters(results, ministerium, kuerzel, stand_after)[
+        :limit
+    ]
 
-            req = ExpandContextRequest(
-                context_label="scope_extraction", text_chunks=[text[:50000]]
+    # Generate RAG Answer if results found and query is complex enough
+    if filtered_results and len(q.split()) > 2:
+        try:
+            answer, _ = await _cached_answer(
+                q,
+                filtered_results[:3],
+                f"search:{RuleExtractor.ANSWER_PROMPT_VERSION}",
+                with_score=False,
             )
-            expansion = compliance_mapper.expand_context(req)
-            for reg in expansion.mapped_regulations:
-                if reg.doc_id:
-                    scope_whitelist.append(reg.doc_id)
-
-        if scope_whitelist:
-            # Smart Version Resolution: always use latest
-            resolved_whitelist = []
-            for d_id in scope_whitelist:
-                resolved_whitelist.append(compliance_mapper._find_latest_version(d_id))
-            scope_whitelist = list(set(resolved_whitelist))
-            logger.info(f"Active Scope Whitelist: {scope_whitelist}")
+            if answer:
+                return {"answer": answer, "results": filtered_results}
+        except Exception as e:
+            logger.error(f"Answer generation failed: {e}")
+
+    return filtered_results
+
+
+class AdvancedSearchParams:
+    """Query parameters shared by /search/advanced and /search/advanced/stream."""
+
+    def __init__(
+        self,
+        q: str = Query(..., description="Die Suchanfrage"),
+        limit: int = Query(5, description="Maximale Anzahl der Ergebnisse"),
+        ministerium: Optional[str] = Query(
+            None, description="Filter nach Ministerium"
+        ),
+        kuerzel: Optional[str] = Query(None, description="Filter nach Kürzel"),
+        stand_after: Optional[str] = Query(
+            None, description="Filter nach Datum (Stand nach)"
+        ),
+        context_doc_id: Optional[str] = Query(
+            None,
+            description="Scope-Constraint: Suche auf referenzierte Gesetze dieses Dokuments einschränken",
+        ),
+        use_bm25: bool = Query(True, description="BM25 Sparse Retrieval aktivieren"),
+        use_reranking: bool = Query(
+            True, description="Cross-Encoder Reranking aktivieren"
+        ),
+        cascade_rerank: Optional[bool] = Query(
+            None,
+            description="Kaskaden-Reranking: gekürzter Vorlauf, volle Länge nur für unsichere Kandidaten (Standard: Konfiguration)",
+        ),
+        use_query_enhancement: bool = Query(
+            True,
+            description="Query-Erweiterung über den lokalen Thesaurus (Kürzel, Synonyme)",
+        ),
+        deep_search: bool = Query(
+            False,
+            description="LLM-basierte Query-Optimierung (HyDE, Multi-Query) statt Thesaurus (langsam!)",
+        ),
+        multi_hop: bool = Query(
+            True, description="Multi-Hop Graph Traversal aktivieren"
+        ),
+        generate_answer: bool = Query(True, description="KI-Antwort generieren"),
+    ):
+        self.q = q
+        self.limit = limit
+        self.ministerium = ministerium
+        self.kuerzel = kuerzel
+        self.stand_after = stand_after
+        self.context_doc_id = context_doc_id
+        self.use_bm25 = use_bm25
+        self.use_reranking = use_reranking
+        self.cascade_rerank = cascade_rerank
+        self.use_query_enhancement = use_query_enhancement
+        self.deep_search = deep_search
+        self.multi_hop = multi_hop
+        self.generate_answer = generate_answer
+
+    @property
+    def wants_answer(self) -> bool:
+        return self.generate_answer and len(self.q.split()) > 2
+
+
+def _advanced_search(
+    params: AdvancedSearchParams,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Runs the search_v2 pipeline and returns (filtered results, metadata)."""
+    # Resolve scope whitelist if context_doc_id is provided
+    scope_whitelist = _resolve_scope_whitelist(params.context_doc_id, 50000)
 
     # Call search_v2 (Phase 1 implementation)
     results = engine.search_v2(
-        query=q,
-        limit=limit * 2,  # Get more for filtering
+        query=params.q,
+        limit=params.limit,
         filter_dict=None,
         scope_whitelist=scope_whitelist,
-        multi_hop=multi_hop,
-        use_bm25=use_bm25,
-        use_reranking=use_reranking,
-        use_query_enhancement=use_query_enhancement,
+        multi_hop=params.multi_hop,
+        use_bm25=params.use_bm25,
+        use_reranking=params.use_reranking,
+        use_query_enhancement=params.use_query_enhancement,
         retrieval_candidates=20,
         rerank_top_k=10,
+        deep_search=params.deep_search,
+        cascade_rerank=params.cascade_rerank,
+        ministerium=params.ministerium,
+        kuerzel=params.kuerzel,
+        stand_after=params.stand_after,
     )
 
-    # Apply filters to results
-    filtered_results = []
-    for res in results:
-        match = True
-        if (
-            ministerium
-            and res.get("ministerium") != ministerium
-            and res.get("herausgeber") != ministerium
-        ):
-            match = False
-        if kuerzel and kuerzel not in res.get("kuerzel", ""):
-            match = False
-        if stand_after and res.get("stand"):
-            res_stand = res.get("stand")
-            if res_stand and res_stand < stand_after:
-                match = False
-
-        if match:
-            filtered_results.append(res)
-
-    # Limit final results
-    filtered_results = filtered_results[:limit]
+    # Filters are pushed down into retrieval; this is only a safety net
+    filtered_results = _apply_filters(
+        results, params.ministerium, params.kuerzel, params.stand_after
+    )[: params.limit]
 
     # Metadata
     metadata = {
-        "retrieval_strategy": f"{'bm25+' if use_bm25 else ''}vector{'+ reranking' if use_reranking else ''}",
+        "retrieval_strategy": f"{'bm25+' if params.use_bm25 else ''}vector{'+ reranking' if params.use_reranking else ''}",
         "num_results": len(filtered_results),
         "features_enabled": {
-            "bm25": use_bm25,
-            "reranking": use_reranking,
-            "query_enhancement": use_query_enhancement,
-            "multi_hop": multi_hop,
-            "answer_generation": generate_answer,
+            "bm25": params.use_bm25,
+            "reranking": params.use_reranking,
+            "cascade_rerank": params.cascade_rerank
+            if params.cascade_rerank is not None
+            else settings.get("reranker.cascade.enabled", False),
+            "query_enhancement": params.use_query_enhancement,
+            "deep_search": params.deep_search,
+            "multi_hop": params.multi_hop,
+            "answer_generation": params.generate_answer,
         },
         "api_version": "2.0.0",
         "phase": "1",
     }
+    return filtered_results, metadata
 
-    # Generate RAG Answer if requested
-    if generate_answer and filtered_results and len(q.split()) > 2:
-        top_results = filtered_results[:3]
-        context_chunks = []
-        for r in top_results:
-            # Primary Chunk with scores
-            context_chunks.append(
-                f"[Score: {r.get('score', 0):.3f}] Titel: {r.get('doc_title', 'Unbekannt')}\nText: {r.get('text', '')}"
-            )
-            # Graph-based Neighbor Context (Multi-Hop)
-            for neighbor in r.get("neighbor_context", []):
-                n_type = neighbor.get("type", "reference").upper()
-                context_chunks.append(
-                    f"[{n_type}] Quelle: {neighbor.get('breadcrumbs', 'Verknüpftes Dokument')}\nText: {neighbor.get('text', '')}"
-                )
 
+@app.get("/search/advanced", dependencies=[Depends(limited("search_advanced"))])
+async def search_advanced(params: AdvancedSearchParams = Depends()):
+    """
+    PHASE 1 GRAPH RAG: Advanced Hybrid Search with BM25 + RRF + Reranking.
+
+    Pipeline:
+    1. Multi-Retrieval: BM25 (sparse) + Vector (dense)
+    2. RRF Fusion: Reciprocal Rank Fusion
+    3. Cross-Encoder Reranking: Semantic reranking for German legal text
+    4. Graph Expansion: Multi-hop context (REFERENCES, SUPERSEDES)
+    5. Answer Generation: LLM-based answer with provenance
+
+    Returns:
+        {
+            "answer": str (if generate_answer=true),
+            "results": List[Dict],
+            "metadata": {
+                "retrieval_strategy": "bm25+vector+reranking",
+                "num_results": int,
+                "features_enabled": {...}
+            }
+        }
+    """
+    if not params.q:
+        return {"error": "Query cannot be empty"}
+
+    filtered_results, metadata = await executor.run(_advanced_search, params)
+
+    # Generate RAG Answer if requested
+    if params.wants_answer and filtered_results:
         try:
-            answer = answer_engine.generate_answer(q, context_chunks)
+            answer, cached = await _cached_answer(
+                params.q,
+                filtered_results[:3],
+                f"advanced:{RuleExtractor.ANSWER_PROMPT_VERSION}",
+                with_score=True,
+            )
+            metadata["answer_cached"] = cached
             if answer:
                 return {
                     "answer": answer,
@@ -364,8 +707,94 @@ async def search_advanced(
     return {"results": filtered_results, "metadata": metadata}
 
 
+@app.get("/search/advanced/stream")
+async def search_advanced_stream(params: AdvancedSearchParams = Depends()):
+    """
+    Streaming-Variante von /search/advanced (Server-Sent Events).
+
+    Sendet zuerst die Suchergebnisse (`event: results`), danach die KI-Antwort
+    tokenweise (`event: token`) und zum Schluss `event: done` mit der
+    vollständigen Antwort.
+    """
+    if not params.q:
+        raise HTTPException(status_code=400, detail="Query cannot be empty")
+
+    # Retrieval happens before the response starts, so overload is still a 503
+    limiter = LIMITERS["search_advanced"]
+    limiter.acquire()
+    try:
+        filtered_results, metadata = await executor.run(_advanced_search, params)
+    except BaseException:
+        limiter.release()
+        raise
+
+    return StreamingResponse(
+        _released(limiter, _advanced_answer_events(params, filtered_results, metadata)),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+async def _released(
+    limiter: EndpointLimiter, events: AsyncIterator[str]
+) -> AsyncIterator[str]:
+    """Holds the endpoint slot until the stream has been sent."""
+    try:
+        async for event in events:
+            yield event
+    finally:
+        limiter.release()
+
+
+async def _advanced_answer_events(
+    params: AdvancedSearchParams,
+    filtered_results: List[Dict[str, Any]],
+    metadata: Dict[str, Any],
+) -> AsyncIterator[str]:
+    yield sse_event("results", {"results": filtered_results, "metadata": metadata})
+
+    if not (params.wants_answer and filtered_results and answer_engine.provider):
+        yield sse_event("done", {"answer": None, "suggested_questions": []})
+        return
+
+    top_results = filtered_results[:3]
+    lookup = await _cache_lookup(
+        params.q,
+        [r["id"] for r in top_results],
+        f"advanced:{RuleExtractor.ANSWER_PROMPT_VERSION}",
+    )
+    if lookup is not None and lookup.hit:
+        yield sse_event("token", {"text": lookup.value})
+        yield sse_event(
+            "done", {"answer": lookup.value, "suggested_questions": [], "cached": True}
+        )
+        return
+
+    prompt = answer_engine.answer_prompt(
+        params.q, _context_chunks(top_results, with_score=True)
+    )
+    parts = []
+    try:
+        async for delta in astream_text(
+            answer_engine.provider, prompt, max_tokens=500, temperature=0.3
+        ):
+            parts.append(delta)
+            yield sse_event("token", {"text": delta})
+    except Exception as e:
+        logger.error(f"Answer streaming failed: {e}")
+        yield sse_event("error", {"detail": str(e)})
+        return
+    answer = "".join(parts)
+    if answer:
+        _cache_store(lookup, answer)
+    yield sse_event("done", {"answer": answer, "suggested_questions": []})
+
+
 @app.post(
-    "/graph/expand-context", response_model=ExpandContextResponse, tags=["Graph Logic"]
+    "/graph/expand-context",
+    response_model=ExpandContextResponse,
+    tags=["Graph Logic"],
+    dependencies=[Depends(limited("graph"))],
 )
 async def expand_context_endpoint(request: ExpandContextRequest):
     """
@@ -382,7 +811,9 @@ async def expand_context_endpoint(request: ExpandContextRequest):
         Ein strukturiertes Regel-Paket (`mapped_regulations`), das für den Prüfagenten optimiert ist.
     """
     try:
-        return compliance_mapper.expand_context(request)
+        return await executor.run(compliance_mapper.expand_context, request)
+    except Overloaded:
+        raise
     except Exception as e:
         logger.error(f"Error in expand_context: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -431,6 +862,17 @@ async def health_raw():
             "llm": llm_status,
             "env": env_vars,
             "upload_cache_size": len(UPLOAD_CACHE),
+            "index_generation": engine.generation.get_stats(),
+            "reload": RELOAD_STATE,
+            "answer_cache": answer_cache.get_stats(),
+            "reranker": engine.reranker.get_stats() if engine.reranker else None,
+            "chunk_cache": engine.vector_store.chunk_cache.get_stats(),
+            "concurrency": {
+                "executor": executor.get_stats(),
+                "endpoints": {
+                    name: limiter.get_stats() for name, limiter in LIMITERS.items()
+                },
+            },
         },
     }
 
@@ -453,7 +895,33 @@ import io
 UPLOAD_CACHE: Dict[str, str] = {}
 
 
-@app.post("/chat/upload")
+def _extract_upload_text(
+    content: bytes, is_pdf: bool, is_docx: bool, is_text: bool
+) -> str:
+    text = ""
+
+    if is_pdf:
+        from pypdf import PdfReader
+
+        pdf = PdfReader(io.BytesIO(content))
+        for page in pdf.pages:
+            extracted = page.extract_text()
+            if extracted:
+                text += extracted + "\n"
+
+    elif is_docx:
+        import docx
+
+        doc = docx.Document(io.BytesIO(content))
+        text = "\n".join([para.text for para in doc.paragraphs])
+
+    elif is_text:
+        text = content.decode("utf-8", errors="ignore")
+
+    return text
+
+
+@app.post("/chat/upload", dependencies=[Depends(limited("upload"))])
 async def upload_document(file: UploadFile = File(...)):
     """
     Uploads a document (PDF, DOCX, TXT, MD) for ad-hoc RAG chat.
@@ -482,25 +950,10 @@ async def upload_document(file: UploadFile = File(...)):
 
     try:
         content = await file.read()
-        text = ""
-
-        if is_pdf:
-            from pypdf import PdfReader
-
-            pdf = PdfReader(io.BytesIO(content))
-            for page in pdf.pages:
-                extracted = page.extract_text()
-                if extracted:
-                    text += extracted + "\n"
-
-        elif is_docx:
-            import docx
-
-            doc = docx.Document(io.BytesIO(content))
-            text = "\n".join([para.text for para in doc.paragraphs])
-
-        elif is_text:
-            text = content.decode("utf-8", errors="ignore")
+        # PDF/DOCX parsing is CPU-bound
+        text = await executor.run(
+            _extract_upload_text, content, is_pdf, is_docx, is_text
+        )
 
         # Store text in memory with a unique ID
         doc_id = str(uuid.uuid4())
@@ -523,6 +976,8 @@ async def upload_document(file: UploadFile = File(...)):
             "status": "processed",
         }
 
+    except (HTTPException, Overloaded):
+        raise
     except Exception as e:
         logger.error(f"Upload processing failed: {e}")
         raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
@@ -532,7 +987,12 @@ class DocumentAnalysisRequest(BaseModel):
     uploaded_doc_id: str
 
 
-@app.post("/chat/analyze-document", response_model=ExpandContextResponse, tags=["Chat"])
+@app.post(
+    "/chat/analyze-document",
+    response_model=ExpandContextResponse,
+    tags=["Chat"],
+    dependencies=[Depends(limited("graph"))],
+)
 async def analyze_document(request: DocumentAnalysisRequest):
     """
     Graph-Guided Analysis (Inverse Search).
@@ -564,18 +1024,17 @@ async def analyze_document(request: DocumentAnalysisRequest):
             text_chunks=chunks,
             metadata={"source": "user_upload"},
         )
-        return compliance_mapper.expand_context(expand_req)
+        return await executor.run(compliance_mapper.expand_context, expand_req)
 
+    except Overloaded:
+        raise
     except Exception as e:
         logger.error(f"Analysis failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/chat/query", response_model=ChatResponse)
-async def chat_query(request: ChatRequest):
-    """
-    Conversational endpoint. Combines Graph-RAG with uploaded document context.
-    """
+def _chat_prompt(request: ChatRequest) -> Tuple[str, List[Dict[str, Any]]]:
+    """Retrieves graph context for a chat message and builds the answer prompt."""
     query = request.message
     history = request.history
     doc_id = request.uploaded_doc_id
@@ -584,33 +1043,7 @@ async def chat_query(request: ChatRequest):
     )  # Use uploaded doc as context by default if available
 
     # Resolve scope whitelist
-    scope_whitelist = None
-    if context_doc_id:
-        scope_whitelist = []
-        if context_doc_id in engine.graph:
-            scope_whitelist.append(context_doc_id)
-            for _, target_id, edata in engine.graph.out_edges(
-                context_doc_id, data=True
-            ):
-                if edata.get("relation") == "REFERENCES":
-                    scope_whitelist.append(target_id)
-        elif context_doc_id in UPLOAD_CACHE:
-            text = UPLOAD_CACHE[context_doc_id]
-            from src.models.schemas import ExpandContextRequest
-
-            req = ExpandContextRequest(
-                context_label="scope_extraction", text_chunks=[text[:30000]]
-            )
-            expansion = compliance_mapper.expand_context(req)
-            for reg in expansion.mapped_regulations:
-                if reg.doc_id:
-                    scope_whitelist.append(reg.doc_id)
-
-        if scope_whitelist:
-            resolved = [
-                compliance_mapper._find_latest_version(d) for d in scope_whitelist
-            ]
-            scope_whitelist = list(set(resolved))
+    scope_whitelist = _resolve_scope_whitelist(context_doc_id, 30000)
 
     # 1. Search in Knowledge Graph (Hybrid)
     graph_results = engine.search_v2(query, limit=3, scope_whitelist=scope_whitelist)
@@ -630,15 +1063,7 @@ async def chat_query(request: ChatRequest):
         context_chunks.append(f"[UPLOADED_DOCUMENT]\n{preview}\n[/UPLOADED_DOCUMENT]")
 
     # 3. Add Graph Context
-    for r in graph_results:
-        context_chunks.append(
-            f"Titel: {r.get('doc_title', 'Unbekannt')}\nText: {r.get('text', '')}"
-        )
-        for neighbor in r.get("neighbor_context", []):
-            n_type = neighbor.get("type", "reference").upper()
-            context_chunks.append(
-                f"[{n_type}] Quelle: {neighbor.get('breadcrumbs', 'Verknüpftes Dokument')}\nText: {neighbor.get('text', '')}"
-            )
+    context_chunks.extend(_context_chunks(graph_results))
 
     # 4. Construct Prompt with History
     # We format history here since the RuleExtractor doesn't natively handle it yet
@@ -648,16 +1073,6 @@ async def chat_query(request: ChatRequest):
 
     combined_context = "\n\n".join(context_chunks)
 
-    # Use the existing answer engine but bypass generate_answer for custom prompt
-    if not answer_engine.provider:
-        logger.error("Attempted chat generation without initialized provider.")
-        return {
-            "answer": "Fehler: Die KI-Engine ist nicht verfügbar (API-Key fehlt oder Konfigurationsfehler). Bitte Administrator kontaktieren.",
-            "results": [],
-            "used_upload": False,
-            "suggested_questions": [],
-        }
-
     system_prompt = f"""
     Du bist der KI-Assistent für den Förderwissensgraph.
     Nutze den folgenden Kontext (Graph-Wissen und evtl. hochgeladene Dokumente), um die Frage zu beantworten.
@@ -669,13 +1084,13 @@ async def chat_query(request: ChatRequest):
     
     ZUSATZAUFGABE (WICHTIG):
     Generiere am Ende deiner Antwort ZWINGEND einen Block mit exakt 3 kurzen Folgefragen, die der Nutzer basierend auf deiner Antwort stellen könnte.
-    Trenne diesen Block vom Rest der Antwort mit der Zeile: "---SUGGESTIONS---".
+    Trenne diesen Block vom Rest der Antwort mit der Zeile: "{SUGGESTIONS_MARKER}".
     Schreibe jede Frage in eine neue Zeile, beginnend mit einem Bindestrich "- ".
     
     Beispiel-Format:
     Hier ist die Antwort auf deine Frage...
     
-    ---SUGGESTIONS---
+    {SUGGESTIONS_MARKER}
     - Wie verhält es sich mit Reisekosten?
     - Gilt das auch für KMU?
     - Wo finde ich das Formular?
@@ -691,22 +1106,74 @@ async def chat_query(request: ChatRequest):
     Antwort (hilfreich, präzise, auf Deutsch, mit Links, plus Suggestions-Block am Ende):
     """
 
+    # Check token limit roughly (1 char ~= 0.25 tokens is naive, better cut by char length)
+    # IONOS/OpenAI Limit is usually large, but let's be safe.
+    if len(system_prompt) > 100000:
+        logger.warning(
+            f"Prompt too long ({len(system_prompt)} chars). Truncating context."
+        )
+        system_prompt = system_prompt[:100000] + "\n[...Truncated...]"
+
+    return system_prompt, graph_results
+
+
+def _chat_cache_context(
+    request: ChatRequest, graph_results: List[Dict[str, Any]]
+) -> List[str]:
+    """Everything besides the question that shapes a chat answer."""
+    history = [[msg.role, msg.content] for msg in request.history[-5:]]
+    return [r["id"] for r in graph_results] + [
+        f"upload:{request.uploaded_doc_id or ''}",
+        f"context:{request.context_doc_id or ''}",
+        "history:" + hashlib.sha256(json.dumps(history).encode("utf-8")).hexdigest(),
+    ]
+
+
+NO_PROVIDER_ANSWER = "Fehler: Die KI-Engine ist nicht verfügbar (API-Key fehlt oder Konfigurationsfehler). Bitte Administrator kontaktieren."
+
+
+@app.post(
+    "/chat/query",
+    response_model=ChatResponse,
+    dependencies=[Depends(limited("chat"))],
+)
+async def chat_query(request: ChatRequest):
+    """
+    Conversational endpoint. Combines Graph-RAG with uploaded document context.
+    """
+    doc_id = request.uploaded_doc_id
+
+    # Use the existing answer engine but bypass generate_answer for custom prompt
+    if not answer_engine.provider:
+        logger.error("Attempted chat generation without initialized provider.")
+        return {
+            "answer": NO_PROVIDER_ANSWER,
+            "results": [],
+            "used_upload": False,
+            "suggested_questions": [],
+        }
+
     try:
-        # Check token limit roughly (1 char ~= 0.25 tokens is naive, better cut by char length)
-        # IONOS/OpenAI Limit is usually large, but let's be safe.
-        if len(system_prompt) > 100000:
-            logger.warning(
-                f"Prompt too long ({len(system_prompt)} chars). Truncating context."
-            )
-            system_prompt = system_prompt[:100000] + "\n[...Truncated...]"
+        system_prompt, graph_results = await executor.run(_chat_prompt, request)
 
-        # Robust generation with retries
-        import time
+        lookup = await _cache_lookup(
+            request.message,
+            _chat_cache_context(request, graph_results),
+            CHAT_PROMPT_VERSION,
+        )
+        if lookup is not None and lookup.hit:
+            return {
+                "answer": lookup.value["answer"],
+                "results": graph_results,
+                "used_upload": bool(doc_id),
+                "suggested_questions": lookup.value["suggested_questions"],
+            }
 
+        # Robust generation with retries
         response = None
         for attempt in range(3):
             try:
-                response = answer_engine.provider.generate(
+                response = await answer_engine.agenerate(
                     system_prompt, max_tokens=1500
                 )
                 if response and response.content:
@@ -714,12 +1181,12 @@ async def chat_query(request: ChatRequest):
                 logger.warning(
                     f"Empty response from LLM (Attempt {attempt + 1}/3). Retrying..."
                 )
-                time.sleep(1)
+                await asyncio.sleep(1)
             except Exception as e:
                 logger.warning(f"LLM Generation Error (Attempt {attempt + 1}/3): {e}")
                 if attempt == 2:
                     raise e
-                time.sleep(1)
+                await asyncio.sleep(1)
 
         if not response or not response.content:
             logger.error("LLM Provider returned empty response after retries.")
@@ -730,33 +1197,18 @@ async def chat_query(request: ChatRequest):
                 "suggested_questions": [],
             }
 
-        raw_content = response.content
-        answer = raw_content
-        suggestions = []
-
-        # Parse suggestions
-        if "---SUGGESTIONS---" in raw_content:
-            parts = raw_content.split("---SUGGESTIONS---")
-            answer = parts[0].strip()
-            suggestions_text = parts[1].strip()
-            # Parse lines starting with - or 1.
-            for line in suggestions_text.split("\n"):
-                clean = line.strip()
-                if clean.startswith("-") or clean.startswith("*"):
-                    suggestions.append(clean[1:].strip())
-                elif len(clean) > 0 and clean[0].isdigit() and ". " in clean:
-                    suggestions.append(clean.split(". ", 1)[1].strip())
-
-        # Fallback cleanup if LLM fails format but includes separator
-        answer = answer.replace("---SUGGESTIONS---", "").strip()
+        answer, suggestions = parse_suggestions(response.content)
+        _cache_store(lookup, {"answer": answer, "suggested_questions": suggestions})
 
         return {
             "answer": answer,
             "results": graph_results,
             "used_upload": bool(doc_id),
-            "suggested_questions": suggestions[:3],
+            "suggested_questions": suggestions,
         }
 
+    except Overloaded:
+        raise
     except Exception as e:
         logger.error(f"Chat generation failed: {e}")
         import traceback
@@ -776,6 +1228,108 @@ async def chat_query(request: ChatRequest):
         }
 
 
+@app.post("/chat/query/stream")
+async def chat_query_stream(request: ChatRequest):
+    """
+    Streaming-Variante von /chat/query (Server-Sent Events).
+
+    `event: results` kommt direkt nach der Graph-Suche, danach die Antwort
+    tokenweise (`event: token`). Der Folgefragen-Block wird nicht gestreamt,
+    sondern in `event: done` als `suggested_questions` geliefert.
+    """
+    if not answer_engine.provider:
+        logger.error("Attempted chat generation without initialized provider.")
+
+        async def unavailable():
+            yield sse_event("results", {"results": [], "used_upload": False})
+            yield sse_event("error", {"detail": NO_PROVIDER_ANSWER})
+
+        return StreamingResponse(
+            unavailable(), media_type="text/event-stream", headers=SSE_HEADERS
+        )
+
+    limiter = LIMITERS["chat"]
+    limiter.acquire()
+    try:
+        system_prompt, graph_results = await executor.run(_chat_prompt, request)
+        lookup = await _cache_lookup(
+            request.message,
+            _chat_cache_context(request, graph_results),
+            CHAT_PROMPT_VERSION,
+        )
+    except Overloaded:
+        limiter.release()
+        raise
+    except Exception as e:
+        limiter.release()
+        logger.error(f"Chat retrieval failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return StreamingResponse(
+        _released(
+            limiter,
+            _chat_answer_events(
+                system_prompt, graph_results, bool(request.uploaded_doc_id), lookup
+            ),
+        ),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+async def _chat_answer_events(
+    system_prompt: str,
+    graph_results: List[Dict[str, Any]],
+    used_upload: bool,
+    lookup: Optional[CacheLookup],
+) -> AsyncIterator[str]:
+    yield sse_event("results", {"results": graph_results, "used_upload": used_upload})
+
+    if lookup is not None and lookup.hit:
+        yield sse_event("token", {"text": lookup.value["answer"]})
+        yield sse_event("done", {**lookup.value, "cached": True})
+        return
+
+    splitter = SuggestionSplitter()
+    parts = []
+    # Retries are only possible until the first token went out
+    for attempt in range(3):
+        try:
+            async for delta in astream_text(
+                answer_engine.provider, system_prompt, max_tokens=1500
+            ):
+                text = splitter.feed(delta)
+                if text:
+                    parts.append(text)
+                    yield sse_event("token", {"text": text})
+        except Exception as e:
+            logger.warning(f"LLM Stream Error (Attempt {attempt + 1}/3): {e}")
+            if parts or attempt == 2:
+                yield sse_event("error", {"detail": str(e)})
+                return
+            await asyncio.sleep(1)
+            continue
+
+        tail, suggestions = splitter.finish()
+        if tail:
+            parts.append(tail)
+            yield sse_event("token", {"text": tail})
+        if parts:
+            break
+        logger.warning(f"Empty response from LLM (Attempt {attempt + 1}/3). Retrying...")
+        splitter = SuggestionSplitter()
+        await asyncio.sleep(1)
+
+    answer = "".join(parts).strip()
+    if not answer:
+        logger.error("LLM Provider returned empty response after retries.")
+        answer = "Die KI hat eine leere Antwort zurückgegeben. Bitte versuchen Sie es erneut."
+        suggestions = []
+    else:
+        _cache_store(lookup, {"answer": answer, "suggested_questions": suggestions})
+    yield sse_event("done", {"answer": answer, "suggested_questions": suggestions})
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,120 @@
+"""
+Helpers for the streaming (Server-Sent Events) answer endpoints.
+
+Streaming endpoints send the retrieval results first and then the LLM answer
+token by token, so time-to-first-byte is the retrieval latency instead of the
+full generation time. Event sequence:
+
+    event: results   {"results": [...], ...}
+    event: token     {"text": "..."}          (repeated)
+    event: done      {"answer": "...", "suggested_questions": [...]}
+    event: error     {"detail": "..."}        (instead of done)
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, List, Tuple
+
+from src.llm.base_provider import AsyncBaseLLMProvider, BaseLLMProvider
+
+SUGGESTIONS_MARKER = "---SUGGESTIONS---"
+
+# Disable proxy buffering (nginx) so tokens reach the client immediately
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _parse_suggestion_lines(suggestions_text: str) -> List[str]:
+    suggestions = []
+    # Parse lines starting with - or 1.
+    for line in suggestions_text.split("\n"):
+        clean = line.strip()
+        if clean.startswith("-") or clean.startswith("*"):
+            suggestions.append(clean[1:].strip())
+        elif len(clean) > 0 and clean[0].isdigit() and ". " in clean:
+            suggestions.append(clean.split(". ", 1)[1].strip())
+    return suggestions[:3]
+
+
+def parse_suggestions(raw_content: str) -> Tuple[str, List[str]]:
+    """Splits an LLM answer into (answer, follow-up questions)."""
+    answer = raw_content
+    suggestions: List[str] = []
+    if SUGGESTIONS_MARKER in raw_content:
+        parts = raw_content.split(SUGGESTIONS_MARKER)
+        answer = parts[0].strip()
+        suggestions = _parse_suggestion_lines(parts[1].strip())
+
+    # Fallback cleanup if LLM fails format but includes separator
+    answer = answer.replace(SUGGESTIONS_MARKER, "").strip()
+    return answer, suggestions
+
+
+class SuggestionSplitter:
+    """
+    Incremental counterpart of parse_suggestions() for token streams.
+
+    feed() returns the answer text that can be sent right away. Text that might
+    be the start of the marker is held back until the next token decides, and
+    everything after the marker is collected for finish().
+
+    Example:
+        >>> splitter = SuggestionSplitter()
+        >>> for delta in stream:
+        ...     send(splitter.feed(delta))
+        >>> tail, suggestions = splitter.finish()
+    """
+
+    def __init__(self):
+        self._pending = ""
+        self._suggestions_text = ""
+        self._in_suggestions = False
+
+    def feed(self, delta: str) -> str:
+        if self._in_suggestions:
+            self._suggestions_text += delta
+            return ""
+
+        self._pending += delta
+        idx = self._pending.find(SUGGESTIONS_MARKER)
+        if idx >= 0:
+            emit = self._pending[:idx]
+            self._suggestions_text = self._pending[idx + len(SUGGESTIONS_MARKER) :]
+            self._pending = ""
+            self._in_suggestions = True
+            return emit
+
+        # Hold back the longest suffix that is a prefix of the marker
+        hold = 0
+        for size in range(min(len(SUGGESTIONS_MARKER) - 1, len(self._pending)), 0, -1):
+            if SUGGESTIONS_MARKER.startswith(self._pending[-size:]):
+                hold = size
+                break
+        emit = self._pending[: len(self._pending) - hold]
+        self._pending = self._pending[len(emit) :]
+        return emit
+
+    def finish(self) -> Tuple[str, List[str]]:
+        """Returns (held-back answer text, parsed suggestions)."""
+        tail, self._pending = self._pending, ""
+        return tail, _parse_suggestion_lines(self._suggestions_text.strip())
+
+
+async def astream_text(
+    provider: BaseLLMProvider, prompt: str, **kwargs
+) -> AsyncIterator[str]:
+    """
+    Streams an answer from any provider. Sync-only providers run in a worker
+    thread and deliver the complete answer as one delta.
+    """
+    if isinstance(provider, AsyncBaseLLMProvider):
+        async for delta in provider.astream(prompt, **kwargs):
+            yield delta
+        return
+
+    response = await asyncio.to_thread(provider.generate, prompt, **kwargs)
+    if response.content:
+        yield response.content
@@ -1,13 +1,16 @@
 import asyncio
 import os
 import hashlib
-import json
-import time
 from pathlib import Path
 from datetime import datetime
-from playwright.async_api import async_playwright
+from typing import Optional
+import httpx
+from playwright.async_api import async_playwright, Browser
 
 
+from src.config_loader import settings
+from src.discovery.manifest_journal import ManifestJournal
+from src.discovery.rate_limit import AsyncHostRateLimiter
 from src.models.ministry_registry import MinistryRegistry
 
 
@@ -15,6 +18,10 @@ class EasyCrawler:
     """
     Systematischer Crawler für den Bundes-Formularschrank (Easy-Online).
     Unterstützt Kategorien-Scanning, Download und Hashing.
+
+    Mehrere Ministerien können parallel gecrawlt werden (crawl_all): Sie teilen
+    sich einen Browser (je ein Context pro Ministerium), einen gepoolten async
+    HTTP-Client und ein Rate-Limit pro Host.
     """
 
     BASE_URL = "https://foerderportal.bund.de/easy/"
@@ -30,6 +37,9 @@ class EasyCrawler:
         "t7": "Altvorhaben",
     }
 
+    USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    CHROMIUM_PATH = "/ms-playwright/chromium_headless_shell-1200/chrome-headless-shell-linux64/chrome-headless-shell"
+
     KNOWN_MINISTRIES = [
         "bmwe",
         "bmbfsfj",
@@ -54,69 +64,132 @@ class EasyCrawler:
         self.limit_per_cat = limit_per_cat
 
         self.raw_dir.mkdir(parents=True, exist_ok=True)
-        self.manifest = self._load_manifest()
+        # Every file is journaled as soon as it is done, so an interrupted
+        # crawl resumes where it stopped (see ManifestJournal)
+        self.journal = ManifestJournal(self.raw_dir, self.ministerium)
+        self.manifest = self.journal.load()
+        self.resume_since = None
 
     @classmethod
-    async def crawl_all(cls, output_dir: Path, limit_per_cat: int = None):
-        """Crawls all known ministries."""
-        print(f"🌍 Starting global crawl for {len(cls.KNOWN_MINISTRIES)} ministries...")
-
-        results = {}
-        for min_id in cls.KNOWN_MINISTRIES:
-            print(f"\n{'=' * 50}")
-            print(f"🏛️  Processing Ministry: {min_id}")
-            print(f"{'=' * 50}")
+    async def crawl_all(
+        cls, output_dir: Path, limit_per_cat: int = None, concurrency: int = None
+    ):
+        """Crawls all known ministries concurrently with one shared browser."""
+        concurrency = concurrency or settings.get(
+            "crawlers.easy_online.concurrency", 3
+        )
+        print(
+            f"🌍 Starting global crawl for {len(cls.KNOWN_MINISTRIES)} ministries "
+            f"({concurrency} parallel)..."
+        )
 
-            crawler = cls(output_dir, ministerium=min_id, limit_per_cat=limit_per_cat)
-            await crawler.run()
-            results[min_id] = "Success"
+        rate_limiter = cls._create_rate_limiter()
+        semaphore = asyncio.Semaphore(concurrency)
 
-            # Global rate limit between ministries
-            print("⏳ Cooldown 5s between ministries...")
-            time.sleep(5)
+        async with async_playwright() as p:
+            browser = await cls._launch_browser(p)
+            async with cls._create_http_client() as http_client:
+
+                async def crawl(min_id: str):
+                    async with semaphore:
+                        print(f"\n🏛️  Processing Ministry: {min_id}")
+                        try:
+                            crawler = cls(
+                                output_dir,
+                                ministerium=min_id,
+                                limit_per_cat=limit_per_cat,
+                            )
+                            await crawler.run(
+                                browser=browser,
+                                http_client=http_client,
+                                rate_limiter=rate_limiter,
+                            )
+                            return min_id, "Success"
+                        except Exception as e:
+                            print(f"❌ Crawl für {min_id} fehlgeschlagen: {e}")
+                            return min_id, f"Failed: {e}"
+
+                results = dict(
+                    await asyncio.gather(
+                        *(crawl(min_id) for min_id in cls.KNOWN_MINISTRIES)
+                    )
+                )
+            await browser.close()
 
         print("\n✅ Global crawl completed.")
         return results
 
-    def _load_manifest(self) -> dict:
-        if self.manifest_path.exists():
-            with open(self.manifest_path, "r", encoding="utf-8") as f:
-                try:
-                    return json.load(f)
-                except:
-                    pass
-        return {"ministerium": self.ministerium, "last_crawl": None, "files": {}}
-
-    def _save_manifest(self):
-        self.manifest["last_crawl"] = datetime.now().isoformat()
-        with open(self.manifest_path, "w", encoding="utf-8") as f:
-            json.dump(self.manifest, f, indent=2, ensure_ascii=False)
-
-    def _calculate_hash(self, file_path: Path) -> str:
-        sha256_hash = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
-
-    async def run(self):
-        async with async_playwright() as p:
-            print(f"🚀 Starte Crawler für Ministerium: {self.ministerium}")
-            browser = await p.chromium.launch(
-                headless=True,
-                executable_path="/ms-playwright/chromium_headless_shell-1200/chrome-headless-shell-linux64/chrome-headless-shell",
-            )
-            user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            context = await browser.new_context(user_agent=user_agent)
-            page = await context.new_page()
+    @classmethod
+    async def _launch_browser(cls, p) -> Browser:
+        return await p.chromium.launch(headless=True, executable_path=cls.CHROMIUM_PATH)
 
-            url = f"{self.BASE_URL}{self.START_PAGE}{self.ministerium_id}"
+    @classmethod
+    def _create_http_client(cls) -> httpx.AsyncClient:
+        max_connections = settings.get("crawlers.easy_online.max_connections", 8)
+        return httpx.AsyncClient(
+            headers={
+                "User-Agent": cls.USER_AGENT,
+                "Referer": "https://foerderportal.bund.de/easy/easy_index.php",
+            },
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=60,
+            follow_redirects=True,
+        )
 
+    @staticmethod
+    def _create_rate_limiter() -> AsyncHostRateLimiter:
+        return AsyncHostRateLimiter(
+            max_concurrency=settings.get("crawlers.easy_online.per_host_concurrency", 4),
+            min_interval=settings.get("crawlers.easy_online.per_host_delay", 0.5),
+        )
+
+    async def run(
+        self,
+        browser: Optional[Browser] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        rate_limiter: Optional[AsyncHostRateLimiter] = None,
+    ):
+        """
+        Crawls all categories of this ministry.
+
+        Browser, HTTP client and rate limiter can be shared across crawlers
+        (see crawl_all); missing ones are created for a standalone run.
+        """
+        if browser is None or http_client is None:
+            async with async_playwright() as p:
+                own_browser = browser or await self._launch_browser(p)
+                async with self._create_http_client() as own_client:
+                    await self.run(
+                        browser=own_browser,
+                        http_client=http_client or own_client,
+                        rate_limiter=rate_limiter,
+                    )
+                if browser is None:
+                    await own_browser.close()
+            return
+
+        rate_limiter = rate_limiter or self._create_rate_limiter()
+
+        print(f"🚀 Starte Crawler für Ministerium: {self.ministerium}")
+        if self.journal.resume_since:
+            print(f"   ↩️  Setze unterbrochenen Lauf vom {self.journal.resume_since} fort")
+        self.resume_since = self.journal.start_run()
+
+        context = await browser.new_context(user_agent=self.USER_AGENT)
+        page = await context.new_page()
+
+        url = f"{self.BASE_URL}{self.START_PAGE}{self.ministerium_id}"
+
+        try:
             for cat_id, cat_name in self.CATEGORIES.items():
-                print(f"\n📂 Scanne Kategorie: {cat_name}...")
+                print(f"\n📂 [{self.ministerium}] Scanne Kategorie: {cat_name}...")
 
                 try:
-                    await page.goto(url, wait_until="load")
+                    async with rate_limiter.slot(url):
+                        await page.goto(url, wait_until="load")
 
                     # The table exists but might be hidden.
                     # We look for the table element directly.
@@ -133,12 +206,11 @@ class EasyCrawler:
                     # We actually want all rows that have 3 columns (Nr, Title, File)
                     print(f"   📊 {len(rows)} Zeilen im DOM gefunden.")
 
-                    print(f"   📊 {len(rows)} Zeilen gefunden.")
-
                     cookies = await context.cookies()
                     session_cookies = {c["name"]: c["value"] for c in cookies}
 
                     processed_count = 0
+                    downloads = []
 
                     for i, row in enumerate(rows):
                         if (
@@ -166,85 +238,209 @@ class EasyCrawler:
                                     else f"{self.BASE_URL}{href}"
                                 )
 
-                                await self._download_file_requests(
-                                    full_url,
-                                    nr,
-                                    title,
-                                    filename,
-                                    cat_name,
-                                    session_cookies,
+                                # Downloads run concurrently; politeness is
+                                # enforced per host by the rate limiter.
+                                downloads.append(
+                                    self._download_file(
+                                        http_client,
+                                        rate_limiter,
+                                        full_url,
+                                        nr,
+                                        title,
+                                        filename,
+                                        cat_name,
+                                        session_cookies,
+                                    )
                                 )
-                                # Rate limiting per file
-                                time.sleep(1)
+
+                    await asyncio.gather(*downloads)
                 except Exception as e:
                     print(f"   ❌ Fehler in Kategorie {cat_name}: {e}")
 
-            self._save_manifest()
-            await browser.close()
-            print(
-                f"\n✅ Crawl abgeschlossen. Manifest gespeichert in {self.manifest_path}"
-            )
-
-    async def _download_file_requests(
-        self, url, nr, title, filename, category, cookies
+            self.manifest["last_crawl"] = datetime.now().isoformat()
+            self.journal.complete_run(self.manifest)
+        finally:
+            await context.close()
+
+        print(f"\n✅ Crawl abgeschlossen. Manifest gespeichert in {self.manifest_path}")
+
+    async def _download_file(
+        self,
+        http_client: httpx.AsyncClient,
+        rate_limiter: AsyncHostRateLimiter,
+        url,
+        nr,
+        title,
+        filename,
+        category,
+        cookies,
     ):
-        import requests
-
+        """
+        Downloads a form if it is new or changed since the last crawl.
+
+        Known files are revalidated with a conditional request (ETag /
+        Last-Modified). If the server ignores the validators, matching response
+        headers still let us skip the body. Otherwise the body is streamed to a
+        temp file and hashed while writing; the hash decides whether the file
+        actually changed. The manifest entry records the outcome in `changed`.
+        """
         cat_dir = self.raw_dir / category.split(" ")[0]
         cat_dir.mkdir(exist_ok=True)
         file_path = cat_dir / filename
 
-        if nr in self.manifest["files"] and file_path.exists():
-            print(f"   ⏭️  Überspringe: [{nr}] {title[:50]} (existiert bereits)")
+        previous = self.manifest["files"].get(nr)
+        if previous and not file_path.exists():
+            previous = None
+
+        if (
+            previous
+            and self.resume_since
+            and previous.get("last_seen", "") >= self.resume_since
+        ):
+            print(f"   ⏭️  Überspringe: [{nr}] {title[:50]} (in diesem Lauf bereits geprüft)")
             return
 
-        print(f"   📥 Downloade: [{nr}] {title[:50]}...")
+        headers = {}
+        if cookies:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in cookies.items())
+        if previous and previous.get("url") == url:
+            if previous.get("etag"):
+                headers["If-None-Match"] = previous["etag"]
+            if previous.get("last_modified"):
+                headers["If-Modified-Since"] = previous["last_modified"]
+
+        print(f"   📥 Prüfe: [{nr}] {title[:50]}...")
 
         try:
             retry_count = 5
-
-            def do_download():
-                headers = {
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                    "Referer": "https://foerderportal.bund.de/easy/easy_index.php",
-                }
-
-                for attempt in range(retry_count):
-                    try:
-                        response = requests.get(
-                            url, cookies=cookies, headers=headers, timeout=60
+            for attempt in range(retry_count):
+                try:
+                    async with rate_limiter.slot(url):
+                        result = await self._fetch_if_changed(
+                            http_client, url, headers, file_path, previous
                         )
-                        response.raise_for_status()
-                        with open(file_path, "wb") as f:
-                            f.write(response.content)
-                        return True
-                    except Exception as e:
-                        if attempt < retry_count - 1:
-                            wait_time = (attempt + 1) * 2
-                            print(
-                                f"      ⚠️  Retrying download ({attempt + 1}/{retry_count}) in {wait_time}s... Error: {e}"
-                            )
-                            time.sleep(wait_time)
-                        else:
-                            raise e
-                return False
-
-            success = await asyncio.to_thread(do_download)
-            if success:
-                file_hash = self._calculate_hash(file_path)
-                self.manifest["files"][nr] = {
-                    "nr": nr,
-                    "title": title,
-                    "filename": filename,
-                    "category": category,
-                    "url": url,
-                    "hash": file_hash,
-                    "last_seen": datetime.now().isoformat(),
-                }
-                print(f"      ✅ Erfolgreich: {filename} ({file_hash[:8]})")
+                    break
+                except Exception as e:
+                    if attempt < retry_count - 1:
+                        wait_time = (attempt + 1) * 2
+                        print(
+                            f"      ⚠️  Retrying download ({attempt + 1}/{retry_count}) in {wait_time}s... Error: {e}"
+                        )
+                        await asyncio.sleep(wait_time)
+                    else:
+                        raise e
+
+            now = datetime.now().isoformat()
+            entry = {
+                "nr": nr,
+                "title": title,
+                "filename": filename,
+                "category": category,
+                "url": url,
+                "hash": result["hash"],
+                "etag": result["etag"],
+                "last_modified": result["last_modified"],
+                "content_length": result["content_length"],
+                "last_seen": now,
+            }
+
+            if previous and result["hash"] == previous.get("hash"):
+                entry["changed"] = False
+                entry["changed_at"] = previous.get("changed_at")
+                entry["previous_hash"] = previous.get("previous_hash")
+                print(f"      ⏭️  Unverändert: {filename}")
+            else:
+                entry["changed"] = True
+                entry["changed_at"] = now
+                entry["previous_hash"] = previous.get("hash") if previous else None
+                label = "Aktualisiert" if previous else "Erfolgreich"
+                print(f"      ✅ {label}: {filename} ({result['hash'][:8]})")
+
+            self.manifest["files"][nr] = entry
+            await asyncio.to_thread(self.journal.append, entry)
         except Exception as e:
             print(f"      ❌ Download fehlgeschlagen: {e}")
 
+    async def _fetch_if_changed(
+        self,
+        http_client: httpx.AsyncClient,
+        url: str,
+        headers: dict,
+        file_path: Path,
+        previous: Optional[dict],
+    ) -> dict:
+        """
+        Performs one (conditional) GET. Returns hash and validators of the file
+        on disk afterwards; the body is only read if the file may have changed.
+        """
+        async with http_client.stream("GET", url, headers=headers) as response:
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            length_header = response.headers.get("Content-Length")
+            content_length = int(length_header) if length_header else None
+
+            if previous and (
+                response.status_code == 304
+                or self._validators_match(previous, etag, last_modified, content_length)
+            ):
+                return {
+                    "hash": previous["hash"],
+                    "etag": etag or previous.get("etag"),
+                    "last_modified": last_modified or previous.get("last_modified"),
+                    "content_length": content_length or previous.get("content_length"),
+                }
+
+            response.raise_for_status()
+
+            sha256_hash = hashlib.sha256()
+            size = 0
+            temp_path = file_path.with_name(file_path.name + ".part")
+            try:
+                # File I/O runs in worker threads so a slow disk does not stall
+                # the event loop (and with it all other concurrent downloads)
+                f = await asyncio.to_thread(open, temp_path, "wb")
+                try:
+                    async for block in response.aiter_bytes(65536):
+                        sha256_hash.update(block)
+                        await asyncio.to_thread(f.write, block)
+                        size += len(block)
+                finally:
+                    await asyncio.to_thread(f.close)
+
+                file_hash = sha256_hash.hexdigest()
+                if previous and file_hash == previous.get("hash"):
+                    await asyncio.to_thread(os.remove, temp_path)
+                else:
+                    await asyncio.to_thread(os.replace, temp_path, file_path)
+            finally:
+                if temp_path.exists():
+                    await asyncio.to_thread(os.remove, temp_path)
+
+        return {
+            "hash": file_hash,
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_length": content_length or size,
+        }
+
+    @staticmethod
+    def _validators_match(
+        previous: dict,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        content_length: Optional[int],
+    ) -> bool:
+        """True if a 200 response describes the same file as the manifest entry."""
+        if etag and previous.get("etag"):
+            return etag == previous["etag"]
+        if last_modified and previous.get("last_modified"):
+            return (
+                last_modified == previous["last_modified"]
+                and content_length is not None
+                and content_length == previous.get("content_length")
+            )
+        return False
+
 
 if __name__ == "__main__":
     import sys
@@ -265,13 +461,23 @@ if __name__ == "__main__":
         action="store_true",
         help="Crawl ALL known ministries",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Ministries crawled in parallel with --all",
+    )
 
     args = parser.parse_args()
 
     output = Path("/home/enving/Dev/Bund-ZuwendungsGraph/data")
 
     if args.all:
-        asyncio.run(EasyCrawler.crawl_all(output, limit_per_cat=args.limit))
+        asyncio.run(
+            EasyCrawler.crawl_all(
+                output, limit_per_cat=args.limit, concurrency=args.concurrency
+            )
+        )
     else:
         crawler = EasyCrawler(
             output, ministerium=args.ministry, limit_per_cat=args.limit
@@ -30,8 +30,7 @@ def import_core_laws():
     for law_abbr, search_abbr in core_laws.items():
         try:
             logger.info(f"Importing {law_abbr} (using {search_abbr})...")
-            xml_content = crawler.fetch_law(search_abbr)
-            norms = crawler.parse_law_xml(xml_content)
+            norms = crawler.crawl_law_hybrid(search_abbr)
 
             law_node_id = f"law_{law_abbr}"
 
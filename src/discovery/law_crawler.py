@@ -1,13 +1,21 @@
 import requests
 import zipfile
 import io
+import json
+import hashlib
+import os
+import re
 import xml.etree.ElementTree as ET
 import time
 import logging
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, IO, Iterable, Iterator, Optional
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 from src.config_loader import settings
+from src.discovery.rate_limit import HostRateLimiter
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -18,50 +26,251 @@ class LawCrawler:
     """
     Crawls and parses German federal laws from gesetze-im-internet.de
     Supports both XML (bulk) and HTML (targeted) parsing.
+
+    All requests go through one pooled keep-alive session and a per-host rate
+    limiter, so the crawler can be shared across threads (see crawl_laws).
+
+    XML archives are mirrored locally (data/law_mirror/{abbr}/) together with
+    their ETag/Last-Modified validators. Within mirror_max_age no request is
+    made at all; after that, refetches are conditional (304 = reuse mirror),
+    and parsed norms are reused as long as the archive hash is unchanged.
     """
 
-    def fetch_law_xml(self, abbr: str, retries: int = 3) -> Optional[str]:
-        """Fetch full XML zip for a law."""
-        base_url = settings.get(
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        base_url: Optional[str] = None,
+        html_base_url: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        per_host_concurrency: Optional[int] = None,
+        per_host_delay: Optional[float] = None,
+        mirror_dir: Optional[Path] = None,
+        mirror_max_age: Optional[float] = None,
+    ):
+        """
+        Args:
+            session: Optional shared session (a pooled one is created otherwise)
+            base_url: XML download URL template with {abbr} placeholder
+            html_base_url: Base URL for the HTML fallback (TOC and section pages)
+            max_workers: Threads for concurrent law and section fetching
+            per_host_concurrency: Max in-flight requests per host
+            per_host_delay: Min seconds between request starts per host
+            mirror_dir: Local mirror directory for law XML archives
+            mirror_max_age: Seconds a mirrored archive is trusted without revalidation
+        """
+        self.base_url = base_url or settings.get(
             "crawlers.laws.base_url",
             "https://www.gesetze-im-internet.de/{abbr}/xml.zip",
         )
-        url = base_url.format(abbr=abbr.lower())
+        self.html_base_url = (
+            html_base_url
+            or settings.get(
+                "crawlers.laws.html_base_url", "https://www.gesetze-im-internet.de"
+            )
+        ).rstrip("/")
+        self.max_workers = max_workers or settings.get("crawlers.laws.max_workers", 8)
+        self.rate_limiter = HostRateLimiter(
+            max_concurrency=per_host_concurrency
+            or settings.get("crawlers.laws.per_host_concurrency", 4),
+            min_interval=per_host_delay
+            if per_host_delay is not None
+            else settings.get("crawlers.laws.per_host_delay", 0.25),
+        )
+        self.session = session or self._create_session(self.max_workers)
+        self.mirror_dir = Path(
+            mirror_dir or settings.get("paths.law_mirror", "data/law_mirror")
+        )
+        self.mirror_max_age = (
+            mirror_max_age
+            if mirror_max_age is not None
+            else settings.get("crawlers.laws.mirror_max_age_hours", 24) * 3600
+        )
+
+    @staticmethod
+    def _create_session(pool_size: int) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _get(self, url: str, timeout: float, **kwargs) -> requests.Response:
+        """GET through the shared session, respecting per-host limits."""
+        with self.rate_limiter.slot(url):
+            return self.session.get(url, timeout=timeout, **kwargs)
+
+    @contextmanager
+    def _stream(self, url: str, timeout: float, **kwargs) -> Iterator[requests.Response]:
+        """Streaming GET that holds the per-host slot until the body is read."""
+        with self.rate_limiter.slot(url):
+            with self.session.get(url, timeout=timeout, stream=True, **kwargs) as response:
+                yield response
+
+    # --- Local mirror ---
+
+    def _mirror_path(self, abbr: str) -> Path:
+        return self.mirror_dir / re.sub(r"[^a-z0-9._-]", "_", abbr.lower())
+
+    def _load_mirror_meta(self, abbr: str) -> Dict[str, Any]:
+        meta_path = self._mirror_path(abbr) / "meta.json"
+        if meta_path.exists():
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.warning(f"Ignoring broken mirror metadata for {abbr}: {e}")
+        return {}
+
+    def _save_mirror_meta(self, abbr: str, meta: Dict[str, Any]):
+        mirror = self._mirror_path(abbr)
+        mirror.mkdir(parents=True, exist_ok=True)
+        temp_path = mirror / "meta.json.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(temp_path, mirror / "meta.json")
+
+    def sync_law_archive(self, abbr: str, retries: int = 3) -> Optional[Path]:
+        """
+        Ensures the mirrored xml.zip for a law is current and returns its path.
+
+        Uses no request while the mirror is fresh, a conditional GET otherwise,
+        and falls back to a stale mirror copy if the server is unreachable.
+        Returns None if the law has no XML archive.
+        """
+        mirror = self._mirror_path(abbr)
+        archive_path = mirror / "xml.zip"
+        meta = self._load_mirror_meta(abbr)
+        has_archive = archive_path.exists() and meta.get("sha256")
+
+        if has_archive and time.time() - meta.get("checked_at", 0) < self.mirror_max_age:
+            return archive_path
+
+        url = self.base_url.format(abbr=abbr.lower())
+        headers = {}
+        if has_archive and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if has_archive and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
 
         for attempt in range(retries):
             try:
-                response = requests.get(url, timeout=30)
-                if response.status_code == 200:
-                    with zipfile.ZipFile(io.BytesIO(response.content)) as z:
-                        xml_filename = [
-                            name for name in z.namelist() if name.endswith(".xml")
-                        ][0]
-                        with z.open(xml_filename) as f:
-                            return f.read().decode("utf-8")
-                elif response.status_code == 404:
-                    logger.warning(f"XML not found for {abbr} (404).")
-                    return None
-                else:
-                    logger.warning(
-                        f"Attempt {attempt + 1}: Received status {response.status_code}"
-                    )
+                with self._stream(url, timeout=30, headers=headers) as response:
+                    if response.status_code == 304 and has_archive:
+                        logger.info(f"Law {abbr} unchanged (304). Using mirror.")
+                        meta["checked_at"] = time.time()
+                        self._save_mirror_meta(abbr, meta)
+                        return archive_path
+                    elif response.status_code == 200:
+                        mirror.mkdir(parents=True, exist_ok=True)
+                        temp_path = mirror / "xml.zip.tmp"
+                        sha256_hash = hashlib.sha256()
+                        with open(temp_path, "wb") as f:
+                            for block in response.iter_content(chunk_size=65536):
+                                sha256_hash.update(block)
+                                f.write(block)
+                        os.replace(temp_path, archive_path)
+
+                        digest = sha256_hash.hexdigest()
+                        if digest != meta.get("sha256"):
+                            logger.info(f"Law {abbr} archive updated ({digest[:8]}).")
+                        meta.update(
+                            {
+                                "url": url,
+                                "etag": response.headers.get("ETag"),
+                                "last_modified": response.headers.get("Last-Modified"),
+                                "sha256": digest,
+                                "checked_at": time.time(),
+                            }
+                        )
+                        self._save_mirror_meta(abbr, meta)
+                        return archive_path
+                    elif response.status_code == 404:
+                        logger.warning(f"XML not found for {abbr} (404).")
+                        return None
+                    else:
+                        logger.warning(
+                            f"Attempt {attempt + 1}: Received status {response.status_code}"
+                        )
             except Exception as e:
                 logger.error(f"Attempt {attempt + 1}: Error fetching {abbr}: {e}")
 
             if attempt < retries - 1:
                 time.sleep(2**attempt)
 
+        if has_archive:
+            logger.warning(f"Revalidation failed for {abbr}. Using stale mirror copy.")
+            return archive_path
         return None
 
+    def _read_archive_xml(self, archive_path: Path) -> str:
+        with zipfile.ZipFile(archive_path) as z:
+            xml_filename = [name for name in z.namelist() if name.endswith(".xml")][0]
+            with z.open(xml_filename) as f:
+                return f.read().decode("utf-8")
+
+    def _iter_cached_norms(self, abbr: str) -> Optional[Iterator[Dict[str, Any]]]:
+        """Streams previously parsed norms if the archive hash is unchanged."""
+        meta = self._load_mirror_meta(abbr)
+        norms_path = self._mirror_path(abbr) / "norms.jsonl"
+        if not meta.get("sha256") or meta.get("norms_sha256") != meta["sha256"]:
+            return None
+        if not norms_path.exists():
+            return None
+
+        def read() -> Iterator[Dict[str, Any]]:
+            with open(norms_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+        return read()
+
+    def _iter_and_cache_norms(
+        self, abbr: str, archive_path: Path
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Streams norms out of the archive and writes them to the norms cache on
+        the fly. The cache is only committed once the archive was fully parsed.
+        """
+        digest = self._load_mirror_meta(abbr).get("sha256")
+        mirror = self._mirror_path(abbr)
+        temp_path = mirror / "norms.jsonl.tmp"
+        completed = False
+        try:
+            with open(temp_path, "w", encoding="utf-8") as cache_file:
+                for norm in self.iter_archive_norms(archive_path):
+                    cache_file.write(json.dumps(norm, ensure_ascii=False) + "\n")
+                    yield norm
+            completed = True
+        finally:
+            if completed:
+                os.replace(temp_path, mirror / "norms.jsonl")
+                meta = self._load_mirror_meta(abbr)
+                meta["norms_sha256"] = digest
+                self._save_mirror_meta(abbr, meta)
+            elif temp_path.exists():
+                os.remove(temp_path)
+
+    def fetch_law_xml(self, abbr: str, retries: int = 3) -> Optional[str]:
+        """Fetch full XML for a law (served from the local mirror when current)."""
+        archive_path = self.sync_law_archive(abbr, retries=retries)
+        if archive_path is None:
+            return None
+        try:
+            return self._read_archive_xml(archive_path)
+        except Exception as e:
+            logger.error(f"Could not read mirrored archive for {abbr}: {e}")
+            return None
+
     def fetch_law_html_toc(self, abbr: str) -> List[str]:
         """
         Fetches the Table of Contents (TOC) HTML page to find sub-links.
         Returns a list of URLs to individual sections (paragraphs).
         Example: https://www.gesetze-im-internet.de/vob_a/index.html
         """
-        url = f"https://www.gesetze-im-internet.de/{abbr.lower()}/index.html"
+        url = f"{self.html_base_url}/{abbr.lower()}/index.html"
         try:
-            response = requests.get(url, timeout=10)
+            response = self._get(url, timeout=10)
             if response.status_code != 200:
                 logger.warning(f"HTML TOC not found for {abbr}: {response.status_code}")
                 return []
@@ -111,7 +320,7 @@ class LawCrawler:
     def parse_law_html_section(self, url: str) -> Optional[Dict[str, Any]]:
         """Parses a single section HTML page."""
         try:
-            response = requests.get(url, timeout=5)
+            response = self._get(url, timeout=5)
             if response.status_code != 200:
                 return None
 
@@ -161,16 +370,24 @@ class LawCrawler:
             logger.error(f"Error parsing section {url}: {e}")
             return None
 
-    def crawl_law_hybrid(self, abbr: str) -> List[Dict[str, Any]]:
+    def iter_law_hybrid(self, abbr: str) -> Iterator[Dict[str, Any]]:
         """
-        Main entry point. Tries XML first, falls back to HTML crawling.
+        Streaming variant of crawl_law_hybrid(): yields norms while parsing,
+        so callers can build sections before the whole law is processed.
         """
-        # 1. Try XML
+        # 1. Try XML (mirror + conditional GET; parsing skipped if unchanged)
         logger.info(f"Trying XML download for {abbr}...")
-        xml_content = self.fetch_law_xml(abbr)
-        if xml_content:
+        archive_path = self.sync_law_archive(abbr)
+        if archive_path:
+            cached = self._iter_cached_norms(abbr)
+            if cached is not None:
+                logger.info(f"XML for {abbr} unchanged. Reusing parsed norms.")
+                yield from cached
+                return
+
             logger.info(f"XML found for {abbr}. Parsing...")
-            return self.parse_law_xml(xml_content)
+            yield from self._iter_and_cache_norms(abbr, archive_path)
+            return
 
         # 2. Fallback HTML
         logger.info(f"XML failed. Trying HTML crawl for {abbr}...")
@@ -180,47 +397,112 @@ class LawCrawler:
             raise Exception(f"Could not find law {abbr} via XML or HTML.")
 
         logger.info(f"Found {len(toc_links)} sections in HTML TOC. Crawling...")
-        norms = []
-        for i, link in enumerate(toc_links):
-            # Gentle crawling
-            if i > 0 and i % 10 == 0:
-                time.sleep(1)
+        # Politeness is enforced per host by the rate limiter, so sections can be
+        # fetched concurrently. map() keeps the TOC order.
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for norm in executor.map(self.parse_law_html_section, toc_links):
+                if norm:
+                    yield norm
 
-            norm = self.parse_law_html_section(link)
-            if norm:
-                norms.append(norm)
+    def crawl_law_hybrid(self, abbr: str) -> List[Dict[str, Any]]:
+        """
+        Main entry point. Tries XML first, falls back to HTML crawling.
+        """
+        return list(self.iter_law_hybrid(abbr))
 
-        return norms
+    def crawl_laws(self, abbrs: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Crawls several laws concurrently via crawl_law_hybrid().
 
-    def parse_law_xml(self, xml_content: str) -> List[Dict[str, Any]]:
-        root = ET.fromstring(xml_content.encode("utf-8"))
-        norms = []
+        Returns:
+            Dict abbr -> norms. Laws that could not be fetched are logged and omitted.
+        """
+        abbrs = list(dict.fromkeys(abbrs))
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        if not abbrs:
+            return results
 
-        for norm in root.findall(".//norm"):
-            metadaten = norm.find("metadaten")
-            textdaten = norm.find("textdaten")
+        def crawl(abbr: str):
+            try:
+                return abbr, self.crawl_law_hybrid(abbr)
+            except Exception as e:
+                logger.warning(f"Could not crawl law {abbr}: {e}")
+                return abbr, None
 
-            title = ""
-            norm_id = ""
-            if metadaten is not None:
-                titel_node = metadaten.find("titel")
-                title = titel_node.text if titel_node is not None else ""
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(abbrs))
+        ) as executor:
+            for abbr, norms in executor.map(crawl, abbrs):
+                if norms is not None:
+                    results[abbr] = norms
 
-                enbez_node = metadaten.find("enbez")
-                norm_id = enbez_node.text if enbez_node is not None else ""
+        return results
 
-            text_content = ""
-            if textdaten is not None:
-                text_node = textdaten.find("text")
-                if text_node is not None:
-                    text_content = "".join(text_node.itertext()).strip()
+    def parse_law_xml(self, xml_content: str) -> List[Dict[str, Any]]:
+        return list(self.iter_norms(io.BytesIO(xml_content.encode("utf-8"))))
+
+    def iter_archive_norms(self, archive_path: Path) -> Iterator[Dict[str, Any]]:
+        """Streams norms directly from the XML member of a law archive."""
+        with zipfile.ZipFile(archive_path) as z:
+            xml_filename = [name for name in z.namelist() if name.endswith(".xml")][0]
+            with z.open(xml_filename) as f:
+                yield from self.iter_norms(f)
 
-            if text_content:
-                norms.append(
-                    {"paragraph": norm_id, "title": title, "content": text_content}
-                )
+    def iter_norms(self, stream: IO[bytes]) -> Iterator[Dict[str, Any]]:
+        """
+        Incrementally parses law XML with iterparse and yields one dict per norm.
 
-        return norms
+        Each <norm> is cleared (and detached from the root) once processed, so
+        peak memory stays flat regardless of the size of the law.
+        """
+        root = None
+        depth = 0
+        for event, elem in ET.iterparse(stream, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = elem
+                if elem.tag == "norm":
+                    depth += 1
+                continue
+
+            if elem.tag != "norm":
+                continue
+            depth -= 1
+
+            norm = self._norm_to_dict(elem)
+            if norm:
+                yield norm
+
+            # Nested norms are handled by their own end event; only free
+            # memory once we are back at the outermost norm.
+            if depth == 0:
+                elem.clear()
+                if root is not None:
+                    root.clear()
+
+    @staticmethod
+    def _norm_to_dict(norm: ET.Element) -> Optional[Dict[str, Any]]:
+        metadaten = norm.find("metadaten")
+        textdaten = norm.find("textdaten")
+
+        title = ""
+        norm_id = ""
+        if metadaten is not None:
+            titel_node = metadaten.find("titel")
+            title = titel_node.text if titel_node is not None else ""
+
+            enbez_node = metadaten.find("enbez")
+            norm_id = enbez_node.text if enbez_node is not None else ""
+
+        text_content = ""
+        if textdaten is not None:
+            text_node = textdaten.find("text")
+            if text_node is not None:
+                text_content = "".join(text_node.itertext()).strip()
+
+        if not text_content:
+            return None
+        return {"paragraph": norm_id, "title": title, "content": text_content}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,233 @@
+"""
+Crash-safe crawler manifest.
+
+The manifest of a ministry is stored as a snapshot (manifest.json) plus an
+append-only journal (manifest.journal.jsonl). Every downloaded or revalidated
+file is appended to the journal and fsync'ed right away, so a crash never
+loses more than the file in flight. At the end of a crawl the journal is
+compacted into the snapshot.
+
+Journal lines are either file entries ({"nr": ..., "hash": ..., ...}) or run
+markers ({"event": "run_started" | "run_completed", "at": iso-timestamp}).
+A run_started without a matching run_completed means the last crawl stopped
+early; the crawler resumes it by skipping files already seen in that run.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ManifestJournal:
+    """
+    Snapshot + append-only journal for one crawler manifest.
+
+    Example:
+        >>> journal = ManifestJournal(Path("data/raw/bmwk"), "BMWK")
+        >>> manifest = journal.load()
+        >>> journal.append(entry)            # after every file
+        >>> journal.compact(manifest)        # at the end of the run
+    """
+
+    SNAPSHOT_NAME = "manifest.json"
+    JOURNAL_NAME = "manifest.journal.jsonl"
+
+    def __init__(self, raw_dir: Path, ministerium: str = "unbekannt"):
+        self.raw_dir = raw_dir
+        self.ministerium = ministerium
+        self.snapshot_path = raw_dir / self.SNAPSHOT_NAME
+        self.journal_path = raw_dir / self.JOURNAL_NAME
+        self.resume_since: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _load_snapshot(self) -> Dict[str, Any]:
+        if self.snapshot_path.exists():
+            try:
+                with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.warning(f"ManifestJournal: Unreadable snapshot {self.snapshot_path}: {e}")
+        return {"ministerium": self.ministerium, "last_crawl": None, "files": {}}
+
+    @staticmethod
+    def _parse_line(line: str) -> Optional[Dict[str, Any]]:
+        # A torn last line (crash mid-write) is ignored
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError:
+            return None
+
+    def load(self, repair: bool = True) -> Dict[str, Any]:
+        """
+        Returns snapshot + replayed journal. Sets resume_since to the start of
+        an unfinished crawl run, if any.
+
+        Readers that do not own the journal (e.g. a pipeline following a live
+        crawl) pass repair=False: the torn-tail repair writes to the file and
+        is only safe for the process that appends to it.
+        """
+        manifest = self._load_snapshot()
+        manifest.setdefault("files", {})
+        self.resume_since = None
+
+        if self.journal_path.exists():
+            if repair:
+                self._repair_torn_tail()
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    record = self._parse_line(line)
+                    if not record:
+                        continue
+                    event = record.get("event")
+                    if event == "run_started":
+                        self.resume_since = record["at"]
+                        if record.get("ministerium"):
+                            manifest["ministerium"] = record["ministerium"]
+                    elif event == "run_completed":
+                        self.resume_since = None
+                        manifest["last_crawl"] = record["at"]
+                    elif "nr" in record:
+                        manifest["files"][record["nr"]] = record
+
+        return manifest
+
+    def _repair_torn_tail(self):
+        """Terminates a torn last line so the next append starts a fresh line."""
+        with self._lock, open(self.journal_path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _append_record(self, record: Dict[str, Any]):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def append(self, entry: Dict[str, Any]):
+        """Durably records one file entry."""
+        self._append_record(entry)
+
+    def start_run(self) -> str:
+        """Marks the start of a crawl run unless an unfinished run is resumed."""
+        if self.resume_since:
+            return self.resume_since
+        self.resume_since = datetime.now().isoformat()
+        self._append_record(
+            {
+                "event": "run_started",
+                "at": self.resume_since,
+                "ministerium": self.ministerium,
+            }
+        )
+        return self.resume_since
+
+    def complete_run(self, manifest: Dict[str, Any]):
+        self._append_record(
+            {"event": "run_completed", "at": datetime.now().isoformat()}
+        )
+        self.resume_since = None
+        self.compact(manifest)
+
+    def compact(self, manifest: Dict[str, Any]):
+        """Writes the snapshot atomically, then truncates the journal."""
+        if not manifest.get("last_crawl"):
+            manifest["last_crawl"] = datetime.now().isoformat()
+        with self._lock:
+            temp_path = self.snapshot_path.with_suffix(".tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.snapshot_path)
+            # Only safe to drop journal lines once the snapshot is on disk.
+            # Replacing (instead of truncating) gives the journal a new inode,
+            # which is how tail() notices the compaction.
+            empty_path = self.journal_path.with_suffix(".tmp")
+            open(empty_path, "wb").close()
+            os.replace(empty_path, self.journal_path)
+
+    def tail(
+        self,
+        poll_interval: float = 1.0,
+        stop: Optional[Callable[[], bool]] = None,
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yields (nr, entry) for every file in the manifest and then follows the
+        journal while a crawl appends to it. Stops once stop() returns True and
+        no new lines are pending; without stop it returns after the current
+        state has been consumed.
+
+        Compaction replaces the journal; the tail then re-reads the snapshot
+        and yields entries it has not seen with that hash yet.
+        """
+        seen: Dict[str, Optional[str]] = {}
+
+        def unseen(entries: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+            for nr, entry in entries.items():
+                if seen.get(nr) != entry.get("hash"):
+                    seen[nr] = entry.get("hash")
+                    yield nr, entry
+
+        offset = 0
+        pending = b""
+        inode = None
+        started = False
+        # Snapshot entries not yielded yet; merged with the first journal read
+        # so that superseded snapshot entries are never emitted
+        snapshot: Optional[Dict[str, Any]] = None
+        while True:
+            try:
+                stat = self.journal_path.stat()
+                size, current_inode = stat.st_size, stat.st_ino
+            except FileNotFoundError:
+                size, current_inode = 0, inode
+
+            if snapshot is None and (
+                not started or current_inode != inode or size < offset
+            ):
+                # Start, or the journal was compacted into the snapshot
+                snapshot = self._load_snapshot().get("files", {})
+                inode, offset, pending = current_inode, 0, b""
+                started = True
+                continue
+
+            if size > offset:
+                with open(self.journal_path, "rb") as f:
+                    f.seek(offset)
+                    data = f.read(size - offset)
+                offset += len(data)
+                lines = (pending + data).split(b"\n")
+                # Last element is an incomplete line (or b"") - keep it for later
+                pending = lines.pop()
+                entries = dict(snapshot or {})
+                snapshot = None
+                for line in lines:
+                    record = self._parse_line(line.decode("utf-8", errors="replace"))
+                    if record and "nr" in record:
+                        entries[record["nr"]] = record
+                yield from unseen(entries)
+                continue
+
+            if snapshot is not None:
+                yield from unseen(snapshot)
+                snapshot = None
+                continue
+
+            if stop is None or stop():
+                return
+            time.sleep(poll_interval)
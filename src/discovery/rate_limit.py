@@ -0,0 +1,98 @@
+"""
+Per-host politeness for crawlers.
+
+Limits are tracked per host (netloc) rather than globally, so crawling
+gesetze-im-internet.de stays polite while requests to other hosts proceed
+in parallel.
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Dict, Iterator
+from urllib.parse import urlparse
+
+
+class HostRateLimiter:
+    """
+    Thread-safe per-host concurrency cap plus minimum interval between request starts.
+
+    Example:
+        >>> limiter = HostRateLimiter(max_concurrency=4, min_interval=0.25)
+        >>> with limiter.slot("https://www.gesetze-im-internet.de/bho/index.html"):
+        ...     session.get(url)
+    """
+
+    def __init__(self, max_concurrency: int = 4, min_interval: float = 0.25):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_interval = max(0.0, min_interval)
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def _semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(
+                    self.max_concurrency
+                )
+            return self._semaphores[host]
+
+    def _reserve_start(self, host: str) -> float:
+        """Reserves the next free start time for this host and returns the wait."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, 0.0))
+            self._next_start[host] = start + self.min_interval
+            return start - now
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        host = self.host_of(url)
+        semaphore = self._semaphore(host)
+        semaphore.acquire()
+        try:
+            wait = self._reserve_start(host)
+            if wait > 0:
+                time.sleep(wait)
+            yield
+        finally:
+            semaphore.release()
+
+
+class AsyncHostRateLimiter:
+    """
+    asyncio counterpart of HostRateLimiter. Waiting uses asyncio.sleep, so the
+    event loop keeps serving other coroutines while a host is throttled.
+
+    Example:
+        >>> limiter = AsyncHostRateLimiter(max_concurrency=4, min_interval=0.5)
+        >>> async with limiter.slot(url):
+        ...     await client.get(url)
+    """
+
+    def __init__(self, max_concurrency: int = 4, min_interval: float = 0.5):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_interval = max(0.0, min_interval)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        host = HostRateLimiter.host_of(url)
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.max_concurrency)
+
+        async with self._semaphores[host]:
+            # Single event loop: reserving the start time needs no lock
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, 0.0))
+            self._next_start[host] = start + self.min_interval
+            if start > now:
+                await asyncio.sleep(start - now)
+            yield
@@ -6,6 +6,7 @@ import json
 import os
 import networkx as nx
 import re
+import threading
 from src.models.schemas import (
     ExpandContextRequest,
     ExpandContextResponse,
@@ -39,6 +40,8 @@ class ComplianceMapper:
         self.on_demand_enabled = on_demand_enabled
         self.failed_crawls = set()  # Cache for 404s
         self.newly_crawled_ids = set()  # Track for current session
+        self._law_crawler: Optional[LawCrawler] = None  # Shared pooled session
+        self._import_lock = threading.Lock()
 
         # Load external concepts
         self.config_path = config_path or Path("config/compliance_concepts.json")
@@ -78,78 +81,102 @@ class ComplianceMapper:
         if abbr in self.failed_crawls:
             return None
 
-        logger.info(f"⚡ ON-DEMAND: Triggering crawl for missing law '{abbr}'")
-
-        try:
-            crawler = LawCrawler()
-            norms = crawler.crawl_law_hybrid(abbr.lower())
-
-            if not norms:
-                logger.warning(f"On-demand crawl failed for {abbr}")
-                self.failed_crawls.add(abbr)
+        law_id = f"law_{abbr}"
+        # expand_context runs concurrently on the executor: the graph file is
+        # read, extended and written back, so imports must not interleave
+        with self._import_lock:
+            # Another request may have imported (or failed) it meanwhile
+            if law_id in self.graph:
+                return law_id
+            if abbr in self.failed_crawls:
                 return None
 
-            logger.info(f"Crawl successful. Imported {len(norms)} sections for {abbr}")
-
-            # Use GraphBuilder to update persistent graph
-            builder = GraphBuilder()
-            if self.graph_path.exists():
-                builder.load_graph(self.graph_path)
-
-            law_id = f"law_{abbr}"
-            builder.add_law(
-                law_id,
-                {
-                    "title": f"Gesetz: {abbr}",
-                    "kuerzel": abbr,
-                    "category": "Gesetz",
-                    "source": "On-demand Crawl",
-                },
-            )
+            logger.info(f"⚡ ON-DEMAND: Triggering crawl for missing law '{abbr}'")
 
-            for i, norm in enumerate(norms):
-                p_clean = (
-                    norm["paragraph"]
-                    .replace(" ", "_")
-                    .replace("§", "S")
-                    .replace("(", "")
-                    .replace(")", "")
-                )
-                chunk_id = f"{law_id}_{p_clean}"
-                if not norm["paragraph"]:
-                    chunk_id = f"{law_id}_chunk_{i}"
+            try:
+                if self._law_crawler is None:
+                    self._law_crawler = LawCrawler()
 
-                builder.add_chunk(
+                # Use GraphBuilder to update persistent graph
+                builder = GraphBuilder()
+                if self.graph_path.exists():
+                    builder.load_graph(self.graph_path)
+
+                builder.add_law(
                     law_id,
-                    chunk_id,
                     {
-                        "text": norm["content"],
-                        "paragraph": norm["paragraph"],
-                        "title": f"{abbr} {norm['paragraph']} {norm['title']}",
-                        "section_type": "law_section",
-                        "type": "chunk",
+                        "title": f"Gesetz: {abbr}",
+                        "kuerzel": abbr,
+                        "category": "Gesetz",
+                        "source": "On-demand Crawl",
                     },
                 )
 
-            builder.create_reference_edges()
-            builder.save_graph(self.graph_path)
+                # Norms are streamed, so sections are built while the law is still parsed
+                imported = 0
+                for i, norm in enumerate(self._law_crawler.iter_law_hybrid(abbr.lower())):
+                    p_clean = (
+                        norm["paragraph"]
+                        .replace(" ", "_")
+                        .replace("§", "S")
+                        .replace("(", "")
+                        .replace(")", "")
+                    )
+                    chunk_id = f"{law_id}_{p_clean}"
+                    if not norm["paragraph"]:
+                        chunk_id = f"{law_id}_chunk_{i}"
+
+                    builder.add_chunk(
+                        law_id,
+                        chunk_id,
+                        {
+                            "text": norm["content"],
+                            "paragraph": norm["paragraph"],
+                            "title": f"{abbr} {norm['paragraph']} {norm['title']}",
+                            "section_type": "law_section",
+                            "type": "chunk",
+                        },
+                    )
+                    imported += 1
+
+                if not imported:
+                    logger.warning(f"On-demand crawl failed for {abbr}")
+                    self.failed_crawls.add(abbr)
+                    return None
 
-            # Update vector store if available
-            if self.vector_store:
-                logger.info("Updating vector store with new nodes...")
-                try:
-                    self.vector_store.add_chunks_from_graph(self.graph_path)
-                except Exception as ve:
-                    logger.error(f"Failed to update vector store: {ve}")
+                logger.info(f"Crawl successful. Imported {imported} sections for {abbr}")
 
-            # Reload local graph
-            self._load_graph()
-            return law_id
+                builder.create_reference_edges()
+                builder.save_graph(self.graph_path)
 
-        except Exception as e:
-            logger.error(f"Error during on-demand import of {abbr}: {e}")
-            self.failed_crawls.add(abbr)
-            return None
+                # Update vector store if available
+                if self.vector_store:
+                    logger.info("Updating vector store with new nodes...")
+                    try:
+                        self.vector_store.add_chunks_from_graph(self.graph_path)
+                    except Exception as ve:
+                        logger.error(f"Failed to update vector store: {ve}")
+
+                # Reload local graph
+                self._load_graph()
+                return law_id
+
+            except Exception as e:
+                logger.error(f"Error during on-demand import of {abbr}: {e}")
+                self.failed_crawls.add(abbr)
+                return None
+
+    def reload(self, graph: Optional[nx.MultiDiGraph] = None):
+        """
+        Swaps in a new graph without interrupting requests: either one that was
+        already loaded (e.g. by HybridSearchEngine.reload, avoiding a second
+        copy) or a fresh load from graph_path.
+        """
+        if graph is None:
+            self._load_graph()
+        else:
+            self.graph = graph
+            logger.info(f"Swapped in graph with {len(self.graph.nodes)} nodes.")
 
     def _load_graph(self):
         if self.graph_path.exists():
@@ -1,29 +1,106 @@
 import networkx as nx
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Set, Tuple
 from pathlib import Path
 import json
+import os
 
 
 class GraphBuilder:
     """
     Builds a Knowledge Graph using NetworkX.
+
+    Reference resolution is incremental: the builder tracks nodes that were
+    added or changed since the last create_reference_edges() pass ("dirty set")
+    and keeps a persistent set of edge keys (u, v, relation), so a pass only
+    touches new or changed chunks and documents.
     """
 
     def __init__(self):
         self.graph = nx.MultiDiGraph()
+        self._reset_indexes()
+
+    def _reset_indexes(self):
+        # (u, v, relation) of every edge in the graph
+        self._edge_keys: Set[Tuple[str, str, str]] = set()
+        # kuerzel -> document node id (first document wins)
+        self._kuerzel_map: Dict[str, str] = {}
+        # regulation kuerzel -> chunks citing it (resolved once the document appears)
+        self._regulation_citers: Dict[str, Set[str]] = {}
+        self._dirty_chunks: Set[str] = set()
+        self._dirty_documents: Set[str] = set()
+
+    @staticmethod
+    def _is_type(data: Dict[str, Any], node_type: str) -> bool:
+        return data.get("type") == node_type or data.get("node_type") == node_type
+
+    def _add_edge_once(self, u: str, v: str, relation: str) -> bool:
+        key = (u, v, relation)
+        if key in self._edge_keys:
+            return False
+        self.graph.add_edge(u, v, relation=relation)
+        self._edge_keys.add(key)
+        return True
+
+    def _mark_node(self, node_id: str):
+        data = self.graph.nodes[node_id]
+        if self._is_type(data, "chunk"):
+            self._dirty_chunks.add(node_id)
+        elif self._is_type(data, "document"):
+            self._dirty_documents.add(node_id)
 
     def add_law(self, law_id: str, metadata: Dict[str, Any]):
         self.graph.add_node(law_id, node_type="law", **metadata)
 
     def add_document(self, doc_id: str, metadata: Dict[str, Any]):
         self.graph.add_node(doc_id, node_type="document", **metadata)
+        self._dirty_documents.add(doc_id)
 
     def add_chunk(self, doc_id: str, chunk_id: str, chunk_data: Dict[str, Any]):
         # Ensure we don't pass node_type twice
         data = chunk_data.copy()
         data.pop("node_type", None)
         self.graph.add_node(chunk_id, node_type="chunk", **data)
-        self.graph.add_edge(doc_id, chunk_id, relation="HAS_CHUNK")
+        self._add_edge_once(doc_id, chunk_id, "HAS_CHUNK")
+        self._dirty_chunks.add(chunk_id)
+
+    def remove_chunks(self, doc_id: str) -> List[str]:
+        """
+        Removes all chunks of a document (e.g. before re-ingesting a changed PDF)
+        and returns their ids so callers can drop them from other indexes too.
+        """
+        if doc_id not in self.graph:
+            return []
+
+        chunk_ids = [
+            v
+            for _, v, edata in self.graph.out_edges(doc_id, data=True)
+            if edata.get("relation") == "HAS_CHUNK"
+            and self._is_type(self.graph.nodes[v], "chunk")
+        ]
+        removed = set(chunk_ids)
+        if not removed:
+            return []
+
+        # Only the removed chunks' own edges and citation targets are touched
+        for edges in (
+            self.graph.in_edges(chunk_ids, data="relation"),
+            self.graph.out_edges(chunk_ids, data="relation"),
+        ):
+            for key in edges:
+                self._edge_keys.discard(key)
+        for chunk_id in chunk_ids:
+            for target, kind in self._expected_references(chunk_id):
+                if kind == "regulation" and target in self._regulation_citers:
+                    self._regulation_citers[target].discard(chunk_id)
+        self._dirty_chunks -= removed
+        self.graph.remove_nodes_from(chunk_ids)
+        return chunk_ids
+
+    def mark_dirty(self, node_ids: List[str]):
+        """Flags nodes changed outside of add_* for the next reference pass."""
+        for node_id in node_ids:
+            if node_id in self.graph:
+                self._mark_node(node_id)
 
     def save_graph(self, output_path: Path):
         """
@@ -31,8 +108,11 @@ class GraphBuilder:
         """
         # Using JSON format for better compatibility with RAG tools
         data = nx.node_link_data(self.graph)
-        with open(output_path, "w", encoding="utf-8") as f:
+        # Atomic write: readers never see a half-written graph
+        temp_path = output_path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, output_path)
 
     def load_graph(self, input_path: Path):
         """
@@ -42,53 +122,97 @@ class GraphBuilder:
             with open(input_path, "r", encoding="utf-8") as f:
                 data = json.load(f)
                 self.graph = nx.node_link_graph(data)
-
-    def create_reference_edges(self):
+            self._index_graph()
+
+    def _expected_references(self, chunk_id: str) -> List[Tuple[str, str]]:
+        """Returns (target_id, kind) for every citation of a chunk."""
+        refs = []
+        for cit in self.graph.nodes[chunk_id].get("citations") or []:
+            target = cit["target"]
+            if cit["type"] == "regulation":
+                refs.append((target, "regulation"))
+            elif cit["type"] == "law":
+                refs.append((f"law_{target}", "law"))
+        return refs
+
+    def _index_graph(self):
         """
-        Iterates over all chunks and creates REFERENCES edges based on extracted citations.
-        Also creates stub-nodes for external laws (BHO, etc.).
+        Rebuilds edge keys and lookup maps after loading a graph.
+        Chunks whose citations are not fully linked yet (e.g. a run that crashed
+        before its reference pass) are marked dirty so the next pass repairs them.
         """
-        kuerzel_map = {}
+        self._reset_indexes()
+
+        for u, v, edata in self.graph.edges(data=True):
+            self._edge_keys.add((u, v, edata.get("relation")))
+
         for node_id, data in self.graph.nodes(data=True):
-            if data.get("type") == "document" and data.get("kuerzel"):
+            if self._is_type(data, "document") and data.get("kuerzel"):
                 k = data["kuerzel"].strip()
-                if k and k not in kuerzel_map:
-                    kuerzel_map[k] = node_id
-
-        new_edges = []
-        external_nodes = {}
+                if k and k not in self._kuerzel_map:
+                    self._kuerzel_map[k] = node_id
 
         for node_id, data in self.graph.nodes(data=True):
-            if data.get("type") == "chunk" and "citations" in data:
-                for cit in data["citations"]:
-                    target = cit["target"]
-
-                    if cit["type"] == "regulation":
-                        if target in kuerzel_map:
-                            new_edges.append(
-                                (node_id, kuerzel_map[target], "REFERENCES")
-                            )
-
-                    elif cit["type"] == "law":
-                        law_id = f"law_{target}"
-                        if law_id not in self.graph and law_id not in external_nodes:
-                            external_nodes[law_id] = {
-                                "type": "external",
-                                "title": f"Gesetz: {target}",
-                                "kuerzel": target,
-                            }
-                        new_edges.append((node_id, law_id, "REFERENCES"))
-
-        for eid, edata in external_nodes.items():
-            self.graph.add_node(eid, **edata)
-
-        for u, v, rel in new_edges:
-            exists = False
-            if self.graph.has_edge(u, v):
-                for key, edata in self.graph.get_edge_data(u, v).items():
-                    if edata.get("relation") == rel:
-                        exists = True
-                        break
-
-            if not exists:
-                self.graph.add_edge(u, v, relation=rel)
+            if not (self._is_type(data, "chunk") and data.get("citations")):
+                continue
+            for target, kind in self._expected_references(node_id):
+                if kind == "regulation":
+                    self._regulation_citers.setdefault(target, set()).add(node_id)
+                    doc_id = self._kuerzel_map.get(target)
+                    if doc_id and (node_id, doc_id, "REFERENCES") not in self._edge_keys:
+                        self._dirty_chunks.add(node_id)
+                elif (node_id, target, "REFERENCES") not in self._edge_keys:
+                    self._dirty_chunks.add(node_id)
+
+    def create_reference_edges(self, full: bool = False):
+        """
+        Creates REFERENCES edges based on extracted citations of dirty chunks.
+        Also creates stub-nodes for external laws (BHO, etc.).
+
+        Args:
+            full: Re-resolve every chunk in the graph instead of only the dirty set.
+        """
+        if full:
+            self._index_graph()
+            for node_id, data in self.graph.nodes(data=True):
+                if self._is_type(data, "chunk"):
+                    self._dirty_chunks.add(node_id)
+                elif self._is_type(data, "document"):
+                    self._dirty_documents.add(node_id)
+
+        # 1. New or changed documents: register kuerzel and link existing citers
+        for doc_id in self._dirty_documents:
+            if doc_id not in self.graph:
+                continue
+            data = self.graph.nodes[doc_id]
+            if not (self._is_type(data, "document") and data.get("kuerzel")):
+                continue
+            k = data["kuerzel"].strip()
+            if k and k not in self._kuerzel_map:
+                self._kuerzel_map[k] = doc_id
+                for chunk_id in self._regulation_citers.get(k, ()):
+                    self._add_edge_once(chunk_id, doc_id, "REFERENCES")
+
+        # 2. New or changed chunks: resolve their own citations
+        for chunk_id in self._dirty_chunks:
+            if chunk_id not in self.graph:
+                continue
+            for target, kind in self._expected_references(chunk_id):
+                if kind == "regulation":
+                    self._regulation_citers.setdefault(target, set()).add(chunk_id)
+                    if target in self._kuerzel_map:
+                        self._add_edge_once(
+                            chunk_id, self._kuerzel_map[target], "REFERENCES"
+                        )
+                else:
+                    if target not in self.graph:
+                        self.graph.add_node(
+                            target,
+                            type="external",
+                            title=f"Gesetz: {target[len('law_'):]}",
+                            kuerzel=target[len("law_") :],
+                        )
+                    self._add_edge_once(chunk_id, target, "REFERENCES")
+
+        self._dirty_chunks.clear()
+        self._dirty_documents.clear()
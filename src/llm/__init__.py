@@ -6,6 +6,6 @@ Provider is configured via .env file with LLM_PROVIDER variable.
 """
 
 from .provider_factory import get_llm_provider
-from .base_provider import BaseLLMProvider
+from .base_provider import AsyncBaseLLMProvider, BaseLLMProvider
 
-__all__ = ["get_llm_provider", "BaseLLMProvider"]
+__all__ = ["get_llm_provider", "BaseLLMProvider", "AsyncBaseLLMProvider"]
@@ -4,15 +4,17 @@ Anthropic Claude LLM Provider
 
 import json
 import logging
+import httpx
 import requests
-from typing import List, Dict, Any
+from typing import AsyncIterator, Iterator, List, Dict, Any, Optional, Tuple
 
-from .base_provider import BaseLLMProvider, Message, LLMResponse
+from .base_provider import AsyncBaseLLMProvider, Message, LLMResponse
+from .http_client import aiter_sse_data, get_async_client, get_session, iter_sse_data
 
 logger = logging.getLogger(__name__)
 
 
-class AnthropicProvider(BaseLLMProvider):
+class AnthropicProvider(AsyncBaseLLMProvider):
     """
     Anthropic Claude API provider.
 
@@ -31,6 +33,7 @@ class AnthropicProvider(BaseLLMProvider):
         self.api_url = api_url
         self.timeout = timeout
         self.api_version = kwargs.get("api_version", "2023-06-01")
+        self.session = get_session()
 
     def generate(
         self,
@@ -57,7 +60,23 @@ class AnthropicProvider(BaseLLMProvider):
         json_prompt = f"{prompt}\n\nRespond ONLY with valid JSON. No additional text."
 
         response = self.generate(json_prompt, max_tokens=max_tokens, temperature=0.0, **kwargs)
+        return self._parse_json(response)
 
+    async def agenerate_json(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        **kwargs
+    ) -> Dict[str, Any]:
+        json_prompt = f"{prompt}\n\nRespond ONLY with valid JSON. No additional text."
+
+        response = await self.agenerate(
+            json_prompt, max_tokens=max_tokens, temperature=0.0, **kwargs
+        )
+        return self._parse_json(response)
+
+    @staticmethod
+    def _parse_json(response: LLMResponse) -> Dict[str, Any]:
         try:
             # Try to extract JSON from response
             content = response.content.strip()
@@ -77,14 +96,13 @@ class AnthropicProvider(BaseLLMProvider):
             logger.error(f"Response content: {response.content}")
             raise
 
-    def chat(
+    def _request(
         self,
         messages: List[Message],
-        max_tokens: int = 500,
-        temperature: float = 0.7,
+        max_tokens: int,
+        temperature: float,
         **kwargs
-    ) -> LLMResponse:
-        """Chat completion with message history."""
+    ) -> Tuple[Dict[str, str], Dict[str, Any]]:
         headers = {
             "x-api-key": self.api_key,
             "anthropic-version": self.api_version,
@@ -115,16 +133,10 @@ class AnthropicProvider(BaseLLMProvider):
         if system_message:
             payload["system"] = system_message
 
-        try:
-            response = requests.post(
-                self.api_url,
-                headers=headers,
-                json=payload,
-                timeout=self.timeout
-            )
-            response.raise_for_status()
+        return headers, payload
 
-            result = response.json()
+    def _parse_chat(self, result: Dict[str, Any]) -> LLMResponse:
+        try:
             content_block = result["content"][0]
 
             return LLMResponse(
@@ -133,12 +145,126 @@ class AnthropicProvider(BaseLLMProvider):
                 tokens_used=result.get("usage", {}).get("output_tokens"),
                 finish_reason=result.get("stop_reason")
             )
+        except KeyError as e:
+            logger.error(f"Unexpected Anthropic response format: {e}")
+            raise
+
+    def chat(
+        self,
+        messages: List[Message],
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> LLMResponse:
+        """Chat completion with message history."""
+        headers, payload = self._request(messages, max_tokens, temperature, **kwargs)
 
+        try:
+            response = self.session.post(
+                self.api_url,
+                headers=headers,
+                json=payload,
+                timeout=self.timeout
+            )
+            response.raise_for_status()
         except requests.exceptions.RequestException as e:
             logger.error(f"Anthropic API request failed: {e}")
             raise
-        except KeyError as e:
-            logger.error(f"Unexpected Anthropic response format: {e}")
+
+        return self._parse_chat(response.json())
+
+    async def achat(
+        self,
+        messages: List[Message],
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> LLMResponse:
+        headers, payload = self._request(messages, max_tokens, temperature, **kwargs)
+
+        try:
+            response = await get_async_client().post(
+                self.api_url,
+                headers=headers,
+                json=payload,
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.error(f"Anthropic API request failed: {e}")
+            raise
+
+        return self._parse_chat(response.json())
+
+    @staticmethod
+    def _parse_delta(data: str) -> Optional[str]:
+        try:
+            event = json.loads(data)
+        except json.JSONDecodeError:
+            logger.warning(f"Skipping malformed stream event: {data[:100]}")
+            return None
+        if event.get("type") == "error":
+            raise RuntimeError(f"Anthropic stream error: {event.get('error')}")
+        if event.get("type") != "content_block_delta":
+            return None
+        return (event.get("delta") or {}).get("text")
+
+    def stream_chat(
+        self,
+        messages: List[Message],
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> Iterator[str]:
+        """Chat completion streamed via SSE (stream=True)."""
+        headers, payload = self._request(messages, max_tokens, temperature, **kwargs)
+        payload["stream"] = True
+
+        try:
+            with self.session.post(
+                self.api_url,
+                headers=headers,
+                json=payload,
+                timeout=self.timeout,
+                stream=True
+            ) as response:
+                response.raise_for_status()
+                # SSE is always UTF-8; without a charset requests would assume ISO-8859-1
+                response.encoding = "utf-8"
+                lines = response.iter_lines(decode_unicode=True)
+                for data in iter_sse_data(line for line in lines if line):
+                    delta = self._parse_delta(data)
+                    if delta:
+                        yield delta
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Anthropic API stream failed: {e}")
+            raise
+
+    async def astream_chat(
+        self,
+        messages: List[Message],
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        headers, payload = self._request(messages, max_tokens, temperature, **kwargs)
+        payload["stream"] = True
+
+        try:
+            async with get_async_client().stream(
+                "POST",
+                self.api_url,
+                headers=headers,
+                json=payload,
+                timeout=self.timeout
+            ) as response:
+                response.raise_for_status()
+                async for data in aiter_sse_data(response.aiter_lines()):
+                    delta = self._parse_delta(data)
+                    if delta:
+                        yield delta
+        except httpx.HTTPError as e:
+            logger.error(f"Anthropic API stream failed: {e}")
             raise
 
     def get_provider_name(self) -> str:
@@ -5,7 +5,7 @@ Abstract base class for all LLM providers.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, Iterator, List, Dict, Any, Optional
 from pydantic import BaseModel
 
 
@@ -31,6 +31,9 @@ class BaseLLMProvider(ABC):
     - generate(): Text generation
     - generate_json(): JSON-structured output
     - chat(): Chat completion
+
+    stream() / stream_chat() yield the answer in text deltas. Providers without
+    native streaming inherit a fallback that yields the complete answer once.
     """
 
     def __init__(self, api_key: str, model: str, **kwargs):
@@ -102,6 +105,108 @@ class BaseLLMProvider(ABC):
         """
         pass
 
+    def stream(
+        self,
+        prompt: str,
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> Iterator[str]:
+        """Generate text completion, yielding text deltas as they arrive."""
+        messages = [Message(role="user", content=prompt)]
+        return self.stream_chat(
+            messages, max_tokens=max_tokens, temperature=temperature, **kwargs
+        )
+
+    def stream_chat(
+        self,
+        messages: List[Message],
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> Iterator[str]:
+        """Chat completion as text deltas (fallback: one delta with the full answer)."""
+        response = self.chat(
+            messages, max_tokens=max_tokens, temperature=temperature, **kwargs
+        )
+        if response.content:
+            yield response.content
+
     def get_provider_name(self) -> str:
         """Return provider name (e.g., 'ionos', 'openai')."""
         return self.__class__.__name__.replace("Provider", "").lower()
+
+
+class AsyncBaseLLMProvider(BaseLLMProvider):
+    """
+    LLM provider that also offers non-blocking variants of every call.
+
+    FastAPI endpoints await these instead of calling the sync methods, so a
+    slow LLM response does not block the event loop.
+
+    Example:
+        >>> provider = get_llm_provider()
+        >>> if isinstance(provider, AsyncBaseLLMProvider):
+        ...     response = await provider.agenerate("Was ist die ANBest-P?")
+    """
+
+    async def agenerate(
+        self,
+        prompt: str,
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> LLMResponse:
+        """Async variant of generate()."""
+        messages = [Message(role="user", content=prompt)]
+        return await self.achat(
+            messages, max_tokens=max_tokens, temperature=temperature, **kwargs
+        )
+
+    @abstractmethod
+    async def agenerate_json(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Async variant of generate_json()."""
+        pass
+
+    @abstractmethod
+    async def achat(
+        self,
+        messages: List[Message],
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> LLMResponse:
+        """Async variant of chat()."""
+        pass
+
+    def astream(
+        self,
+        prompt: str,
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Async variant of stream()."""
+        messages = [Message(role="user", content=prompt)]
+        return self.astream_chat(
+            messages, max_tokens=max_tokens, temperature=temperature, **kwargs
+        )
+
+    async def astream_chat(
+        self,
+        messages: List[Message],
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Async variant of stream_chat()."""
+        response = await self.achat(
+            messages, max_tokens=max_tokens, temperature=temperature, **kwargs
+        )
+        if response.content:
+            yield response.content
@@ -0,0 +1,106 @@
+"""
+Pooled HTTP clients for the LLM provider layer.
+
+Every provider (and the EmbeddingEngine) talks to the same few hosts, so
+connections are kept alive and shared instead of paying a TCP + TLS handshake
+per request:
+
+- get_session(): one process-wide requests.Session for synchronous calls
+- get_async_client(): one httpx.AsyncClient per running event loop
+
+Streaming responses (Server-Sent Events) are decoded with iter_sse_data() /
+aiter_sse_data().
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import AsyncIterator, Iterable, Iterator, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.config_loader import settings
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+# httpx connections are bound to the loop that opened them
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def create_session(pool_size: Optional[int] = None) -> requests.Session:
+    """Returns a new requests.Session whose connection pool fits pool_size threads."""
+    pool_size = pool_size or settings.get("llm.pool_size", 16)
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Shared session for all synchronous LLM and embedding requests."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def create_async_client(pool_size: Optional[int] = None) -> httpx.AsyncClient:
+    pool_size = pool_size or settings.get("llm.pool_size", 16)
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=pool_size, max_keepalive_connections=pool_size
+        ),
+        timeout=settings.get("llm.timeout", 120),
+    )
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Shared AsyncClient of the running event loop (must be called inside one)."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = create_async_client()
+        _async_clients[loop] = client
+    return client
+
+
+async def aclose_async_client():
+    """Closes the current loop's client, e.g. on FastAPI shutdown."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _sse_data(line: str) -> Optional[str]:
+    # Only "data:" fields carry payload; "event:", comments and blanks are skipped
+    if line.startswith("data:"):
+        return line[5:].strip()
+    return None
+
+
+def iter_sse_data(lines: Iterable[str]) -> Iterator[str]:
+    """Yields the data payload of every SSE line until the [DONE] marker."""
+    for line in lines:
+        data = _sse_data(line)
+        if data is None:
+            continue
+        if data == "[DONE]":
+            return
+        yield data
+
+
+async def aiter_sse_data(lines: AsyncIterator[str]) -> AsyncIterator[str]:
+    async for line in lines:
+        data = _sse_data(line)
+        if data is None:
+            continue
+        if data == "[DONE]":
+            return
+        yield data
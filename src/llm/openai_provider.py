@@ -9,15 +9,17 @@ Works with:
 
 import json
 import logging
+import httpx
 import requests
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, Iterator, List, Dict, Any, Optional
 
-from .base_provider import BaseLLMProvider, Message, LLMResponse
+from .base_provider import AsyncBaseLLMProvider, Message, LLMResponse
+from .http_client import aiter_sse_data, get_async_client, get_session, iter_sse_data
 
 logger = logging.getLogger(__name__)
 
 
-class OpenAIProvider(BaseLLMProvider):
+class OpenAIProvider(AsyncBaseLLMProvider):
     """
     OpenAI-compatible LLM provider.
 
@@ -25,6 +27,9 @@ class OpenAIProvider(BaseLLMProvider):
     - OpenAI API (api.openai.com)
     - IONOS Cloud LLM (OpenAI-compatible)
     - Other OpenAI-compatible APIs
+
+    Sync calls share one pooled requests.Session, async calls the pooled
+    httpx.AsyncClient of the running event loop (see http_client.py).
     """
 
     def __init__(
@@ -38,30 +43,20 @@ class OpenAIProvider(BaseLLMProvider):
         super().__init__(api_key, model, **kwargs)
         self.api_url = api_url.rstrip("/")
         self.timeout = timeout
+        self.session = get_session()
 
         # Ensure chat completions endpoint
         if not self.api_url.endswith("/chat/completions"):
             self.api_url += "/chat/completions"
 
-    def generate(
-        self, prompt: str, max_tokens: int = 500, temperature: float = 0.7, **kwargs
-    ) -> LLMResponse:
-        """Generate text completion from prompt."""
-        messages = [Message(role="user", content=prompt)]
-        return self.chat(
-            messages, max_tokens=max_tokens, temperature=temperature, **kwargs
-        )
-
-    def generate_json(
-        self, prompt: str, max_tokens: int = 1000, **kwargs
-    ) -> Dict[str, Any]:
-        """Generate JSON-structured output."""
-        headers = {
+    def _headers(self) -> Dict[str, str]:
+        return {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
 
-        payload = {
+    def _json_payload(self, prompt: str, max_tokens: int, **kwargs) -> Dict[str, Any]:
+        return {
             "model": self.model,
             "messages": [{"role": "user", "content": prompt}],
             "max_tokens": max_tokens,
@@ -69,41 +64,13 @@ class OpenAIProvider(BaseLLMProvider):
             **kwargs,
         }
 
-        try:
-            response = requests.post(
-                self.api_url, headers=headers, json=payload, timeout=self.timeout
-            )
-            response.raise_for_status()
-
-            result = response.json()
-            content = result["choices"][0]["message"]["content"]
-
-            return json.loads(content)
-
-        except requests.exceptions.RequestException as e:
-            logger.error(f"OpenAI API request failed: {e}")
-            raise
-        except (KeyError, json.JSONDecodeError) as e:
-            logger.error(f"Failed to parse OpenAI response: {e}")
-            raise
-
-    def chat(
-        self,
-        messages: List[Message],
-        max_tokens: int = 500,
-        temperature: float = 0.7,
-        **kwargs,
-    ) -> LLMResponse:
-        """Chat completion with message history."""
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-
+    def _chat_payload(
+        self, messages: List[Message], max_tokens: int, temperature: float, **kwargs
+    ) -> Dict[str, Any]:
         # Convert Message objects to dict
         messages_dict = [{"role": msg.role, "content": msg.content} for msg in messages]
 
-        payload = {
+        return {
             "model": self.model,
             "messages": messages_dict,
             "max_tokens": max_tokens,
@@ -111,13 +78,17 @@ class OpenAIProvider(BaseLLMProvider):
             **kwargs,
         }
 
+    @staticmethod
+    def _parse_json(result: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            response = requests.post(
-                self.api_url, headers=headers, json=payload, timeout=self.timeout
-            )
-            response.raise_for_status()
+            content = result["choices"][0]["message"]["content"]
+            return json.loads(content)
+        except (KeyError, json.JSONDecodeError) as e:
+            logger.error(f"Failed to parse OpenAI response: {e}")
+            raise
 
-            result = response.json()
+    def _parse_chat(self, result: Dict[str, Any]) -> LLMResponse:
+        try:
             choice = result["choices"][0]
 
             # Handle cases where content is None (e.g. reasoning models cut off or tool calls)
@@ -138,12 +109,150 @@ class OpenAIProvider(BaseLLMProvider):
                 tokens_used=result.get("usage", {}).get("total_tokens"),
                 finish_reason=choice.get("finish_reason"),
             )
+        except KeyError as e:
+            logger.error(f"Unexpected OpenAI response format: {e}")
+            raise
 
+    def _post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            response = self.session.post(
+                self.api_url, headers=self._headers(), json=payload, timeout=self.timeout
+            )
+            response.raise_for_status()
+            return response.json()
         except requests.exceptions.RequestException as e:
             logger.error(f"OpenAI API request failed: {e}")
             raise
-        except KeyError as e:
-            logger.error(f"Unexpected OpenAI response format: {e}")
+
+    async def _apost(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            response = await get_async_client().post(
+                self.api_url, headers=self._headers(), json=payload, timeout=self.timeout
+            )
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            logger.error(f"OpenAI API request failed: {e}")
+            raise
+
+    @staticmethod
+    def _parse_delta(data: str) -> Optional[str]:
+        try:
+            choices = json.loads(data).get("choices") or []
+        except json.JSONDecodeError:
+            logger.warning(f"Skipping malformed stream event: {data[:100]}")
+            return None
+        if not choices:
+            # e.g. the final usage-only event
+            return None
+        return (choices[0].get("delta") or {}).get("content")
+
+    def generate(
+        self, prompt: str, max_tokens: int = 500, temperature: float = 0.7, **kwargs
+    ) -> LLMResponse:
+        """Generate text completion from prompt."""
+        messages = [Message(role="user", content=prompt)]
+        return self.chat(
+            messages, max_tokens=max_tokens, temperature=temperature, **kwargs
+        )
+
+    def generate_json(
+        self, prompt: str, max_tokens: int = 1000, **kwargs
+    ) -> Dict[str, Any]:
+        """Generate JSON-structured output."""
+        return self._parse_json(
+            self._post(self._json_payload(prompt, max_tokens, **kwargs))
+        )
+
+    async def agenerate_json(
+        self, prompt: str, max_tokens: int = 1000, **kwargs
+    ) -> Dict[str, Any]:
+        return self._parse_json(
+            await self._apost(self._json_payload(prompt, max_tokens, **kwargs))
+        )
+
+    def chat(
+        self,
+        messages: List[Message],
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        **kwargs,
+    ) -> LLMResponse:
+        """Chat completion with message history."""
+        return self._parse_chat(
+            self._post(self._chat_payload(messages, max_tokens, temperature, **kwargs))
+        )
+
+    async def achat(
+        self,
+        messages: List[Message],
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        **kwargs,
+    ) -> LLMResponse:
+        return self._parse_chat(
+            await self._apost(
+                self._chat_payload(messages, max_tokens, temperature, **kwargs)
+            )
+        )
+
+
+    def stream_chat(
+        self,
+        messages: List[Message],
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        **kwargs,
+    ) -> Iterator[str]:
+        """Chat completion streamed via SSE (stream=True)."""
+        payload = self._chat_payload(messages, max_tokens, temperature, **kwargs)
+        payload["stream"] = True
+
+        try:
+            with self.session.post(
+                self.api_url,
+                headers=self._headers(),
+                json=payload,
+                timeout=self.timeout,
+                stream=True,
+            ) as response:
+                response.raise_for_status()
+                # SSE is always UTF-8; without a charset requests would assume ISO-8859-1
+                response.encoding = "utf-8"
+                lines = response.iter_lines(decode_unicode=True)
+                for data in iter_sse_data(line for line in lines if line):
+                    delta = self._parse_delta(data)
+                    if delta:
+                        yield delta
+        except requests.exceptions.RequestException as e:
+            logger.error(f"OpenAI API stream failed: {e}")
+            raise
+
+    async def astream_chat(
+        self,
+        messages: List[Message],
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        **kwargs,
+    ) -> AsyncIterator[str]:
+        payload = self._chat_payload(messages, max_tokens, temperature, **kwargs)
+        payload["stream"] = True
+
+        try:
+            async with get_async_client().stream(
+                "POST",
+                self.api_url,
+                headers=self._headers(),
+                json=payload,
+                timeout=self.timeout,
+            ) as response:
+                response.raise_for_status()
+                async for data in aiter_sse_data(response.aiter_lines()):
+                    delta = self._parse_delta(data)
+                    if delta:
+                        yield delta
+        except httpx.HTTPError as e:
+            logger.error(f"OpenAI API stream failed: {e}")
             raise
 
 
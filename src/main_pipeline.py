@@ -1,9 +1,11 @@
-import json
 import logging
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 from src.parser.docling_engine import DoclingEngine
+from src.parser.parse_cache import ParseCache
 from src.graph.graph_builder import GraphBuilder
 from src.discovery.law_crawler import LawCrawler
+from src.discovery.manifest_journal import ManifestJournal
 from src.parser.vector_store import VectorStore
 from src.config_loader import settings
 
@@ -26,11 +28,12 @@ def enrich_graph_with_laws(builder: GraphBuilder):
 
     logger.info(f"Enriching graph with {len(referenced_laws)} referenced laws...")
 
-    for law_abbr in referenced_laws:
+    # Laws are fetched concurrently; graph updates stay on this thread
+    crawled = crawler.crawl_laws(sorted(referenced_laws))
+
+    for law_abbr, norms in crawled.items():
         try:
-            logger.info(f"Fetching content for law: {law_abbr}")
-            xml_content = crawler.fetch_law(law_abbr)
-            norms = crawler.parse_law_xml(xml_content)
+            logger.info(f"Adding {len(norms)} sections for law: {law_abbr}")
 
             law_node_id = f"law_{law_abbr}"
             builder.graph.nodes[law_node_id].update(
@@ -53,125 +56,155 @@ def enrich_graph_with_laws(builder: GraphBuilder):
             logger.warning(f"Could not enrich law {law_abbr}: {e}")
 
 
+def ingest_manifest_entry(
+    builder: GraphBuilder,
+    engine: DoclingEngine,
+    raw_dir: Path,
+    ministerium: str,
+    nr: str,
+    file_info: Dict[str, Any],
+) -> Tuple[bool, List[str]]:
+    """
+    Adds one crawled file to the graph.
+
+    Returns (processed, stale_chunk_ids): processed is True if the document was
+    (re-)parsed; stale_chunk_ids are chunks of a previous version that were
+    removed from the graph and must be dropped from the vector store as well.
+    """
+    file_hash = file_info["hash"]
+    filename = file_info["filename"]
+    known_hash = builder.graph.nodes[nr].get("hash") if nr in builder.graph else None
+    doc_metadata = document_metadata(file_info, ministerium)
+
+    # Only new or changed documents are re-parsed. Comparing against the
+    # hash stored on the document node keeps reruns idempotent.
+    if known_hash == file_hash:
+        logger.info(f"Updating metadata for {nr} ({ministerium})")
+        builder.add_document(nr, doc_metadata)
+        return False, []
+
+    stale_chunk_ids = []
+    if known_hash is not None:
+        logger.info(
+            f"Document {nr} changed ({known_hash[:8]} -> {file_hash[:8]}), "
+            f"replacing its chunks"
+        )
+        stale_chunk_ids = builder.remove_chunks(nr)
+
+    if not filename.endswith(".pdf"):
+        return False, stale_chunk_ids
+
+    pdf_path = resolve_pdf_path(raw_dir, file_info)
+    if pdf_path is None:
+        return False, stale_chunk_ids
+
+    logger.info(f"Processing {nr}: {file_info['title']}")
+
+    try:
+        # Add document node
+        builder.add_document(nr, doc_metadata)
+
+        for i, chunk in enumerate(parse_chunks(engine, pdf_path, file_hash)):
+            builder.add_chunk(nr, f"{nr}_chunk_{i}", chunk)
+        return True, stale_chunk_ids
+
+    except Exception as e:
+        logger.error(f"Error processing {nr}: {e}")
+        return False, stale_chunk_ids
+
+
+def document_metadata(file_info: Dict[str, Any], ministerium: str) -> Dict[str, Any]:
+    return {
+        "title": file_info["title"],
+        "category": file_info["category"],
+        "hash": file_info["hash"],
+        "filename": file_info["filename"],
+        "url": file_info.get("url"),
+        "ministerium": ministerium,
+    }
+
+
+def resolve_pdf_path(raw_dir: Path, file_info: Dict[str, Any]) -> Optional[Path]:
+    """Locates the downloaded PDF of a manifest entry (None if missing)."""
+    filename = file_info["filename"]
+    category = file_info["category"].split(" ")[0]
+    pdf_path = raw_dir / category / filename
+
+    # Fallback: sometimes files might be directly in raw_dir (unlikely based on structure but good for safety)
+    if not pdf_path.exists():
+        pdf_path = raw_dir / filename
+
+    if not pdf_path.exists():
+        logger.warning(f"File not found: {pdf_path}")
+        return None
+    return pdf_path
+
+
+def parse_chunks(
+    engine: DoclingEngine, pdf_path: Path, file_hash: str
+) -> List[Dict[str, Any]]:
+    """Parses a PDF into chunk node data (text, breadcrumb context, citations)."""
+    chunks = []
+    # Extract chunks (reuses cached Docling conversions)
+    for chunk in engine.process_document_cached(pdf_path, file_hash=file_hash):
+        # Breadcrumb context
+        headings = chunk["headings"]
+        chunks.append(
+            {
+                "text": chunk["text"],
+                "context": " > ".join(headings),
+                "headings": headings,
+                "citations": engine.citation_extractor.extract(chunk["text"]),
+            }
+        )
+    return chunks
+
+
 def main():
     base_raw_dir = Path(settings.get("paths.raw_data", "data/raw"))
     output_graph_path = Path(
         settings.get("paths.knowledge_graph", "data/knowledge_graph.json")
     )
 
-    engine = DoclingEngine()
+    parse_cache = ParseCache(
+        Path(settings.get("paths.parse_cache", "data/parse_cache"))
+    )
+    engine = DoclingEngine(cache=parse_cache)
     builder = GraphBuilder()
 
     # Load existing graph if available
-    existing_hashes = set()
     if output_graph_path.exists():
         builder.load_graph(output_graph_path)
-        for node_id, data in builder.graph.nodes(data=True):
-            if (
-                data.get("type") == "document" or data.get("node_type") == "document"
-            ) and "hash" in data:
-                existing_hashes.add(data["hash"])
 
     processed_count = 0
     limit = None
+    stale_chunk_ids = []
 
     # Iterate over all directories in data/raw (sorted for predictability)
     dirs = sorted([d for d in base_raw_dir.iterdir() if d.is_dir()])
     for raw_dir in dirs:
-        manifest_path = raw_dir / "manifest.json"
-        if not manifest_path.exists():
+        journal = ManifestJournal(raw_dir)
+        if not (journal.snapshot_path.exists() or journal.journal_path.exists()):
             continue
 
         logger.info(f"Found manifest in {raw_dir}")
 
-        with open(manifest_path, "r", encoding="utf-8") as f:
-            manifest = json.load(f)
-
+        # Snapshot + journal, so entries of a running/interrupted crawl are included
+        manifest = journal.load(repair=False)
         ministerium = manifest.get("ministerium", "unbekannt")
 
         for nr, file_info in manifest.get("files", {}).items():
             if limit is not None and processed_count >= limit:
                 break
 
-            file_hash = file_info["hash"]
-            filename = file_info["filename"]
-
-            if file_hash in existing_hashes:
-                logger.info(f"Updating metadata for {nr} ({ministerium})")
-                builder.add_document(
-                    nr,
-                    {
-                        "title": file_info["title"],
-                        "category": file_info["category"],
-                        "hash": file_info["hash"],
-                        "filename": filename,
-                        "url": file_info.get("url"),
-                        "ministerium": ministerium,
-                    },
-                )
-                continue
-
-            if not filename.endswith(".pdf"):
-                continue
-
-            category = file_info["category"].split(" ")[0]
-            pdf_path = raw_dir / category / filename
-
-            # Fallback: sometimes files might be directly in raw_dir (unlikely based on structure but good for safety)
-            if not pdf_path.exists():
-                pdf_path = raw_dir / filename
-
-            if not pdf_path.exists():
-                logger.warning(f"File not found: {pdf_path}")
-                continue
-
-            logger.info(f"Processing {nr}: {file_info['title']}")
-
-            try:
-                # Add document node
-                builder.add_document(
-                    nr,
-                    {
-                        "title": file_info["title"],
-                        "category": file_info["category"],
-                        "hash": file_info["hash"],
-                        "filename": filename,
-                        "url": file_info.get("url"),
-                        "ministerium": ministerium,
-                    },
-                )
-
-                # Extract chunks
-                chunks = engine.process_document(pdf_path)
-
-                for i, chunk in enumerate(chunks):
-                    chunk_id = f"{nr}_chunk_{i}"
-
-                    # Breadcrumb context
-                    headings = getattr(chunk.meta, "headings", [])
-                    if headings is None:
-                        headings = []
-                    context_path = " > ".join(headings)
-
-                    citations = engine.citation_extractor.extract(chunk.text)
-
-                    builder.add_chunk(
-                        nr,
-                        chunk_id,
-                        {
-                            "text": chunk.text,
-                            "context": context_path,
-                            "headings": headings,
-                            "citations": citations,
-                        },
-                    )
-
+            processed, stale = ingest_manifest_entry(
+                builder, engine, raw_dir, ministerium, nr, file_info
+            )
+            stale_chunk_ids.extend(stale)
+            if processed:
                 processed_count += 1
                 builder.save_graph(output_graph_path)
 
-            except Exception as e:
-                logger.error(f"Error processing {nr}: {e}")
-
     builder.create_reference_edges()
     enrich_graph_with_laws(builder)
     builder.save_graph(output_graph_path)
@@ -184,6 +217,7 @@ def main():
         logger.info("Starting Embedding Sync to ChromaDB...")
         try:
             store = VectorStore()
+            store.delete_chunks(stale_chunk_ids)
             store.add_chunks_from_graph(output_graph_path)
             logger.info("Embedding Sync completed.")
         except Exception as e:
@@ -0,0 +1,224 @@
+"""
+In-memory cache for generated RAG answers.
+
+Exact tier: answers are keyed by (normalized query, retrieved chunk ids, graph
+version, prompt template). The same question over the same chunks is answered
+from memory instead of calling the LLM again.
+
+Semantic tier (optional): if no exact entry exists, an answer for the same
+retrieval context is reused when its query embedding has a cosine similarity
+above the threshold ("Was gilt für Reisekosten?" vs. "Welche Regeln gelten für
+Reisekosten"). Only entries with identical context are compared, so a reused
+answer is always grounded in the same chunks.
+
+Eviction is TTL plus LRU.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+
+from src.config_loader import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    context_key: str
+    embedding: Optional[List[float]]
+    created_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class CacheLookup:
+    """Result of lookup(); pass it back to store() after generating a miss."""
+
+    key: str
+    context_key: str
+    value: Any = None
+    semantic: bool = False
+    embedding: Optional[List[float]] = None
+
+    @property
+    def hit(self) -> bool:
+        return self.value is not None
+
+
+class AnswerCache:
+    """
+    Example:
+        >>> cache = AnswerCache(max_entries=1000, ttl_seconds=3600)
+        >>> lookup = cache.lookup(query, chunk_ids, graph_version, "search:answer-v1")
+        >>> if not lookup.hit:
+        ...     cache.store(lookup, generate(query))
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 3600,
+        semantic_threshold: Optional[float] = None,
+        embed_fn: Optional[Callable[[str], List[float]]] = None,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.semantic_threshold = semantic_threshold if embed_fn else None
+        self.embed_fn = embed_fn
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._by_context: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            "lookups": 0,
+            "hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expired": 0,
+        }
+
+    @classmethod
+    def from_settings(
+        cls, embed_fn: Optional[Callable[[str], List[float]]] = None
+    ) -> "AnswerCache":
+        return cls(
+            max_entries=settings.get("api.answer_cache.max_entries", 1000),
+            ttl_seconds=settings.get("api.answer_cache.ttl_seconds", 3600),
+            semantic_threshold=settings.get("api.answer_cache.semantic_threshold"),
+            embed_fn=embed_fn,
+        )
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return self.semantic_threshold is not None
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        text = unicodedata.normalize("NFKC", query).lower()
+        text = re.sub(r"\s+", " ", text).strip()
+        return text.rstrip("?!. ")
+
+    @staticmethod
+    def _digest(*parts: Any) -> str:
+        raw = json.dumps(parts, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+        dot = sum(x * y for x, y in zip(a, b))
+        norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+        return dot / norm if norm else 0.0
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            keys = self._by_context.get(entry.context_key)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_context[entry.context_key]
+
+    def _is_expired(self, entry: CacheEntry, now: float) -> bool:
+        return now - entry.created_at > self.ttl_seconds
+
+    def lookup(
+        self,
+        query: str,
+        context_ids: Sequence[str],
+        graph_version: Any,
+        template: str,
+    ) -> CacheLookup:
+        """
+        Exact lookup first, then (if enabled) the semantic tier. The semantic
+        tier embeds the query, which is a remote call; run it off the event loop.
+        """
+        context_key = self._digest(list(context_ids), graph_version, template)
+        key = self._digest(self.normalize_query(query), context_key)
+        result = CacheLookup(key=key, context_key=context_key)
+        now = time.monotonic()
+
+        with self._lock:
+            self.stats["lookups"] += 1
+            entry = self._entries.get(key)
+            if entry is not None and self._is_expired(entry, now):
+                self._drop(key)
+                self.stats["expired"] += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                result.value = entry.value
+                return result
+            has_candidates = bool(self._by_context.get(context_key))
+
+        if self.semantic_enabled:
+            try:
+                result.embedding = self.embed_fn(query)
+            except Exception as e:
+                logger.warning(f"AnswerCache: query embedding failed: {e}")
+
+        if result.embedding is not None and has_candidates:
+            with self._lock:
+                best_key, best_score = None, self.semantic_threshold
+                for candidate_key in list(self._by_context.get(context_key, ())):
+                    candidate = self._entries[candidate_key]
+                    if self._is_expired(candidate, now):
+                        self._drop(candidate_key)
+                        self.stats["expired"] += 1
+                        continue
+                    if candidate.embedding is None:
+                        continue
+                    score = self._cosine(result.embedding, candidate.embedding)
+                    if score >= best_score:
+                        best_key, best_score = candidate_key, score
+                if best_key is not None:
+                    self._entries.move_to_end(best_key)
+                    self.stats["hits"] += 1
+                    self.stats["semantic_hits"] += 1
+                    result.value = self._entries[best_key].value
+                    result.semantic = True
+                    return result
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return result
+
+    def store(self, lookup: CacheLookup, value: Any):
+        if value is None:
+            return
+        with self._lock:
+            self._drop(lookup.key)
+            self._entries[lookup.key] = CacheEntry(
+                value=value,
+                context_key=lookup.context_key,
+                embedding=lookup.embedding,
+            )
+            self._by_context.setdefault(lookup.context_key, set()).add(lookup.key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_context.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["lookups"]
+            return {
+                **self.stats,
+                "entries": len(self._entries),
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+                "semantic_tier": self.semantic_enabled,
+            }
@@ -9,9 +9,10 @@ Latency: <100ms for top-k retrieval
 """
 
 import json
+import os
 import pickle
 from pathlib import Path
-from typing import List, Tuple, Dict, Any, Optional
+from typing import List, Tuple, Dict, Any, Iterable, Optional
 import logging
 
 try:
@@ -27,9 +28,24 @@ except Exception as e:
 
 from rank_bm25 import BM25Okapi
 import networkx as nx
+import numpy as np
+
+from src.parser.vector_store import chunk_doc_id
 
 logger = logging.getLogger(__name__)
 
+# Texts per tokenize request to the model server during index builds
+TOKENIZE_BATCH = 64
+
+
+def spacy_tokens(doc) -> List[str]:
+    """Lemmas without stopwords, punctuation and short tokens."""
+    return [
+        token.lemma_
+        for token in doc
+        if not token.is_stop and not token.is_punct and len(token.text) > 2
+    ]
+
 
 class BM25Index:
     """
@@ -53,6 +69,7 @@ class BM25Index:
         index_path: Path,
         use_spacy: bool = True,
         rebuild: bool = False,
+        allow_empty: bool = False,
     ):
         """
         Initialize BM25 index.
@@ -62,13 +79,42 @@ class BM25Index:
             index_path: Path to save/load BM25 index pickle
             use_spacy: Whether to use SpaCy tokenization (default: True)
             rebuild: Force rebuild even if index exists
+            allow_empty: Start with an empty index if the graph has no chunks yet
+                (for incremental indexing via add_documents)
         """
         self.graph_path = graph_path
         self.index_path = index_path
         self.use_spacy = use_spacy and SPACY_AVAILABLE
+        self.remote_tokenizer = None
+        self._remote_failing = False
 
         # Initialize tokenizer
-        if self.use_spacy:
+        from src.parser.model_server import (
+            ModelServerError,
+            get_model_client,
+            model_server_socket,
+        )
+
+        remote = use_spacy and model_server_socket()
+        if remote:
+            client = get_model_client()
+            try:
+                remote = client.call("ping")["tokenizer"]
+                if not remote:
+                    logger.warning(
+                        f"Model server at {model_server_socket()} has no spaCy pipeline, "
+                        "using a local tokenizer"
+                    )
+            except (ModelServerError, OSError) as e:
+                # Probably still starting; queries fall back until it answers
+                logger.warning(f"Model server not reachable yet ({e})")
+        if remote:
+            # The model server hosts the spaCy pipeline for all workers
+            self.remote_tokenizer = client
+            self.use_spacy = True
+            self.nlp = None
+            logger.info(f"Using spaCy tokenizer of the model server at {model_server_socket()}")
+        elif self.use_spacy:
             try:
                 # Load small German model
                 self.nlp = spacy.load("de_core_news_sm", disable=["parser", "ner"])
@@ -87,6 +133,11 @@ class BM25Index:
         self.bm25_index: Optional[BM25Okapi] = None
         self.chunk_ids: List[str] = []
         self.tokenized_corpus: List[List[str]] = []
+        # chunk_id -> HAS_CHUNK parent; chunks without an entry fall back to
+        # the {doc_id}_chunk_{n} id scheme (law sections don't follow it)
+        self.chunk_parents: Dict[str, str] = {}
+        # doc_id -> chunk positions (for filter masks), built on demand
+        self._doc_chunks: Optional[Dict[str, np.ndarray]] = None
 
         # Load or build index
         if index_path.exists() and not rebuild:
@@ -94,7 +145,13 @@ class BM25Index:
             self._load_index()
         else:
             logger.info(f"Building new BM25 index from {graph_path}")
-            self._build_index()
+            try:
+                self._build_index()
+            except (FileNotFoundError, ValueError) as e:
+                if not allow_empty:
+                    raise
+                logger.info(f"Starting with empty BM25 index ({e})")
+                return
             self._save_index()
 
     def _tokenize(self, text: str) -> List[str]:
@@ -110,19 +167,54 @@ class BM25Index:
         Returns:
             List of tokens
         """
+        if self.remote_tokenizer:
+            from src.parser.model_server import ModelServerError
+
+            try:
+                tokens = self.remote_tokenizer.call("tokenize", texts=[text])[0]
+            except (ModelServerError, OSError) as e:
+                if not self._remote_failing:
+                    logger.warning(
+                        f"Model server tokenizer failed ({e}), using simple tokenization"
+                    )
+                self._remote_failing = True
+                return self._simple_tokens(text)
+            if self._remote_failing:
+                logger.info("Model server tokenizer available again")
+                self._remote_failing = False
+            return tokens
         if self.use_spacy and self.nlp:
             # SpaCy tokenization with lemmatization
-            doc = self.nlp(text.lower())
-            tokens = [
-                token.lemma_
-                for token in doc
-                if not token.is_stop and not token.is_punct and len(token.text) > 2
-            ]
-            return tokens
+            return spacy_tokens(self.nlp(text.lower()))
         else:
-            # Simple fallback: lowercase + split + filter short words
-            tokens = [word.lower() for word in text.split() if len(word) > 2]
+            return self._simple_tokens(text)
+
+    @staticmethod
+    def _simple_tokens(text: str) -> List[str]:
+        # Simple fallback: lowercase + split + filter short words
+        return [word.lower() for word in text.split() if len(word) > 2]
+
+    def _tokenize_many(self, texts: List[str]) -> List[List[str]]:
+        """
+        Tokenizes texts for indexing. Unlike queries, builds don't fall back
+        when the model server fails: a corpus with mixed tokenizers would
+        silently degrade every later search.
+        """
+        if self.remote_tokenizer:
+            tokens: List[List[str]] = []
+            for start in range(0, len(texts), TOKENIZE_BATCH):
+                tokens.extend(
+                    self.remote_tokenizer.call(
+                        "tokenize", texts=texts[start : start + TOKENIZE_BATCH]
+                    )
+                )
             return tokens
+        if self.use_spacy and self.nlp:
+            return [
+                spacy_tokens(doc)
+                for doc in self.nlp.pipe([t.lower() for t in texts], batch_size=TOKENIZE_BATCH)
+            ]
+        return [self._simple_tokens(text) for text in texts]
 
     def _build_index(self):
         """
@@ -161,8 +253,15 @@ class BM25Index:
             raise ValueError("No chunks found in graph. Cannot build BM25 index.")
 
         # Tokenize corpus
+        self.set_chunk_parents(
+            {
+                chunk_id: parent_id
+                for parent_id, chunk_id, relation in graph.edges(data="relation")
+                if relation == "HAS_CHUNK"
+            }
+        )
         self.chunk_ids = [chunk["id"] for chunk in chunks]
-        self.tokenized_corpus = [self._tokenize(chunk["text"]) for chunk in chunks]
+        self.tokenized_corpus = self._tokenize_many([chunk["text"] for chunk in chunks])
 
         # Build BM25 index
         self.bm25_index = BM25Okapi(self.tokenized_corpus)
@@ -179,8 +278,11 @@ class BM25Index:
             "bm25_index": self.bm25_index,
         }
 
-        with open(self.index_path, "wb") as f:
+        # Atomic write: the API may load the index while the pipeline saves it
+        temp_path = self.index_path.with_suffix(".tmp")
+        with open(temp_path, "wb") as f:
             pickle.dump(data, f)
+        os.replace(temp_path, self.index_path)
 
         logger.info(
             f"BM25 index saved to {self.index_path} ({self.index_path.stat().st_size / 1024 / 1024:.2f} MB)"
@@ -197,13 +299,98 @@ class BM25Index:
 
         logger.info(f"BM25 index loaded with {len(self.chunk_ids)} chunks")
 
-    def search(self, query: str, k: int = 20) -> List[Tuple[str, float]]:
+    def add_documents(
+        self, chunk_ids: List[str], texts: List[str], refresh: bool = True
+    ):
+        """
+        Adds or replaces chunks without re-tokenizing the rest of the corpus.
+
+        Tokenization dominates build time; only the new texts are tokenized.
+        Corpus statistics (IDF, avgdl) are recomputed by refresh(), which
+        callers batching many updates can defer.
+        """
+        positions = {cid: i for i, cid in enumerate(self.chunk_ids)}
+        for chunk_id, tokens in zip(chunk_ids, self._tokenize_many(list(texts))):
+            if chunk_id in positions:
+                self.tokenized_corpus[positions[chunk_id]] = tokens
+            else:
+                positions[chunk_id] = len(self.chunk_ids)
+                self.chunk_ids.append(chunk_id)
+                self.tokenized_corpus.append(tokens)
+        self._doc_chunks = None
+
+        if refresh:
+            self.refresh()
+
+    def remove_documents(self, chunk_ids: List[str], refresh: bool = True):
+        """Removes chunks (e.g. of a document that changed upstream)."""
+        removed = set(chunk_ids)
+        if not removed.intersection(self.chunk_ids):
+            return
+        kept = [
+            (cid, tokens)
+            for cid, tokens in zip(self.chunk_ids, self.tokenized_corpus)
+            if cid not in removed
+        ]
+        self.chunk_ids = [cid for cid, _ in kept]
+        self.tokenized_corpus = [tokens for _, tokens in kept]
+        self._doc_chunks = None
+
+        if refresh:
+            self.refresh()
+
+    def refresh(self):
+        """Recomputes BM25 corpus statistics from the tokenized corpus."""
+        self.bm25_index = (
+            BM25Okapi(self.tokenized_corpus) if self.tokenized_corpus else None
+        )
+        self._doc_chunks = None
+
+    def set_chunk_parents(self, chunk_parents: Dict[str, str]):
+        """Parent document/law of each chunk, from the graph's HAS_CHUNK edges."""
+        self.chunk_parents = chunk_parents
+        self._doc_chunks = None
+
+    @property
+    def doc_chunks(self) -> Dict[str, np.ndarray]:
+        """Chunk positions per document id, so a filter compiles to one mask."""
+        if self._doc_chunks is None:
+            positions: Dict[str, List[int]] = {}
+            for i, cid in enumerate(self.chunk_ids):
+                parent = self.chunk_parents.get(cid) or chunk_doc_id(cid)
+                positions.setdefault(parent, []).append(i)
+            self._doc_chunks = {
+                doc_id: np.array(idx, dtype=np.int64) for doc_id, idx in positions.items()
+            }
+        return self._doc_chunks
+
+    def doc_mask(self, doc_ids: Iterable[str], exclude: bool = False) -> np.ndarray:
+        """
+        Boolean mask over the chunk positions: chunks of the given documents
+        (or, with exclude=True, of all other documents). Unknown ids are ignored.
+        """
+        mask = np.full(len(self.chunk_ids), exclude, dtype=bool)
+        doc_chunks = self.doc_chunks
+        for doc_id in doc_ids:
+            positions = doc_chunks.get(doc_id)
+            if positions is not None:
+                mask[positions] = not exclude
+        return mask
+
+    def save(self):
+        self._save_index()
+
+    def search(
+        self, query: str, k: int = 20, mask: Optional[np.ndarray] = None
+    ) -> List[Tuple[str, float]]:
         """
         Search for top-k chunks using BM25.
 
         Args:
             query: Search query
             k: Number of results to return
+            mask: Optional chunk mask (see doc_mask); only these chunks can be
+                returned, so a selective filter still yields k results
 
         Returns:
             List of (chunk_id, bm25_score) tuples, sorted by score descending
@@ -218,20 +405,29 @@ class BM25Index:
             logger.warning(f"Query tokenization resulted in empty tokens: '{query}'")
             return []
 
-        # Get BM25 scores
-        scores = self.bm25_index.get_scores(query_tokens)
-
-        # Sort by score and get top-k
-        scored_chunks = list(zip(self.chunk_ids, scores))
-        scored_chunks.sort(key=lambda x: x[1], reverse=True)
-
-        # Filter out zero scores
-        scored_chunks = [
-            (chunk_id, score) for chunk_id, score in scored_chunks if score > 0
+        if mask is None:
+            positions = None
+            scores = self.bm25_index.get_scores(query_tokens)
+        else:
+            positions = np.flatnonzero(mask)
+            if not len(positions):
+                return []
+            if len(positions) * 2 < len(self.chunk_ids):
+                # Selective filter: score only the allowed chunks
+                scores = np.asarray(
+                    self.bm25_index.get_batch_scores(query_tokens, positions.tolist())
+                )
+            else:
+                scores = self.bm25_index.get_scores(query_tokens)[positions]
+
+        # Top-k by score (stable: ties keep corpus order), zero scores dropped
+        top = np.argsort(-scores, kind="stable")[:k]
+        return [
+            (self.chunk_ids[i if positions is None else positions[i]], scores[i])
+            for i in top
+            if scores[i] > 0
         ]
 
-        return scored_chunks[:k]
-
     def get_stats(self) -> Dict[str, Any]:
         """
         Get index statistics.
@@ -250,7 +446,11 @@ class BM25Index:
             "status": "ready",
             "num_chunks": len(self.chunk_ids),
             "avg_tokens_per_chunk": round(avg_doc_len, 2),
-            "tokenizer": "spacy" if self.use_spacy else "simple",
+            "tokenizer": (
+                "spacy-remote"
+                if self.remote_tokenizer
+                else "spacy" if self.use_spacy else "simple"
+            ),
             "index_path": str(self.index_path),
             "index_size_mb": round(self.index_path.stat().st_size / 1024 / 1024, 2)
             if self.index_path.exists()
@@ -1,9 +1,15 @@
 import os
+import logging
+from importlib import metadata
 from pathlib import Path
-from typing import List, Dict, Any, Iterator
+from typing import List, Dict, Any, Iterator, Optional
 from docling.document_converter import DocumentConverter
 from docling_core.transforms.chunker.hierarchical_chunker import HierarchicalChunker
+from docling_core.types.doc import DoclingDocument
 from src.parser.citation_extractor import CitationExtractor
+from src.parser.parse_cache import ParseCache
+
+logger = logging.getLogger(__name__)
 
 
 class DoclingEngine:
@@ -11,10 +17,33 @@ class DoclingEngine:
     Engine to convert PDFs to hierarchical Markdown using Docling.
     """
 
-    def __init__(self):
+    def __init__(self, cache: Optional[ParseCache] = None):
         self.converter = DocumentConverter()
         self.chunker = HierarchicalChunker()
         self.citation_extractor = CitationExtractor()
+        self.cache = cache
+
+        try:
+            self.docling_version = metadata.version("docling")
+        except metadata.PackageNotFoundError:
+            self.docling_version = "unknown"
+        self.chunker_key = ParseCache.config_key(self._chunker_config())
+
+    def _chunker_config(self) -> Dict[str, Any]:
+        config: Dict[str, Any] = {
+            "class": type(self.chunker).__name__,
+            "docling_core": self._package_version("docling-core"),
+        }
+        if hasattr(self.chunker, "model_dump"):
+            config.update(self.chunker.model_dump(mode="json"))
+        return config
+
+    @staticmethod
+    def _package_version(name: str) -> str:
+        try:
+            return metadata.version(name)
+        except metadata.PackageNotFoundError:
+            return "unknown"
 
     def convert_to_markdown(self, pdf_path: Path) -> str:
         """
@@ -36,6 +65,51 @@ class DoclingEngine:
         result = self.converter.convert(str(pdf_path))
         return self.chunker.chunk(result.document)
 
+    def process_document_cached(
+        self, pdf_path: Path, file_hash: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Like process_document(), but backed by the parse cache.
+
+        Returns plain chunk dicts ({"text", "headings"}). The chunk list is reused
+        if the chunker config is unchanged; otherwise the cached DoclingDocument is
+        re-chunked without running the layout models again.
+        """
+        if not pdf_path.exists():
+            raise FileNotFoundError(f"PDF not found: {pdf_path}")
+
+        if self.cache is None:
+            return [self._chunk_to_dict(c) for c in self.process_document(pdf_path)]
+
+        pdf_hash = file_hash or ParseCache.file_hash(pdf_path)
+
+        cached_chunks = self.cache.get_chunks(
+            pdf_hash, self.docling_version, self.chunker_key
+        )
+        if cached_chunks is not None:
+            logger.info(f"Parse cache hit (chunks) for {pdf_path.name}")
+            return cached_chunks
+
+        doc_json = self.cache.get_document(pdf_hash, self.docling_version)
+        if doc_json is not None:
+            logger.info(f"Parse cache hit (document) for {pdf_path.name}, re-chunking")
+            document = DoclingDocument.model_validate(doc_json)
+        else:
+            result = self.converter.convert(str(pdf_path))
+            document = result.document
+            self.cache.put_document(
+                pdf_hash, self.docling_version, document.export_to_dict()
+            )
+
+        chunks = [self._chunk_to_dict(c) for c in self.chunker.chunk(document)]
+        self.cache.put_chunks(pdf_hash, self.docling_version, self.chunker_key, chunks)
+        return chunks
+
+    @staticmethod
+    def _chunk_to_dict(chunk: Any) -> Dict[str, Any]:
+        headings = getattr(chunk.meta, "headings", None) or []
+        return {"text": chunk.text, "headings": list(headings)}
+
 
 class LegacyHierarchicalChunker:
     """
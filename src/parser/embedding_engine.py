@@ -1,9 +1,10 @@
 import os
-import requests
 import logging
 from typing import List, Optional, Any
 from dotenv import load_dotenv
 
+from src.llm.http_client import get_session
+
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
@@ -20,6 +21,8 @@ class EmbeddingEngine:
         self.model_name = os.getenv("IONOS_EMBEDDING_MODEL") or "BAAI/bge-m3"
 
         self.mistral_api_key = os.getenv("MISTRAL_API_KEY")
+        # Pooled keep-alive connections, shared with the LLM providers
+        self.session = get_session()
 
     def get_embeddings(self, texts: List[str]) -> List[List[float]]:
         if not self.api_key and not self.mistral_api_key:
@@ -30,7 +33,7 @@ class EmbeddingEngine:
         # Try IONOS first
         if self.api_key:
             try:
-                response = requests.post(
+                response = self.session.post(
                     self.api_url,
                     headers={
                         "Authorization": f"Bearer {self.api_key}",
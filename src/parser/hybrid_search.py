@@ -1,13 +1,19 @@
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Dict, Any, FrozenSet, Iterable, Optional, Tuple
 from pathlib import Path
 import networkx as nx
 import json
 
-from src.parser.vector_store import VectorStore
+from src.config_loader import settings
+from src.parser.vector_store import VectorStore, chunk_doc_id
 from src.parser.embedding_engine import EmbeddingEngine
 from src.graph.graph_algorithms import GraphAlgorithms
 from src.parser.query_enhancer import QueryEnhancer
+from src.parser.query_expander import LocalQueryExpander
 from src.llm.provider_factory import get_llm_provider
 
 # Graph RAG enhancements (Phase 1)
@@ -31,6 +37,148 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class DocFilter:
+    """
+    Documents a search is restricted to: an allow-list, or with exclude=True a
+    deny-list of document ids. Compiled into the vector store's where clause,
+    a BM25 chunk mask and the candidate selection before reranking.
+    """
+
+    doc_ids: FrozenSet[str]
+    exclude: bool = False
+
+    @property
+    def matches_nothing(self) -> bool:
+        return not self.exclude and not self.doc_ids
+
+    def allows(self, doc_id: str) -> bool:
+        return (doc_id in self.doc_ids) != self.exclude
+
+    def within(self, scope: Iterable[str]) -> "DocFilter":
+        """Intersection with a scope whitelist (always an allow-list)."""
+        scope = frozenset(scope)
+        if self.exclude:
+            return DocFilter(scope - self.doc_ids)
+        return DocFilter(scope & self.doc_ids)
+
+    def where(
+        self, chunk_keys: Optional[Dict[str, List[str]]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Args:
+            chunk_keys: Additional vector store doc_id values per document
+                (see SearchGeneration.chunk_keys)
+        """
+        if self.exclude and not self.doc_ids:
+            return None
+        doc_ids = set(self.doc_ids)
+        for doc_id in self.doc_ids:
+            doc_ids.update((chunk_keys or {}).get(doc_id, ()))
+        operator = "$nin" if self.exclude else "$in"
+        return {"doc_id": {operator: sorted(doc_ids)}}
+
+
+def index_documents(graph: nx.MultiDiGraph) -> Dict[str, Dict[str, str]]:
+    """Filterable metadata of all document nodes, keyed by document id."""
+    documents = {}
+    for node_id, data in graph.nodes(data=True):
+        if data.get("type") == "document":
+            documents[node_id] = {
+                key: data.get(key) or ""
+                for key in ("ministerium", "herausgeber", "kuerzel", "stand")
+            }
+    return documents
+
+
+def index_chunk_parents(graph: nx.MultiDiGraph) -> Dict[str, str]:
+    """HAS_CHUNK parent (document or law) of every chunk."""
+    return {
+        chunk_id: parent_id
+        for parent_id, chunk_id, relation in graph.edges(data="relation")
+        if relation == "HAS_CHUNK"
+    }
+
+
+@dataclass
+class SearchGeneration:
+    """
+    Immutable snapshot of the data-dependent indexes (graph, derived graph
+    algorithms, BM25, query thesaurus). A hot reload builds a new generation in the background
+    and swaps it in with a single reference assignment; requests that already
+    started keep using the generation they pinned.
+    """
+
+    graph: nx.MultiDiGraph
+    graph_algorithms: GraphAlgorithms
+    bm25_index: Optional["BM25Index"]
+    query_expander: Optional[LocalQueryExpander] = None
+    documents: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    chunk_parents: Dict[str, str] = field(default_factory=dict)
+    version: int = 1
+    loaded_at: float = field(default_factory=time.time)
+    # Vector store doc_id values of chunks whose id doesn't follow the
+    # {doc_id}_chunk_{n} scheme (law sections like "law_BHO_§_44"), per parent
+    chunk_keys: Dict[str, List[str]] = field(init=False, default_factory=dict)
+
+    def __post_init__(self):
+        for chunk_id, parent_id in self.chunk_parents.items():
+            key = chunk_doc_id(chunk_id)
+            if key != parent_id:
+                self.chunk_keys.setdefault(parent_id, []).append(key)
+
+    def parent_of(self, chunk_id: str) -> str:
+        """Document (or law) a chunk belongs to."""
+        return self.chunk_parents.get(chunk_id) or chunk_doc_id(chunk_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "loaded_at": datetime.fromtimestamp(self.loaded_at).isoformat(),
+            "graph_nodes": self.graph.number_of_nodes(),
+            "documents": len(self.documents),
+            "bm25_chunks": len(self.bm25_index.chunk_ids) if self.bm25_index else 0,
+            "thesaurus_terms": len(self.query_expander.terms)
+            if self.query_expander
+            else 0,
+        }
+
+    def doc_filter(
+        self,
+        ministerium: Optional[str] = None,
+        kuerzel: Optional[str] = None,
+        stand_after: Optional[str] = None,
+    ) -> Optional[DocFilter]:
+        """
+        Compiles the API's metadata filters into a DocFilter (same semantics as
+        the result post-filter). Only stand_after compiles to a deny-list, so
+        chunks of non-document sources (laws) without a Stand stay searchable.
+        """
+        if not (ministerium or kuerzel or stand_after):
+            return None
+
+        def outdated(meta: Dict[str, str]) -> bool:
+            return bool(stand_after and meta["stand"] and meta["stand"] < stand_after)
+
+        if not (ministerium or kuerzel):
+            return DocFilter(
+                frozenset(d for d, meta in self.documents.items() if outdated(meta)),
+                exclude=True,
+            )
+        return DocFilter(
+            frozenset(
+                d
+                for d, meta in self.documents.items()
+                if (
+                    not ministerium
+                    or ministerium in (meta["ministerium"], meta["herausgeber"])
+                )
+                and (not kuerzel or kuerzel in meta["kuerzel"])
+                and not outdated(meta)
+            )
+        )
+
+
 class HybridSearchEngine:
     def __init__(
         self,
@@ -39,11 +187,14 @@ class HybridSearchEngine:
         bm25_index_path: Path = Path("data/bm25_index.pkl"),
         enable_bm25: bool = True,
         enable_reranking: bool = True,
+        query_thesaurus_path: Path = Path("data/query_thesaurus.json"),
     ):
         self.vector_store = VectorStore(db_path=db_path)
         self.graph_path = graph_path
-        self.graph = self._load_graph()
-        self.graph_algorithms = GraphAlgorithms(self.graph)
+        self.bm25_index_path = bm25_index_path
+        self.query_thesaurus_path = query_thesaurus_path
+        self.enable_bm25 = enable_bm25
+        self._reload_lock = threading.Lock()
 
         # Phase 2: Query Enhancement
         try:
@@ -54,21 +205,8 @@ class HybridSearchEngine:
             logger.warning(f"Failed to initialize QueryEnhancer: {e}")
             self.query_enhancer = None
 
-        # Phase 1: BM25 Sparse Retrieval
-        self.bm25_index = None
-        if enable_bm25 and BM25_AVAILABLE:
-            try:
-                logger.info("Initializing BM25 index...")
-                self.bm25_index = BM25Index(
-                    graph_path=graph_path,
-                    index_path=bm25_index_path,
-                    use_spacy=True,
-                    rebuild=False,
-                )
-                logger.info(f"BM25 index ready: {self.bm25_index.get_stats()}")
-            except Exception as e:
-                logger.warning(f"Failed to initialize BM25 index: {e}")
-                self.bm25_index = None
+        # Graph + Phase 1: BM25 Sparse Retrieval
+        self._generation = self._build_generation(version=1)
 
         # Phase 1: Cross-Encoder Reranking
         self.reranker = None
@@ -83,6 +221,105 @@ class HybridSearchEngine:
                 logger.warning(f"Failed to initialize reranker: {e}")
                 self.reranker = None
 
+    @property
+    def generation(self) -> SearchGeneration:
+        return self._generation
+
+    @property
+    def graph(self) -> nx.MultiDiGraph:
+        return self._generation.graph
+
+    @property
+    def graph_algorithms(self) -> GraphAlgorithms:
+        return self._generation.graph_algorithms
+
+    @property
+    def bm25_index(self) -> Optional["BM25Index"]:
+        return self._generation.bm25_index
+
+    def _load_bm25_index(self) -> Optional["BM25Index"]:
+        if not (self.enable_bm25 and BM25_AVAILABLE):
+            return None
+        try:
+            logger.info("Initializing BM25 index...")
+            bm25_index = BM25Index(
+                graph_path=self.graph_path,
+                index_path=self.bm25_index_path,
+                use_spacy=True,
+                rebuild=False,
+            )
+            logger.info(f"BM25 index ready: {bm25_index.get_stats()}")
+            return bm25_index
+        except Exception as e:
+            logger.warning(f"Failed to initialize BM25 index: {e}")
+            return None
+
+    def _load_query_expander(
+        self, graph: nx.MultiDiGraph, bm25_index: Optional["BM25Index"]
+    ) -> Optional[LocalQueryExpander]:
+        path = self.query_thesaurus_path
+        try:
+            # The pipeline writes the thesaurus after graph and BM25
+            if path.exists() and (
+                not self.graph_path.exists()
+                or path.stat().st_mtime >= self.graph_path.stat().st_mtime
+            ):
+                expander = LocalQueryExpander.load(path)
+            else:
+                logger.info("Query thesaurus missing or stale, building in memory...")
+                expander = LocalQueryExpander.build(
+                    graph, bm25_index.tokenized_corpus if bm25_index else None
+                )
+            logger.info(f"Query thesaurus ready: {expander.get_stats()}")
+            return expander
+        except Exception as e:
+            logger.warning(f"Failed to initialize query thesaurus: {e}")
+            return None
+
+    def _build_generation(self, version: int) -> SearchGeneration:
+        graph = self._load_graph()
+        graph_algorithms = GraphAlgorithms(graph)
+        if version > 1 and graph.number_of_nodes():
+            # Warm derived indexes before the swap so the first request after
+            # a reload doesn't pay for them
+            graph_algorithms.get_global_pagerank()
+        bm25_index = self._load_bm25_index()
+        chunk_parents = index_chunk_parents(graph)
+        if bm25_index:
+            # The pickled index only knows chunk ids; filters need the parents
+            bm25_index.set_chunk_parents(chunk_parents)
+        return SearchGeneration(
+            graph=graph,
+            graph_algorithms=graph_algorithms,
+            bm25_index=bm25_index,
+            query_expander=self._load_query_expander(graph, bm25_index),
+            documents=index_documents(graph),
+            chunk_parents=chunk_parents,
+            version=version,
+        )
+
+    def reload(self) -> SearchGeneration:
+        """
+        Rebuilds graph, BM25 and derived indexes from disk and atomically swaps
+        them in. Vector store, reranker and query enhancer stay warm. Blocking;
+        run it in a worker thread. Concurrent calls are serialized.
+        """
+        with self._reload_lock:
+            start = time.time()
+            generation = self._build_generation(version=self._generation.version + 1)
+            if generation.graph.number_of_nodes() == 0:
+                raise RuntimeError(
+                    f"Reload aborted: graph at {self.graph_path} is empty or unreadable"
+                )
+            self._generation = generation
+            # Chunk texts may have changed with the new index
+            self.vector_store.chunk_cache.clear()
+            logger.info(
+                f"Index generation {generation.version} active "
+                f"({time.time() - start:.1f}s): {generation.get_stats()}"
+            )
+            return generation
+
     def _load_graph(self) -> nx.MultiDiGraph:
         if not self.graph_path.exists():
             logger.error(f"Graph file not found: {self.graph_path}")
@@ -120,6 +357,9 @@ class HybridSearchEngine:
         multi_hop: bool = True,
         vector_weight: float = 0.7,
         graph_weight: float = 0.3,
+        ministerium: Optional[str] = None,
+        kuerzel: Optional[str] = None,
+        stand_after: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """
         Performs a hybrid search:
@@ -130,11 +370,16 @@ class HybridSearchEngine:
         """
         logger.info(f"Hybrid search for: '{query}' (Whitelist: {scope_whitelist})")
 
-        # Apply Scope Whitelist if provided
-        if scope_whitelist:
-            if not filter_dict:
-                filter_dict = {}
-            filter_dict["doc_id"] = {"$in": scope_whitelist}
+        # Pin the index generation for this request (hot reload may swap it)
+        generation = self._generation
+        graph = generation.graph
+
+        doc_filter = self._doc_filter(
+            generation, scope_whitelist, ministerium, kuerzel, stand_after
+        )
+        if doc_filter and doc_filter.matches_nothing:
+            return []
+        filter_dict = self._where_clause(generation, filter_dict, doc_filter)
 
         query_embeddings = self.vector_store.embedding_engine.get_embeddings([query])
         if not query_embeddings:
@@ -171,8 +416,8 @@ class HybridSearchEngine:
             semantic_score = 1.0 - (distances[i] / 2.0)
 
             graph_score = 0.5
-            if chunk_id in self.graph:
-                deg = len(list(self.graph.neighbors(chunk_id)))
+            if chunk_id in graph:
+                deg = len(list(graph.neighbors(chunk_id)))
                 graph_score = min(1.0, float(deg) / 10.0)
 
             combined_score = (semantic_score * vector_weight) + (
@@ -196,24 +441,24 @@ class HybridSearchEngine:
                 "neighbor_context": [],
             }
 
-            if chunk_id in self.graph:
-                node_data = self.graph.nodes[chunk_id]
+            if chunk_id in graph:
+                node_data = graph.nodes[chunk_id]
                 entry["breadcrumbs"] = node_data.get("context", "")
                 entry["rules"] = node_data.get("rules", [])
 
                 # 3. Context Expansion (Multi-Hop)
                 if multi_hop:
                     # A. Direct references from the chunk itself
-                    for _, target_id, edata in self.graph.out_edges(
+                    for _, target_id, edata in graph.out_edges(
                         chunk_id, data=True
                     ):
                         if edata.get("relation") == "REFERENCES":
-                            self._add_neighbor_context(entry, target_id)
+                            self._add_neighbor_context(entry, target_id, graph)
 
                     # B. References from the parent document
-                    parents = list(self.graph.predecessors(chunk_id))
+                    parents = list(graph.predecessors(chunk_id))
                     for p in parents:
-                        p_data = self.graph.nodes[p]
+                        p_data = graph.nodes[p]
                         if p_data.get("type") == "document":
                             entry["source_url"] = p_data.get("url", "")
                             entry["doc_title"] = p_data.get("title", "")
@@ -222,18 +467,18 @@ class HybridSearchEngine:
                             entry["stand"] = p_data.get("stand", "")
                             entry["kuerzel"] = p_data.get("kuerzel", "")
 
-                            for _, target_id, edata in self.graph.out_edges(
+                            for _, target_id, edata in graph.out_edges(
                                 p, data=True
                             ):
                                 if edata.get("relation") == "REFERENCES":
-                                    self._add_neighbor_context(entry, target_id)
+                                    self._add_neighbor_context(entry, target_id, graph)
 
                             # C. Versioning (SUPERSEDES) from the parent document
-                            for replaced_by, _, edata in self.graph.in_edges(
+                            for replaced_by, _, edata in graph.in_edges(
                                 p, data=True
                             ):  # type: ignore
                                 if edata.get("relation") == "SUPERSEDES":
-                                    new_doc = self.graph.nodes[replaced_by]
+                                    new_doc = graph.nodes[replaced_by]
                                     entry["neighbor_context"].insert(
                                         0,
                                         {
@@ -248,9 +493,11 @@ class HybridSearchEngine:
 
         return hybrid_results
 
-    def _add_neighbor_context(self, entry: Dict[str, Any], target_id: str):
+    def _add_neighbor_context(
+        self, entry: Dict[str, Any], target_id: str, graph: nx.MultiDiGraph
+    ):
         """Helper to add neighbor info to results."""
-        target_node = self.graph.nodes[target_id]
+        target_node = graph.nodes[target_id]
         target_title = target_node.get("title", target_id)
 
         # If it's a law, try to find specific paragraphs
@@ -260,9 +507,9 @@ class HybridSearchEngine:
             or target_node.get("type") == "external"
         ):
             law_chunks = [
-                (s, self.graph.nodes[s])
-                for s in self.graph.successors(target_id)
-                if self.graph.nodes[s].get("section_type") == "law_section"
+                (s, graph.nodes[s])
+                for s in graph.successors(target_id)
+                if graph.nodes[s].get("section_type") == "law_section"
             ]
             if law_chunks:
                 for lc_id, lc_data in law_chunks[:2]:
@@ -285,6 +532,40 @@ class HybridSearchEngine:
             }
         )
 
+    @staticmethod
+    def _doc_filter(
+        generation: SearchGeneration,
+        scope_whitelist: Optional[List[str]],
+        ministerium: Optional[str],
+        kuerzel: Optional[str],
+        stand_after: Optional[str],
+    ) -> Optional[DocFilter]:
+        doc_filter = generation.doc_filter(ministerium, kuerzel, stand_after)
+        if scope_whitelist:
+            doc_filter = (
+                doc_filter.within(scope_whitelist)
+                if doc_filter
+                else DocFilter(frozenset(scope_whitelist))
+            )
+        if doc_filter and doc_filter.matches_nothing:
+            logger.info(
+                f"No documents match the filters (ministerium={ministerium}, "
+                f"kuerzel={kuerzel}, stand_after={stand_after})"
+            )
+        return doc_filter
+
+    @staticmethod
+    def _where_clause(
+        generation: SearchGeneration,
+        filter_dict: Optional[Dict[str, Any]],
+        doc_filter: Optional[DocFilter],
+    ) -> Optional[Dict[str, Any]]:
+        """Vector store where clause for the scope whitelist and metadata filters."""
+        where = dict(filter_dict or {})
+        if doc_filter:
+            where.update(doc_filter.where(generation.chunk_keys) or {})
+        return where or None
+
     # ===== PHASE 1: GRAPH RAG ENHANCEMENTS =====
 
     def _reciprocal_rank_fusion(
@@ -328,21 +609,51 @@ class HybridSearchEngine:
         use_query_enhancement: bool = True,
         retrieval_candidates: int = 20,
         rerank_top_k: int = 10,
+        deep_search: bool = False,
+        cascade_rerank: Optional[bool] = None,
+        ministerium: Optional[str] = None,
+        kuerzel: Optional[str] = None,
+        stand_after: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
+        """
+        Query enhancement uses the local thesaurus by default; deep_search
+        switches to the LLM-based QueryEnhancer (HyDE, multi-query), which costs
+        seconds per query.
+
+        cascade_rerank (default: reranker.cascade.enabled) prunes candidates
+        with a truncated first pass and cross-encodes only the uncertain head
+        at full length. Each result reports its rerank_stage ("rrf", "first"
+        or "full").
+
+        scope_whitelist, ministerium, kuerzel and stand_after are pushed down
+        into retrieval (vector where clause, BM25 chunk mask, candidate
+        selection), so selective filters still fill the page.
+        """
+        if cascade_rerank is None:
+            cascade_rerank = settings.get("reranker.cascade.enabled", False)
         logger.info(
-            f"[v2] Hybrid search for: '{query}' (Whitelist: {scope_whitelist}, BM25={use_bm25}, Rerank={use_reranking}, PPR={use_ppr}, Enhance={use_query_enhancement})"
+            f"[v2] Hybrid search for: '{query}' (Whitelist: {scope_whitelist}, BM25={use_bm25}, Rerank={use_reranking}, PPR={use_ppr}, Enhance={use_query_enhancement}, Deep={deep_search})"
         )
 
-        # Apply Scope Whitelist if provided
-        if scope_whitelist:
-            if not filter_dict:
-                filter_dict = {}
-            filter_dict["doc_id"] = {"$in": scope_whitelist}
+        # Pin the index generation for this request (hot reload may swap it)
+        generation = self._generation
+        graph = generation.graph
+        bm25_index = generation.bm25_index
+
+        doc_filter = self._doc_filter(
+            generation, scope_whitelist, ministerium, kuerzel, stand_after
+        )
+        if doc_filter and doc_filter.matches_nothing:
+            return []
+        filter_dict = self._where_clause(generation, filter_dict, doc_filter)
 
         enhanced_data = None
-        if use_query_enhancement and self.query_enhancer:
+        enhancer = (
+            self.query_enhancer if deep_search else generation.query_expander
+        )
+        if use_query_enhancement and enhancer:
             try:
-                enhanced_data = self.query_enhancer.enhance(query)
+                enhanced_data = enhancer.enhance(query)
                 logger.info(
                     f"Query enhanced: {len(enhanced_data['all_queries'])} queries generated."
                 )
@@ -371,6 +682,8 @@ class HybridSearchEngine:
                 )
 
                 if vector_results and vector_results.get("ids"):
+                    # Candidates missing from the graph are hydrated from here
+                    self.vector_store.remember_chunks(vector_results)
                     ids = vector_results["ids"][0]
                     distances = vector_results.get("distances", [[]])[0]
 
@@ -390,7 +703,7 @@ class HybridSearchEngine:
             retrieval_results.append(sorted_vector[:retrieval_candidates])
 
         # 2. BM25 Search
-        if use_bm25 and self.bm25_index:
+        if use_bm25 and bm25_index:
             all_bm25_candidates: Dict[str, float] = {}
             # Use original query and variations for BM25
             bm25_queries = [query]
@@ -398,31 +711,18 @@ class HybridSearchEngine:
                 bm25_queries.extend(enhanced_data.get("variations", []))
                 bm25_queries.extend(enhanced_data.get("sub_queries", []))
 
+            bm25_mask = (
+                bm25_index.doc_mask(doc_filter.doc_ids, exclude=doc_filter.exclude)
+                if doc_filter
+                else None
+            )
+
             for q in set(bm25_queries):
                 try:
-                    bm25_res = self.bm25_index.search(q, k=retrieval_candidates)
+                    bm25_res = bm25_index.search(
+                        q, k=retrieval_candidates, mask=bm25_mask
+                    )
                     for chunk_id, score in bm25_res:
-                        # Apply scope whitelist to BM25 results
-                        if scope_whitelist:
-                            # Heuristic: chunk_id is usually {doc_id}_chunk_{n}
-                            # Or we check the graph
-                            match_whitelist = False
-                            for allowed_id in scope_whitelist:
-                                if chunk_id.startswith(f"{allowed_id}_chunk_"):
-                                    match_whitelist = True
-                                    break
-
-                            if not match_whitelist:
-                                # Double check via graph if heuristic fails
-                                if chunk_id in self.graph:
-                                    for parent in self.graph.predecessors(chunk_id):
-                                        if parent in scope_whitelist:
-                                            match_whitelist = True
-                                            break
-
-                            if not match_whitelist:
-                                continue
-
                         if (
                             chunk_id not in all_bm25_candidates
                             or score > all_bm25_candidates[chunk_id]
@@ -441,9 +741,17 @@ class HybridSearchEngine:
             return []
 
         fused_results = self._reciprocal_rank_fusion(retrieval_results, k=60)
+        if doc_filter:
+            # Both retrievers are filtered already; never pay the reranker
+            # for a candidate the filters exclude
+            fused_results = [
+                (cid, score)
+                for cid, score in fused_results
+                if doc_filter.allows(generation.parent_of(cid))
+            ]
 
         candidate_ids = [cid for cid, _ in fused_results[:rerank_top_k]]
-        filtered_ids = self.graph_algorithms.apply_temporal_filter(candidate_ids)
+        filtered_ids = generation.graph_algorithms.apply_temporal_filter(candidate_ids)
 
         filtered_fused = []
         seen_ids = set()
@@ -452,37 +760,38 @@ class HybridSearchEngine:
                 filtered_fused.append((cid, score))
                 seen_ids.add(cid)
 
+        head = filtered_fused[:rerank_top_k]
+        # Chunks not in the graph (yet): one batched fetch, LRU-cached
+        hydrated = self.vector_store.get_chunks(
+            [chunk_id for chunk_id, _ in head if chunk_id not in graph]
+        )
+
         chunks_for_reranking = []
-        for chunk_id, rrf_score in filtered_fused[:rerank_top_k]:
-            if chunk_id in self.graph:
-                node_data = self.graph.nodes[chunk_id]
-                chunk_text = node_data.get("text", "")
-                chunks_for_reranking.append(
-                    {"id": chunk_id, "text": chunk_text, "rrf_score": rrf_score}
-                )
+        for chunk_id, rrf_score in head:
+            if chunk_id in graph:
+                chunk_text = graph.nodes[chunk_id].get("text", "")
+            elif chunk_id in hydrated:
+                chunk_text = hydrated[chunk_id]["text"]
             else:
-                try:
-                    vs_result = self.vector_store.collection.get(ids=[chunk_id])
-                    if vs_result and vs_result.get("documents"):
-                        chunks_for_reranking.append(
-                            {
-                                "id": chunk_id,
-                                "text": vs_result["documents"][0],
-                                "rrf_score": rrf_score,
-                            }
-                        )
-                except:
-                    pass
+                logger.debug(f"Candidate {chunk_id} not found in graph or vector store")
+                continue
+            chunks_for_reranking.append(
+                {"id": chunk_id, "text": chunk_text, "rrf_score": rrf_score}
+            )
 
         if use_reranking and self.reranker and chunks_for_reranking:
+            rerank = (
+                self.reranker.cascade_rerank if cascade_rerank else self.reranker.rerank
+            )
             try:
-                reranked_chunks = self.reranker.rerank(
+                reranked_chunks = rerank(
                     query=query,
                     chunks=chunks_for_reranking,
                     top_k=limit * 2,
                     text_key="text",
                 )
-            except:
+            except Exception as e:
+                logger.warning(f"Reranking failed: {e}")
                 reranked_chunks = chunks_for_reranking[: limit * 2]
         else:
             reranked_chunks = chunks_for_reranking[: limit * 2]
@@ -490,18 +799,18 @@ class HybridSearchEngine:
         top_chunk_ids = [c["id"] for c in reranked_chunks[:limit]]
 
         if use_ppr:
-            expanded_subgraph = self.graph_algorithms.extract_ppr_subgraph(
+            expanded_subgraph = generation.graph_algorithms.extract_ppr_subgraph(
                 top_chunk_ids, top_k=20
             )
             expanded_nodes = list(expanded_subgraph.nodes)
         elif multi_hop:
             expanded_nodes = list(
-                self.graph_algorithms.smart_k_hop_expansion(top_chunk_ids, k=2)
+                generation.graph_algorithms.smart_k_hop_expansion(top_chunk_ids, k=2)
             )
         else:
             expanded_nodes = top_chunk_ids
 
-        centrality_scores = self.graph_algorithms.get_centrality_scores(expanded_nodes)
+        centrality_scores = generation.graph_algorithms.get_centrality_scores(expanded_nodes)
 
         hybrid_results = []
         for chunk in reranked_chunks[:limit]:
@@ -517,6 +826,7 @@ class HybridSearchEngine:
                 "score": combined_score,
                 "rrf_score": chunk.get("rrf_score", 0.0),
                 "reranker_score": chunk.get("reranker_score", 0.0),
+                "rerank_stage": chunk.get("rerank_stage", "rrf"),
                 "graph_centrality": g_score,
                 "breadcrumbs": "",
                 "source_url": "",
@@ -529,19 +839,19 @@ class HybridSearchEngine:
                 "neighbor_context": [],
             }
 
-            if chunk_id in self.graph:
-                node_data = self.graph.nodes[chunk_id]
+            if chunk_id in graph:
+                node_data = graph.nodes[chunk_id]
                 entry["breadcrumbs"] = node_data.get("context", "")
                 entry["rules"] = node_data.get("rules", [])
 
                 if multi_hop or use_ppr:
-                    for neighbor in self.graph.successors(chunk_id):
+                    for neighbor in graph.successors(chunk_id):
                         if neighbor in expanded_nodes:
-                            self._add_neighbor_context(entry, neighbor)
+                            self._add_neighbor_context(entry, neighbor, graph)
 
-                    parents = list(self.graph.predecessors(chunk_id))
+                    parents = list(graph.predecessors(chunk_id))
                     for p in parents:
-                        p_data = self.graph.nodes[p]
+                        p_data = graph.nodes[p]
                         if p_data.get("type") == "document":
                             entry["source_url"] = p_data.get("url", "")
                             entry["doc_title"] = p_data.get("title", "")
@@ -550,14 +860,14 @@ class HybridSearchEngine:
                             entry["stand"] = p_data.get("stand", "")
                             entry["kuerzel"] = p_data.get("kuerzel", "")
 
-                            for _, target_id, edata in self.graph.out_edges(
+                            for _, target_id, edata in graph.out_edges(
                                 p, data=True
                             ):
                                 if (
                                     edata.get("relation") == "REFERENCES"
                                     and target_id in expanded_nodes
                                 ):
-                                    self._add_neighbor_context(entry, target_id)
+                                    self._add_neighbor_context(entry, target_id, graph)
 
             hybrid_results.append(entry)
 
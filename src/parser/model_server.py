@@ -0,0 +1,302 @@
+"""
+Local model server shared by all API workers.
+
+Every uvicorn worker would otherwise load its own cross-encoder and spaCy
+pipeline (several hundred MB each). The model server hosts both once and
+serves all workers over a unix socket. Reranker requests from all workers
+go through one MicroBatcher, so they are also coalesced across workers.
+
+Protocol: length-prefixed JSON (4-byte big-endian length + UTF-8 JSON).
+    {"method": "predict", "params": {"pairs": [[query, text], ...]}}
+    -> {"result": [score, ...]}   or   {"error": "..."}
+Methods: ping, predict, tokenize.
+
+Run:
+    python -m src.parser.model_server --socket /run/models/models.sock
+
+Workers use it when MODEL_SERVER_SOCKET (or model_server.socket in
+settings) is set; otherwise models stay in-process (development mode).
+"""
+
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import struct
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.config_loader import settings
+from src.parser.bm25_index import SPACY_AVAILABLE, spacy, spacy_tokens
+from src.parser.reranker import Pair, Reranker, create_reranker
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">I")
+
+
+class ModelServerError(Exception):
+    """Raised by the client when the server reports an error."""
+
+
+def model_server_socket() -> Optional[str]:
+    return os.getenv("MODEL_SERVER_SOCKET") or settings.get("model_server.socket")
+
+
+def _send(sock: socket.socket, payload: Dict[str, Any]):
+    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            return None
+        buffer.extend(chunk)
+    return bytes(buffer)
+
+
+def _recv(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    data = _recv_exact(sock, _HEADER.unpack(header)[0])
+    if data is None:
+        return None
+    return json.loads(data)
+
+
+# --- Server ---------------------------------------------------------------
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        # One connection per client thread, many requests per connection
+        while True:
+            try:
+                request = _recv(self.request)
+            except (OSError, ValueError):
+                return
+            if request is None:
+                return
+            try:
+                result = self.server.dispatch(
+                    request.get("method"), request.get("params") or {}
+                )
+                response = {"result": result}
+            except Exception as e:
+                logger.error(f"Model server: {request.get('method')} failed: {e}")
+                response = {"error": str(e)}
+            try:
+                _send(self.request, response)
+            except OSError:
+                return
+
+
+class ModelServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Example:
+        >>> server = ModelServer("/run/models/models.sock", reranker, nlp)
+        >>> server.serve_forever()
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, reranker: Optional[Reranker] = None, nlp=None):
+        path = Path(socket_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists():
+            # Stale socket of a previous run
+            path.unlink()
+        super().__init__(str(path), _Handler)
+        self.socket_path = path
+        self.reranker = reranker
+        self.nlp = nlp
+        # spaCy pipelines are not documented as thread-safe
+        self._nlp_lock = threading.Lock()
+
+    def dispatch(self, method: Optional[str], params: Dict[str, Any]) -> Any:
+        if method == "ping":
+            return {
+                "reranker": bool(self.reranker and self.reranker.model),
+                "tokenizer": self.nlp is not None,
+                "stats": self.reranker.get_stats() if self.reranker else None,
+            }
+        if method == "predict":
+            if not (self.reranker and self.reranker.model):
+                raise RuntimeError("Reranker not available on the model server")
+            pairs: List[Pair] = [(query, text) for query, text in params["pairs"]]
+            if self.reranker.batcher:
+                return self.reranker.batcher.predict(pairs)
+            return self.reranker._predict(pairs)
+        if method == "tokenize":
+            if self.nlp is None:
+                raise RuntimeError("spaCy pipeline not available on the model server")
+            texts = [text.lower() for text in params["texts"]]
+            with self._nlp_lock:
+                return [spacy_tokens(doc) for doc in self.nlp.pipe(texts, batch_size=64)]
+        raise ValueError(f"Unknown method: {method}")
+
+    def server_close(self):
+        super().server_close()
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+
+# --- Client ---------------------------------------------------------------
+
+
+class ModelClient:
+    """
+    Thread-safe client: every thread keeps its own persistent connection.
+
+    Example:
+        >>> client = ModelClient("/run/models/models.sock")
+        >>> client.call("tokenize", texts=["Zuwendungen für Reisekosten"])
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 30.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _reset(self):
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            sock.close()
+
+    def call(self, method: str, **params) -> Any:
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                _send(sock, {"method": method, "params": params})
+                response = _recv(sock)
+                if response is None:
+                    raise ConnectionError("Model server closed the connection")
+                break
+            except OSError:
+                # Server restarted: reconnect once
+                self._reset()
+                if attempt:
+                    raise
+        if "error" in response:
+            raise ModelServerError(response["error"])
+        return response["result"]
+
+
+_clients: Dict[str, ModelClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_model_client(socket_path: Optional[str] = None) -> ModelClient:
+    """Process-wide client for the configured socket."""
+    socket_path = socket_path or model_server_socket()
+    if not socket_path:
+        raise ValueError("No model server socket configured (MODEL_SERVER_SOCKET)")
+    with _clients_lock:
+        if socket_path not in _clients:
+            _clients[socket_path] = ModelClient(socket_path)
+        return _clients[socket_path]
+
+
+class RemoteReranker(Reranker):
+    """
+    Reranker that scores on the model server. The score cache stays local;
+    batching happens on the server, across all workers.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "mmarco-mMiniLM-L12",
+        socket_path: Optional[str] = None,
+        **kwargs
+    ):
+        kwargs.setdefault("batch_window_ms", 0)
+        super().__init__(model_name=model_name, **kwargs)
+        self.socket_path = socket_path or model_server_socket()
+        self.client: Optional[ModelClient] = None
+
+    def _load(self):
+        try:
+            client = get_model_client(self.socket_path)
+            if not client.call("ping")["reranker"]:
+                raise ModelServerError("model server has no reranker loaded")
+            self.client = client
+            self.model = client
+            self.is_initialized = True
+            logger.info(f"Using reranker of the model server at {self.socket_path}")
+        except Exception as e:
+            # Not marked initialized: retried on the next request (server may
+            # still be starting)
+            logger.warning(f"Model server not available ({e}), skipping reranking")
+            self.model = None
+
+    def _predict(self, pairs: List[Pair]) -> List[float]:
+        return self.client.call("predict", pairs=pairs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats["backend"] = "remote"
+        stats["socket"] = self.socket_path
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared model server for API workers")
+    parser.add_argument(
+        "--socket",
+        default=model_server_socket() or "/tmp/foerderwissensgraph-models.sock",
+        help="Unix socket path",
+    )
+    parser.add_argument("--no-spacy", action="store_true", help="Do not host spaCy")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    reranker = create_reranker(enabled=True, remote=False)
+    if isinstance(reranker, Reranker):
+        # Load eagerly: the first worker request should not pay for it
+        reranker._lazy_init()
+    else:
+        reranker = None
+
+    nlp = None
+    if SPACY_AVAILABLE and not args.no_spacy:
+        try:
+            nlp = spacy.load("de_core_news_sm", disable=["parser", "ner"])
+        except OSError:
+            logger.warning("SpaCy model 'de_core_news_sm' not found, tokenizer disabled")
+
+    server = ModelServer(args.socket, reranker=reranker, nlp=nlp)
+    logger.info(
+        f"Model server listening on {args.socket} "
+        f"(reranker: {bool(reranker and reranker.model)}, spaCy: {nlp is not None})"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+ONNX Runtime backend for the cross-encoder reranker.
+
+The PyTorch cross-encoder costs ~500MB RSS and 0.5-1s per rerank on CPU. This
+backend exports the same model to ONNX once, quantizes the weights to int8
+(dynamic quantization) and serves it with ONNX Runtime and the Rust
+`tokenizers` library: no torch at runtime, a fraction of the memory and
+several times lower latency.
+
+Export (one-off, needs torch + transformers; runs automatically on first use):
+    python -m src.parser.onnx_reranker
+
+Layout:
+    data/onnx_models/mmarco-mMiniLM-L12/
+        model.onnx          (fp32 export)
+        model-int8.onnx     (quantized, served)
+        tokenizer.json
+"""
+
+import inspect
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.config_loader import settings
+from src.parser.reranker import Pair, Reranker
+
+logger = logging.getLogger(__name__)
+
+try:
+    import onnxruntime as ort
+    from tokenizers import Tokenizer
+
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+    ort = None
+    Tokenizer = None
+
+QUANTIZED_FILE = "model-int8.onnx"
+EXPORT_FILE = "model.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+
+
+def export_onnx_model(model_path: str, output_dir: Path, quantize: bool = True) -> Path:
+    """
+    Exports a Hugging Face cross-encoder to ONNX (+ int8 dynamic quantization).
+
+    Returns:
+        Path of the model file to serve
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    logger.info(f"Exporting {model_path} to ONNX in {output_dir}")
+
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    model = AutoModelForSequenceClassification.from_pretrained(model_path)
+    model.eval()
+
+    sample = tokenizer(
+        ["Schwellenwerte"], ["Die Schwellenwerte betragen 1000 Euro."], return_tensors="pt"
+    )
+    # Bind inputs by keyword and name them in forward() order: BERT tokenizers
+    # emit token_type_ids before attention_mask, forward() expects it after
+    input_names = [
+        name for name in inspect.signature(model.forward).parameters if name in sample
+    ]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    export_path = output_dir / EXPORT_FILE
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            ({name: sample[name] for name in input_names},),
+            str(export_path),
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=17,
+        )
+    # The runtime only needs the fast tokenizer definition
+    tokenizer.backend_tokenizer.save(str(output_dir / TOKENIZER_FILE))
+
+    if not quantize:
+        return export_path
+
+    quantized_path = output_dir / QUANTIZED_FILE
+    quantize_dynamic(str(export_path), str(quantized_path), weight_type=QuantType.QInt8)
+    logger.info(
+        f"Quantized model: {quantized_path.stat().st_size / 1024 / 1024:.1f} MB "
+        f"(fp32: {export_path.stat().st_size / 1024 / 1024:.1f} MB)"
+    )
+    return quantized_path
+
+
+class OnnxReranker(Reranker):
+    """
+    Drop-in Reranker backed by an int8 ONNX model.
+
+    rerank() and the scores keep the Reranker contract (sigmoid of the logit,
+    as CrossEncoder.predict returns for single-label models).
+
+    Example:
+        >>> reranker = OnnxReranker()
+        >>> reranked = reranker.rerank("Vergaberecht", chunks, top_k=10)
+    """
+
+    def __init__(
+        self,
+        model_name: str = "mmarco-mMiniLM-L12",
+        max_length: int = 512,
+        model_dir: Optional[Path] = None,
+        quantize: bool = True,
+        intra_op_threads: Optional[int] = None,
+        batch_size: int = 32,
+        **kwargs
+    ):
+        super().__init__(model_name=model_name, max_length=max_length, device="cpu", **kwargs)
+        self.model_dir = model_dir or Path(
+            settings.get("paths.onnx_models", "data/onnx_models")
+        ) / model_name
+        self.quantize = quantize
+        self.intra_op_threads = intra_op_threads or settings.get(
+            "reranker.onnx_threads"
+        ) or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.tokenizer: Optional["Tokenizer"] = None
+        self._input_names: List[str] = []
+
+    @property
+    def model_file(self) -> Path:
+        return self.model_dir / (QUANTIZED_FILE if self.quantize else EXPORT_FILE)
+
+    def _load(self):
+        if not ONNX_AVAILABLE:
+            logger.warning("onnxruntime/tokenizers not available. Reranking will be no-op.")
+            self.model = None
+            self.is_initialized = True
+            return
+
+        try:
+            if not (self.model_file.exists() and (self.model_dir / TOKENIZER_FILE).exists()):
+                export_onnx_model(self.model_path, self.model_dir, quantize=self.quantize)
+
+            options = ort.SessionOptions()
+            options.intra_op_num_threads = self.intra_op_threads
+            # Parallelism lives inside the ops; requests are already batched
+            options.inter_op_num_threads = 1
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            self.model = ort.InferenceSession(
+                str(self.model_file), options, providers=["CPUExecutionProvider"]
+            )
+            self._input_names = [i.name for i in self.model.get_inputs()]
+
+            self.tokenizer = Tokenizer.from_file(str(self.model_dir / TOKENIZER_FILE))
+            self.tokenizer.enable_truncation(max_length=self.max_length)
+            self.tokenizer.enable_padding()
+            logger.info(
+                f"ONNX cross-encoder loaded: {self.model_file} "
+                f"({self.intra_op_threads} intra-op threads)"
+            )
+        except Exception as e:
+            logger.error(f"Failed to load ONNX cross-encoder: {e}")
+            logger.warning("Reranking will be disabled (no-op)")
+            self.model = None
+        self.is_initialized = True
+
+    def _predict(self, pairs: List[Pair]) -> List[float]:
+        scores: List[float] = []
+        for start in range(0, len(pairs), self.batch_size):
+            encodings = self.tokenizer.encode_batch(pairs[start : start + self.batch_size])
+            features = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": np.array(
+                    [e.attention_mask for e in encodings], dtype=np.int64
+                ),
+                "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+            }
+            logits = self.model.run(
+                None, {name: features[name] for name in self._input_names}
+            )[0]
+            scores.extend((1.0 / (1.0 + np.exp(-logits[:, 0]))).tolist())
+        return scores
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats["backend"] = "onnx-int8" if self.quantize else "onnx"
+        stats["backend_available"] = ONNX_AVAILABLE
+        if self.is_initialized:
+            stats["model_file"] = str(self.model_file)
+            stats["intra_op_threads"] = self.intra_op_threads
+        return stats
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    reranker = OnnxReranker()
+    export_onnx_model(reranker.model_path, reranker.model_dir, quantize=True)
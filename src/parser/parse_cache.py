@@ -0,0 +1,124 @@
+"""
+On-disk cache for Docling parse artifacts.
+
+Layout conversion is by far the most expensive step of the ingest pipeline.
+This cache stores the converted DoclingDocument (as JSON) keyed by the PDF
+content hash and the Docling version, and the derived chunk list keyed
+additionally by the chunker configuration. Rebuilding the graph from scratch,
+re-chunking or re-extracting citations therefore reuses earlier conversions.
+
+Layout:
+    data/parse_cache/documents/{sha256}_{docling}.json
+    data/parse_cache/chunks/{sha256}_{docling}_{chunker}.json
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ParseCache:
+    """
+    Content-addressed store for DoclingDocument JSON and chunk lists.
+
+    Example:
+        >>> cache = ParseCache(Path("data/parse_cache"))
+        >>> cache.get_chunks(pdf_hash, "2.15.0", chunker_key)
+        [{"text": "...", "headings": ["1 Zuwendungszweck"]}, ...]
+    """
+
+    def __init__(self, cache_dir: Path = Path("data/parse_cache")):
+        self.cache_dir = cache_dir
+        self.documents_dir = cache_dir / "documents"
+        self.chunks_dir = cache_dir / "chunks"
+        self.documents_dir.mkdir(parents=True, exist_ok=True)
+        self.chunks_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def file_hash(file_path: Path) -> str:
+        """SHA256 of a file, identical to the hash stored in crawler manifests."""
+        sha256_hash = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for byte_block in iter(lambda: f.read(65536), b""):
+                sha256_hash.update(byte_block)
+        return sha256_hash.hexdigest()
+
+    @staticmethod
+    def config_key(config: Dict[str, Any]) -> str:
+        """Short stable hash of a configuration dict (e.g. chunker settings)."""
+        raw = json.dumps(config, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def _safe(value: str) -> str:
+        return re.sub(r"[^A-Za-z0-9._-]", "_", value)
+
+    def _document_path(self, pdf_hash: str, docling_version: str) -> Path:
+        return self.documents_dir / f"{pdf_hash}_{self._safe(docling_version)}.json"
+
+    def _chunks_path(
+        self, pdf_hash: str, docling_version: str, chunker_key: str
+    ) -> Path:
+        return (
+            self.chunks_dir
+            / f"{pdf_hash}_{self._safe(docling_version)}_{chunker_key}.json"
+        )
+
+    def _read(self, path: Path) -> Optional[Any]:
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"ParseCache: Ignoring unreadable entry {path}: {e}")
+            return None
+
+    def _write(self, path: Path, payload: Any):
+        # Atomic write pattern: a crash never leaves a half-written entry behind
+        temp_path = path.with_suffix(".tmp")
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except Exception as e:
+            logger.error(f"ParseCache: Failed to write {path}: {e}")
+            if temp_path.exists():
+                os.remove(temp_path)
+
+    def get_document(
+        self, pdf_hash: str, docling_version: str
+    ) -> Optional[Dict[str, Any]]:
+        return self._read(self._document_path(pdf_hash, docling_version))
+
+    def put_document(
+        self, pdf_hash: str, docling_version: str, document: Dict[str, Any]
+    ):
+        self._write(self._document_path(pdf_hash, docling_version), document)
+
+    def get_chunks(
+        self, pdf_hash: str, docling_version: str, chunker_key: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        return self._read(self._chunks_path(pdf_hash, docling_version, chunker_key))
+
+    def put_chunks(
+        self,
+        pdf_hash: str,
+        docling_version: str,
+        chunker_key: str,
+        chunks: List[Dict[str, Any]],
+    ):
+        self._write(self._chunks_path(pdf_hash, docling_version, chunker_key), chunks)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "cache_dir": str(self.cache_dir),
+            "documents": sum(1 for _ in self.documents_dir.glob("*.json")),
+            "chunk_lists": sum(1 for _ in self.chunks_dir.glob("*.json")),
+        }
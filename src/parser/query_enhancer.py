@@ -1,10 +1,20 @@
+import asyncio
 import logging
 import json
-from typing import List, Dict, Any, Optional
-from src.llm.base_provider import BaseLLMProvider
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, Dict, Any, Optional, Tuple
+from src.config_loader import settings
+from src.llm.base_provider import AsyncBaseLLMProvider, BaseLLMProvider
 
 logger = logging.getLogger(__name__)
 
+# Shared by all enhancers: three LLM calls per query, a few queries at a time
+_ENHANCE_POOL = ThreadPoolExecutor(max_workers=12, thread_name_prefix="enhance")
+
 
 class QueryEnhancer:
     """
@@ -12,16 +22,45 @@ class QueryEnhancer:
     - Multi-Query Generation
     - HyDE (Hypothetical Document Embeddings)
     - Query Decomposition
+
+    The three LLM calls of enhance() run concurrently. Results are cached per
+    normalized query (TTL + LRU). With a time budget, enhance() returns what
+    has arrived by then; calls still running complete in the background and
+    fill the cache for the next request.
     """
 
-    def __init__(self, llm_provider: BaseLLMProvider):
+    def __init__(
+        self,
+        llm_provider: BaseLLMProvider,
+        cache_ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        time_budget: Optional[float] = None,
+    ):
         self.llm = llm_provider
+        self.cache_ttl = (
+            cache_ttl
+            if cache_ttl is not None
+            else settings.get("query_enhancement.cache_ttl_seconds", 3600)
+        )
+        self.max_entries = (
+            max_entries
+            if max_entries is not None
+            else settings.get("query_enhancement.cache_max_entries", 500)
+        )
+        self.time_budget = (
+            time_budget
+            if time_budget is not None
+            else settings.get("query_enhancement.time_budget_seconds")
+        )
+        self._cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "partial": 0}
 
-    def generate_variations(self, query: str, num_variations: int = 2) -> List[str]:
-        """
-        Generates variations of the user query.
-        """
-        prompt = f"""Du bist ein Experte für deutsches Vergaberecht und Zuwendungsrecht.
+    # --- Prompts & parsing (shared by the sync and async paths) ---
+
+    @staticmethod
+    def _variations_prompt(query: str, num_variations: int) -> str:
+        return f"""Du bist ein Experte für deutsches Vergaberecht und Zuwendungsrecht.
 Generiere {num_variations} alternative Formulierungen für die folgende Nutzeranfrage.
 Nutze dabei Synonyme, juristische Fachbegriffe und präzisere Formulierungen, die in deutschen Gesetzestexten oder Richtlinien vorkommen könnten.
 
@@ -30,14 +69,89 @@ Nutzeranfrage: "{query}"
 Gib die Variationen als einfache Liste zurück, eine pro Zeile. Keine Nummerierung, kein Text davor oder danach.
 Variationen:"""
 
+    @staticmethod
+    def _parse_variations(content: Optional[str], num_variations: int) -> List[str]:
+        variations = [v.strip() for v in (content or "").strip().split("\n") if v.strip()]
+        return variations[:num_variations]
+
+    @staticmethod
+    def _hyde_prompt(query: str) -> str:
+        return f"""Du bist ein Experte für deutsches Vergaberecht und Zuwendungsrecht.
+Schreibe eine hypothetische, fachlich fundierte Antwort auf die folgende Frage im Stil eines deutschen Gesetzestextes oder einer offiziellen Förderrichtlinie.
+Die Antwort muss nicht faktisch korrekt sein, aber sie sollte die typische Sprache, Struktur und Fachbegriffe enthalten (z.B. Paragraphen, Verweise auf VgV, GWB, BHO).
+
+Frage: "{query}"
+
+Hypothetischer Text:"""
+
+    @staticmethod
+    def _decompose_prompt(query: str) -> str:
+        return f"""Zerlege die folgende komplexe Anfrage zum deutschen Zuwendungs- oder Vergaberecht in einfache, separate Teilfragen.
+Jede Teilfrage sollte eigenständig beantwortbar sein.
+
+Komplexe Anfrage: "{query}"
+
+Gib die Teilfragen als JSON-Liste von Strings zurück.
+Beispiel: ["Teilfrage 1", "Teilfrage 2"]
+JSON:"""
+
+    @staticmethod
+    def _parse_sub_queries(sub_queries: Any, query: str) -> List[str]:
+        if isinstance(sub_queries, list):
+            return sub_queries
+        if isinstance(sub_queries, dict) and "sub_queries" in sub_queries:
+            return sub_queries["sub_queries"]
+        if isinstance(sub_queries, dict):
+            # Fallback for other dict structures
+            return list(sub_queries.values())[0] if sub_queries else []
+        return [query]
+
+    @staticmethod
+    def _needs_decomposition(query: str) -> bool:
+        return len(query.split()) > 10
+
+    # The underscore variants raise on LLM errors, so enhance() can tell a
+    # failed call (not cached) from an empty answer
+
+    def _generate_variations(self, query: str, num_variations: int = 2) -> List[str]:
+        prompt = self._variations_prompt(query, num_variations)
+        logger.info(f"Generating variations for: {query}")
+        response = self.llm.generate(prompt, max_tokens=200, temperature=0.7)
+        logger.info(f"LLM Response: {response.content}")
+        return self._parse_variations(response.content, num_variations)
+
+    def _generate_hyde_response(self, query: str) -> str:
+        prompt = self._hyde_prompt(query)
+        logger.info(f"Generating HyDE for: {query}")
+        response = self.llm.generate(prompt, max_tokens=400, temperature=0.5)
+        logger.info(f"LLM Response: {response.content}")
+        return (response.content or "").strip()
+
+    def _decompose_query(self, query: str) -> List[str]:
+        prompt = self._decompose_prompt(query)
+        # Try using generate_json if supported, otherwise parse manually
+        try:
+            sub_queries = self.llm.generate_json(prompt, max_tokens=300)
+            return self._parse_sub_queries(sub_queries, query)
+        except (AttributeError, NotImplementedError):
+            response = self.llm.generate(prompt, max_tokens=300, temperature=0.3)
+            content = (response.content or "").strip()
+            # Find JSON part
+            start = content.find("[")
+            end = content.rfind("]") + 1
+            if start != -1 and end != 0:
+                try:
+                    return json.loads(content[start:end])
+                except json.JSONDecodeError:
+                    pass
+            return [query]  # Fallback to original query
+
+    def generate_variations(self, query: str, num_variations: int = 2) -> List[str]:
+        """
+        Generates variations of the user query.
+        """
         try:
-            logger.info(f"Generating variations for: {query}")
-            response = self.llm.generate(prompt, max_tokens=200, temperature=0.7)
-            logger.info(f"LLM Response: {response.content}")
-            variations = [
-                v.strip() for v in response.content.strip().split("\n") if v.strip()
-            ]
-            return variations[:num_variations]
+            return self._generate_variations(query, num_variations)
         except Exception as e:
             logger.error(f"Failed to generate query variations: {e}")
             return []
@@ -46,19 +160,8 @@ Variationen:"""
         """
         Generates a hypothetical answer (HyDE).
         """
-        prompt = f"""Du bist ein Experte für deutsches Vergaberecht und Zuwendungsrecht.
-Schreibe eine hypothetische, fachlich fundierte Antwort auf die folgende Frage im Stil eines deutschen Gesetzestextes oder einer offiziellen Förderrichtlinie.
-Die Antwort muss nicht faktisch korrekt sein, aber sie sollte die typische Sprache, Struktur und Fachbegriffe enthalten (z.B. Paragraphen, Verweise auf VgV, GWB, BHO).
-
-Frage: "{query}"
-
-Hypothetischer Text:"""
-
         try:
-            logger.info(f"Generating HyDE for: {query}")
-            response = self.llm.generate(prompt, max_tokens=400, temperature=0.5)
-            logger.info(f"LLM Response: {response.content}")
-            return response.content.strip()
+            return self._generate_hyde_response(query)
         except Exception as e:
             logger.error(f"Failed to generate HyDE response: {e}")
             return ""
@@ -67,57 +170,221 @@ Hypothetischer Text:"""
         """
         Decomposes complex, multi-part questions into simple sub-questions.
         """
-        prompt = f"""Zerlege die folgende komplexe Anfrage zum deutschen Zuwendungs- oder Vergaberecht in einfache, separate Teilfragen.
-Jede Teilfrage sollte eigenständig beantwortbar sein.
+        try:
+            return self._decompose_query(query)
+        except Exception as e:
+            logger.error(f"Failed to decompose query: {e}")
+            return [query]
 
-Komplexe Anfrage: "{query}"
+    # --- Async variants (providers with native async clients) ---
 
-Gib die Teilfragen als JSON-Liste von Strings zurück.
-Beispiel: ["Teilfrage 1", "Teilfrage 2"]
-JSON:"""
+    async def _agenerate_variations(self, query: str, num_variations: int = 2) -> List[str]:
+        response = await self.llm.agenerate(
+            self._variations_prompt(query, num_variations),
+            max_tokens=200,
+            temperature=0.7,
+        )
+        return self._parse_variations(response.content, num_variations)
+
+    async def _agenerate_hyde_response(self, query: str) -> str:
+        response = await self.llm.agenerate(
+            self._hyde_prompt(query), max_tokens=400, temperature=0.5
+        )
+        return (response.content or "").strip()
 
+    async def _adecompose_query(self, query: str) -> List[str]:
+        sub_queries = await self.llm.agenerate_json(
+            self._decompose_prompt(query), max_tokens=300
+        )
+        return self._parse_sub_queries(sub_queries, query)
+
+    async def agenerate_variations(self, query: str, num_variations: int = 2) -> List[str]:
         try:
-            # Try using generate_json if supported, otherwise parse manually
-            try:
-                sub_queries = self.llm.generate_json(prompt, max_tokens=300)
-                if isinstance(sub_queries, list):
-                    return sub_queries
-                if isinstance(sub_queries, dict) and "sub_queries" in sub_queries:
-                    return sub_queries["sub_queries"]
-                if isinstance(sub_queries, dict):
-                    # Fallback for other dict structures
-                    return list(sub_queries.values())[0] if sub_queries else []
-            except (AttributeError, NotImplementedError):
-                response = self.llm.generate(prompt, max_tokens=300, temperature=0.3)
-                content = response.content.strip()
-                # Find JSON part
-                start = content.find("[")
-                end = content.rfind("]") + 1
-                if start != -1 and end != 0:
-                    return json.loads(content[start:end])
-                return [query]  # Fallback to original query
+            return await self._agenerate_variations(query, num_variations)
+        except Exception as e:
+            logger.error(f"Failed to generate query variations: {e}")
+            return []
 
-            return [query]
+    async def agenerate_hyde_response(self, query: str) -> str:
+        try:
+            return await self._agenerate_hyde_response(query)
+        except Exception as e:
+            logger.error(f"Failed to generate HyDE response: {e}")
+            return ""
+
+    async def adecompose_query(self, query: str) -> List[str]:
+        try:
+            return await self._adecompose_query(query)
         except Exception as e:
             logger.error(f"Failed to decompose query: {e}")
             return [query]
 
-    def enhance(self, query: str) -> Dict[str, Any]:
-        """
-        Performs full query enhancement.
-        """
-        logger.info(f"Enhancing query: {query}")
+    # --- Cache ---
 
-        variations = self.generate_variations(query)
-        hyde_text = self.generate_hyde_response(query)
-        sub_queries = (
-            self.decompose_query(query) if len(query.split()) > 10 else [query]
-        )
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        return re.sub(r"\s+", " ", query).strip().lower()
 
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._cache_lock:
+            item = self._cache.get(key)
+            if item is None:
+                self.stats["misses"] += 1
+                return None
+            stored_at, result = item
+            if time.monotonic() - stored_at > self.cache_ttl:
+                del self._cache[key]
+                self.stats["misses"] += 1
+                return None
+            self._cache.move_to_end(key)
+            self.stats["hits"] += 1
+            return result
+
+    def _cache_put(self, key: str, result: Dict[str, Any]):
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cache_lock:
+            return {**self.stats, "entries": len(self._cache)}
+
+    # --- Enhancement ---
+
+    @staticmethod
+    def _result(
+        query: str,
+        variations: Optional[List[str]] = None,
+        hyde_text: Optional[str] = None,
+        sub_queries: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """Assembles the result; None marks a call that did not finish in time."""
+        variations = variations or []
+        sub_queries = sub_queries or [query]
         return {
             "original_query": query,
             "variations": variations,
-            "hyde_text": hyde_text,
+            "hyde_text": hyde_text or "",
             "sub_queries": sub_queries,
-            "all_queries": list(set([query] + variations + sub_queries)),
+            "all_queries": list(dict.fromkeys([query] + variations + sub_queries)),
+        }
+
+    @staticmethod
+    def _collect(calls: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Results of the finished calls and the names of the failed ones.
+        Works for concurrent futures and asyncio tasks alike.
+        """
+        parts, failed = {}, []
+        for name, call in calls.items():
+            if not call.done():
+                continue
+            if call.cancelled():
+                failed.append(name)
+            elif call.exception() is not None:
+                logger.error(f"Query enhancement: {name} failed: {call.exception()}")
+                failed.append(name)
+            else:
+                parts[name] = call.result()
+        return parts, failed
+
+    def _finish_partial(self, key: str, query: str, calls: Dict[str, Any], budget: float):
+        """
+        Called when the budget ran out. The late calls keep running; once all
+        have arrived the complete result is cached for the next request,
+        unless one of them failed.
+        """
+        with self._cache_lock:
+            self.stats["partial"] += 1
+        late = {name: call for name, call in calls.items() if not call.done()}
+        logger.warning(
+            f"Query enhancement exceeded {budget}s budget, continuing without: {', '.join(late)}"
+        )
+
+        def _complete(_call):
+            if all(call.done() for call in late.values()):
+                parts, failed = self._collect(calls)
+                if not failed:
+                    self._cache_put(key, self._result(query, **parts))
+
+        for call in late.values():
+            call.add_done_callback(_complete)
+
+    def enhance(self, query: str, time_budget: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Performs full query enhancement.
+
+        Args:
+            time_budget: Seconds to wait for the LLM calls (default: configured
+                budget, None = wait for all). Missing parts are left empty.
+        """
+        key = self.normalize_query(query)
+        cached = self._cache_get(key)
+        if cached is not None:
+            logger.info(f"Query enhancement cache hit: {query}")
+            return cached
+
+        logger.info(f"Enhancing query: {query}")
+        budget = time_budget if time_budget is not None else self.time_budget
+
+        futures = {
+            "variations": _ENHANCE_POOL.submit(self._generate_variations, query),
+            "hyde_text": _ENHANCE_POOL.submit(self._generate_hyde_response, query),
         }
+        if self._needs_decomposition(query):
+            futures["sub_queries"] = _ENHANCE_POOL.submit(self._decompose_query, query)
+
+        _, pending = wait(futures.values(), timeout=budget)
+        parts, failed = self._collect(futures)
+        result = self._result(query, **parts)
+
+        if failed:
+            # Not cached: one LLM outage would otherwise disable enhancement
+            # for this query for the whole TTL
+            logger.warning(f"Query enhancement not cached, failed: {', '.join(failed)}")
+        elif pending:
+            self._finish_partial(key, query, futures, budget)
+        else:
+            self._cache_put(key, result)
+        return result
+
+    async def aenhance(self, query: str, time_budget: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Async counterpart of enhance() for callers on an event loop. Uses the
+        provider's async client if available, otherwise runs enhance() in a thread.
+        """
+        if not isinstance(self.llm, AsyncBaseLLMProvider):
+            return await asyncio.to_thread(self.enhance, query, time_budget)
+
+        key = self.normalize_query(query)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        budget = time_budget if time_budget is not None else self.time_budget
+        tasks = {
+            "variations": asyncio.ensure_future(self._agenerate_variations(query)),
+            "hyde_text": asyncio.ensure_future(self._agenerate_hyde_response(query)),
+        }
+        if self._needs_decomposition(query):
+            tasks["sub_queries"] = asyncio.ensure_future(self._adecompose_query(query))
+
+        _, pending = await asyncio.wait(tasks.values(), timeout=budget)
+        parts, failed = self._collect(tasks)
+        result = self._result(query, **parts)
+
+        if failed:
+            # Not cached: one LLM outage would otherwise disable enhancement
+            # for this query for the whole TTL
+            logger.warning(f"Query enhancement not cached, failed: {', '.join(failed)}")
+        elif pending:
+            self._finish_partial(key, query, tasks, budget)
+        else:
+            self._cache_put(key, result)
+        return result
@@ -0,0 +1,304 @@
+"""
+LLM-free query expansion from the graph's own vocabulary.
+
+The thesaurus is built at index-build time from:
+- config/compliance_concepts.json (concept -> regulation, e.g. reisekosten -> BRKG)
+- Kürzel/title aliases of document and law nodes
+- MinistryRegistry aliases (BMWi -> BMWK)
+- BM25 co-occurrence: terms that appear together with a seed term far more
+  often than chance (normalized PMI over the tokenized chunks)
+
+Expanding a query is a handful of dict lookups (well below a millisecond), so
+it can run on every search. The LLM-based QueryEnhancer stays available for
+opt-in deep search.
+
+Layout:
+    data/query_thesaurus.json
+    {"version": 1, "built_at": "...", "terms": {"reisekosten": ["BRKG", ...]}}
+"""
+
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import networkx as nx
+
+from src.config_loader import settings
+from src.models.ministry_registry import MINISTRY_REGISTRY
+
+logger = logging.getLogger(__name__)
+
+THESAURUS_VERSION = 1
+
+_WORD_RE = re.compile(r"[\w§-]+")
+# Longest alias/title (in words) that is matched as one key
+MAX_NGRAM = 6
+# German compounds: "Reisekostenabrechnung" matches the key "reisekosten"
+MIN_AFFIX = 5
+
+
+def _add(terms: Dict[str, List[str]], key: str, values: Iterable[str]):
+    key = key.strip().lower()
+    if not key:
+        return
+    entry = terms.setdefault(key, [])
+    for value in values:
+        value = value.strip()
+        if value and value.lower() != key and value not in entry:
+            entry.append(value)
+
+
+def _label(node_id: str, graph: nx.MultiDiGraph) -> List[str]:
+    """Readable names of a concept target ("law_BRKG" -> BRKG + title)."""
+    labels = []
+    data = graph.nodes[node_id] if node_id in graph else {}
+    kuerzel = data.get("kuerzel") or (
+        node_id[len("law_") :].replace("_", " ") if node_id.startswith("law_") else node_id
+    )
+    labels.append(kuerzel)
+    title = _short_title(data.get("title"))
+    if title:
+        labels.append(title)
+    return labels
+
+
+def _short_title(title: Optional[str]) -> Optional[str]:
+    if not title:
+        return None
+    title = title.removeprefix("Gesetz: ").strip()
+    # Long Richtlinien titles would flood BM25 with generic words
+    return title if len(title.split()) <= MAX_NGRAM else None
+
+
+def _cooccurrence_terms(
+    corpus: List[List[str]],
+    seeds: Iterable[str],
+    max_related: int,
+    min_support: int = 3,
+    max_df_ratio: float = 0.1,
+    min_npmi: float = 0.3,
+) -> Dict[str, List[str]]:
+    """Top co-occurring tokens per seed token, ranked by normalized PMI."""
+    n_docs = len(corpus)
+    if not n_docs:
+        return {}
+    seeds = set(seeds)
+    df: Counter = Counter()
+    seed_docs: Dict[str, List[int]] = defaultdict(list)
+    doc_sets = []
+    for i, tokens in enumerate(corpus):
+        unique = set(tokens)
+        doc_sets.append(unique)
+        df.update(unique)
+        for seed in unique & seeds:
+            seed_docs[seed].append(i)
+
+    related = {}
+    for seed, docs in seed_docs.items():
+        co: Counter = Counter()
+        for i in docs:
+            co.update(doc_sets[i])
+        p_seed = len(docs) / n_docs
+        scored = []
+        for term, joint in co.items():
+            if (
+                term == seed
+                or joint < min_support
+                or len(term) <= 2
+                or df[term] / n_docs > max_df_ratio
+            ):
+                continue
+            p_joint = joint / n_docs
+            if p_joint >= 1.0:
+                continue
+            npmi = math.log(p_joint / (p_seed * df[term] / n_docs)) / -math.log(p_joint)
+            if npmi >= min_npmi:
+                scored.append((npmi, term))
+        scored.sort(reverse=True)
+        if scored:
+            related[seed] = [term for _, term in scored[:max_related]]
+    return related
+
+
+def build_thesaurus(
+    graph: nx.MultiDiGraph,
+    corpus: Optional[List[List[str]]] = None,
+    concepts_path: Path = Path("config/compliance_concepts.json"),
+    max_related: int = 3,
+) -> Dict[str, List[str]]:
+    """
+    Args:
+        graph: Knowledge graph (document/law nodes provide kürzel and titles)
+        corpus: Tokenized chunks of the BM25 index (enables co-occurrence terms)
+        concepts_path: Concept -> regulation mapping of the compliance mapper
+        max_related: Co-occurrence terms per seed term
+    """
+    terms: Dict[str, List[str]] = {}
+
+    # 1. Compliance concepts, and concepts sharing a target as mutual synonyms
+    concepts: Dict[str, str] = {}
+    if concepts_path.exists():
+        with open(concepts_path, "r", encoding="utf-8") as f:
+            concepts = json.load(f).get("concepts", {})
+    by_target: Dict[str, List[str]] = defaultdict(list)
+    for concept, target in concepts.items():
+        by_target[target].append(concept)
+    for target, group in by_target.items():
+        labels = _label(target, graph)
+        for concept in group:
+            _add(terms, concept, labels + group)
+        for label in labels:
+            _add(terms, label, group)
+
+    # 2. Kürzel <-> short title of documents and laws
+    for _, data in graph.nodes(data=True):
+        if data.get("node_type", data.get("type")) not in ("document", "law"):
+            continue
+        kuerzel = (data.get("kuerzel") or "").strip()
+        title = _short_title(data.get("title"))
+        if kuerzel and title:
+            _add(terms, kuerzel, [title])
+            _add(terms, title, [kuerzel])
+
+    # 3. Ministry aliases (historical names -> current kürzel)
+    for key, data in MINISTRY_REGISTRY.items():
+        names = [key] + data.get("aliases", [])
+        for name in names:
+            _add(terms, name, names)
+
+    # 4. Corpus co-occurrence for every single-word key
+    if corpus:
+        seeds = [key for key in terms if " " not in key]
+        for seed, related in _cooccurrence_terms(corpus, seeds, max_related).items():
+            _add(terms, seed, related)
+
+    return terms
+
+
+class LocalQueryExpander:
+    """
+    Example:
+        >>> expander = LocalQueryExpander.load(Path("data/query_thesaurus.json"))
+        >>> expander.expand("Welche Reisekosten sind erstattungsfähig?")
+        ['BRKG', 'Bundesreisekostengesetz', 'hotel']
+    """
+
+    def __init__(self, terms: Dict[str, List[str]], max_expansions: Optional[int] = None):
+        self.terms = terms
+        self.max_expansions = (
+            max_expansions
+            if max_expansions is not None
+            else settings.get("query_enhancement.max_expansions", 6)
+        )
+
+    @classmethod
+    def build(
+        cls,
+        graph: nx.MultiDiGraph,
+        corpus: Optional[List[List[str]]] = None,
+        **kwargs,
+    ) -> "LocalQueryExpander":
+        return cls(build_thesaurus(graph, corpus, **kwargs))
+
+    @classmethod
+    def load(cls, path: Path) -> "LocalQueryExpander":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != THESAURUS_VERSION:
+            raise ValueError(f"Unsupported thesaurus version in {path}")
+        return cls(data["terms"])
+
+    def save(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": THESAURUS_VERSION,
+            "built_at": datetime.now().isoformat(),
+            "terms": self.terms,
+        }
+        # Atomic write: the API may load the thesaurus while the pipeline saves it
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+        logger.info(f"Query thesaurus saved to {path} ({len(self.terms)} terms)")
+
+    def _lookup_word(self, word: str) -> Optional[List[str]]:
+        hit = self.terms.get(word)
+        if hit is not None or len(word) <= MIN_AFFIX:
+            return hit
+        # Compound heads and tails, longest first
+        for size in range(len(word) - 1, MIN_AFFIX - 1, -1):
+            hit = self.terms.get(word[:size]) or self.terms.get(word[-size:])
+            if hit is not None:
+                return hit
+        return None
+
+    def expand(self, query: str) -> List[str]:
+        """Expansion terms for the query (terms already in it are skipped)."""
+        words = _WORD_RE.findall(query.lower())
+        seen = set(words)
+        expansions: List[str] = []
+        for n in range(min(MAX_NGRAM, len(words)), 0, -1):
+            for i in range(len(words) - n + 1):
+                key = " ".join(words[i : i + n])
+                hit = self._lookup_word(key) if n == 1 else self.terms.get(key)
+                for term in hit or ():
+                    if term.lower() not in seen:
+                        seen.add(term.lower())
+                        expansions.append(term)
+        return expansions[: self.max_expansions]
+
+    def enhance(self, query: str) -> Dict[str, Any]:
+        """Same result shape as QueryEnhancer.enhance()."""
+        expansions = self.expand(query)
+        variations = [f"{query} {' '.join(expansions)}"] if expansions else []
+        return {
+            "original_query": query,
+            "variations": variations,
+            "hyde_text": "",
+            "sub_queries": [query],
+            "all_queries": [query] + variations,
+            "expansion_terms": expansions,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"terms": len(self.terms)}
+
+
+def rebuild_query_thesaurus(
+    graph_path: Path = Path("data/knowledge_graph.json"),
+    index_path: Path = Path("data/bm25_index.pkl"),
+    thesaurus_path: Path = Path("data/query_thesaurus.json"),
+) -> LocalQueryExpander:
+    """
+    Usage:
+        python -m src.parser.query_expander
+    """
+    from src.parser.bm25_index import BM25Index
+
+    with open(graph_path, "r", encoding="utf-8") as f:
+        graph = nx.node_link_graph(json.load(f))
+    corpus = None
+    if index_path.exists():
+        corpus = BM25Index(graph_path, index_path).tokenized_corpus
+    expander = LocalQueryExpander.build(graph, corpus)
+    expander.save(thesaurus_path)
+    return expander
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    rebuild_query_thesaurus(
+        Path(settings.get("paths.knowledge_graph", "data/knowledge_graph.json")),
+        Path(settings.get("paths.bm25_index", "data/bm25_index.pkl")),
+        Path(settings.get("paths.query_thesaurus", "data/query_thesaurus.json")),
+    )
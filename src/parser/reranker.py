@@ -6,10 +6,21 @@ Uses sentence-transformers library with multilingual cross-encoder models.
 
 Memory: ~120MB (lazy-loaded)
 Latency: ~150ms for 20 pairs
+
+Scores are cached per (query, chunk) and pairs from concurrent requests are
+coalesced into one predict() call (micro-batching), so reranking cost grows
+sublinearly with the request rate.
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, List, Dict, Any, Optional, Tuple
+
+from src.config_loader import settings
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +32,141 @@ except ImportError:
     logger.warning("sentence-transformers not available. Reranking disabled.")
 
 
+Pair = Tuple[str, str]
+
+
+class ScoreCache:
+    """
+    LRU cache of cross-encoder scores keyed by (query, chunk id, chunk text).
+
+    The text hash keeps scores of chunks that were re-parsed under the same id
+    from going stale.
+    """
+
+    def __init__(self, max_entries: int = 20000):
+        self.max_entries = max_entries
+        self._scores: "OrderedDict[Tuple[int, str, int], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(query: str, chunk_id: str, text: str) -> Tuple[int, str, int]:
+        return (hash(query), chunk_id, hash(text))
+
+    def get(self, key: Tuple[int, str, int]) -> Optional[float]:
+        with self._lock:
+            score = self._scores.get(key)
+            if score is None:
+                self.misses += 1
+                return None
+            self._scores.move_to_end(key)
+            self.hits += 1
+            return score
+
+    def put(self, key: Tuple[int, str, int], score: float):
+        with self._lock:
+            self._scores[key] = score
+            self._scores.move_to_end(key)
+            while len(self._scores) > self.max_entries:
+                self._scores.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._scores),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class MicroBatcher:
+    """
+    Coalesces predict() calls from concurrent requests.
+
+    The first request opens a window of window_ms; pairs submitted during the
+    window (up to max_batch) are scored together in one call on a dedicated
+    inference thread. Identical pairs within a batch are scored once.
+
+    Example:
+        >>> batcher = MicroBatcher(model.predict, window_ms=5)
+        >>> scores = batcher.predict([(query, text), ...])  # blocks
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[List[Pair]], List[float]],
+        window_ms: float = 5.0,
+        max_batch: int = 64
+    ):
+        self.predict_fn = predict_fn
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Tuple[List[Pair], Future]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "batches": 0, "pairs": 0, "scored_pairs": 0}
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="rerank-batcher", daemon=True
+                )
+                self._thread.start()
+
+    def predict(self, pairs: List[Pair]) -> List[float]:
+        if not pairs:
+            return []
+        self._ensure_thread()
+        future: Future = Future()
+        self._queue.put((pairs, future))
+        return future.result()
+
+    def _collect(self) -> List[Tuple[List[Pair], Future]]:
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.window
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            unique = list(dict.fromkeys(pair for pairs, _ in batch for pair in pairs))
+            try:
+                scores = dict(zip(unique, self.predict_fn(unique)))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.stats["requests"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["pairs"] += sum(len(pairs) for pairs, _ in batch)
+            self.stats["scored_pairs"] += len(unique)
+            for pairs, future in batch:
+                future.set_result([scores[pair] for pair in pairs])
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats["avg_batch_pairs"] = (
+            round(stats["scored_pairs"] / stats["batches"], 2) if stats["batches"] else 0.0
+        )
+        return stats
+
+
 class Reranker:
     """
     Cross-encoder reranker for German legal text.
@@ -29,6 +175,7 @@ class Reranker:
     - Lazy loading: model loaded only on first use
     - Multilingual cross-encoder optimized for German
     - Batch processing for efficiency
+    - Score cache and micro-batching across concurrent requests
     - Fallback to no-op if sentence-transformers not available
 
     Models:
@@ -52,7 +199,10 @@ class Reranker:
         self,
         model_name: str = "mmarco-mMiniLM-L12",
         max_length: int = 512,
-        device: str = "cpu"
+        device: str = "cpu",
+        cache_size: Optional[int] = None,
+        batch_window_ms: Optional[float] = None,
+        max_batch: Optional[int] = None
     ):
         """
         Initialize reranker with lazy loading.
@@ -61,6 +211,9 @@ class Reranker:
             model_name: Model identifier (see MODELS dict)
             max_length: Max sequence length for cross-encoder
             device: Device to run on ("cpu" or "cuda")
+            cache_size: Cached (query, chunk) scores (0 disables the cache)
+            batch_window_ms: Micro-batching window (0 disables batching)
+            max_batch: Pairs per coalesced predict() call
         """
         if model_name not in self.MODELS:
             raise ValueError(f"Unknown model: {model_name}. Available: {list(self.MODELS.keys())}")
@@ -71,8 +224,28 @@ class Reranker:
         self.device = device
 
         # Lazy loading: model loaded on first rerank() call
-        self.model: Optional[CrossEncoder] = None
+        self.model: Optional["CrossEncoder"] = None
         self.is_initialized = False
+        self._init_lock = threading.Lock()
+
+        if cache_size is None:
+            cache_size = settings.get("reranker.cache_size", 20000)
+        if batch_window_ms is None:
+            batch_window_ms = settings.get("reranker.batch_window_ms", 5)
+        if max_batch is None:
+            max_batch = settings.get("reranker.max_batch", 64)
+        self.score_cache = ScoreCache(cache_size) if cache_size else None
+        self.batcher = (
+            MicroBatcher(self._predict, batch_window_ms, max_batch)
+            if batch_window_ms
+            else None
+        )
+        self.cascade_stats = {
+            "requests": 0,
+            "early_exits": 0,
+            "first_stage_pairs": 0,
+            "full_pairs": 0,
+        }
 
     def _lazy_init(self):
         """
@@ -83,6 +256,11 @@ class Reranker:
         if self.is_initialized:
             return
 
+        with self._init_lock:
+            if not self.is_initialized:
+                self._load()
+
+    def _load(self):
         if not SENTENCE_TRANSFORMERS_AVAILABLE:
             logger.warning("sentence-transformers not available. Reranking will be no-op.")
             self.model = None
@@ -104,6 +282,38 @@ class Reranker:
             self.model = None
             self.is_initialized = True
 
+    def _predict(self, pairs: List[Pair]) -> List[float]:
+        """Scores (query, text) pairs with the model. Backends override this."""
+        return [float(score) for score in self.model.predict(pairs)]
+
+    def score(
+        self,
+        query: str,
+        chunks: List[Dict[str, Any]],
+        text_key: str = "text"
+    ) -> List[float]:
+        """Cross-encoder scores for the chunks (cached, micro-batched)."""
+        texts = [chunk.get(text_key, "") for chunk in chunks]
+        keys = [
+            ScoreCache.key(query, str(chunk.get("id", "")), text)
+            for chunk, text in zip(chunks, texts)
+        ]
+        scores: List[Optional[float]] = [
+            self.score_cache.get(key) if self.score_cache else None for key in keys
+        ]
+
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            pairs = [(query, texts[i]) for i in missing]
+            predicted = (
+                self.batcher.predict(pairs) if self.batcher else self._predict(pairs)
+            )
+            for i, score in zip(missing, predicted):
+                scores[i] = score
+                if self.score_cache:
+                    self.score_cache.put(keys[i], score)
+        return scores
+
     def rerank(
         self,
         query: str,
@@ -136,15 +346,9 @@ class Reranker:
         if not chunks:
             return []
 
-        # Create (query, chunk_text) pairs
         try:
-            pairs = [
-                (query, chunk.get(text_key, ""))
-                for chunk in chunks
-            ]
-
-            # Score all pairs
-            scores = self.model.predict(pairs)
+            # Score all (query, chunk_text) pairs
+            scores = self.score(query, chunks, text_key)
 
             # Combine chunks with scores
             scored_chunks = list(zip(chunks, scores))
@@ -157,6 +361,7 @@ class Reranker:
             for chunk, score in scored_chunks[:top_k]:
                 chunk_copy = chunk.copy()
                 chunk_copy["reranker_score"] = float(score)
+                chunk_copy["rerank_stage"] = "full"
                 reranked.append(chunk_copy)
 
             logger.debug(f"Reranked {len(chunks)} chunks to top {len(reranked)}")
@@ -168,6 +373,101 @@ class Reranker:
             logger.warning("Falling back to original chunks")
             return chunks[:top_k]
 
+    def cascade_rerank(
+        self,
+        query: str,
+        chunks: List[Dict[str, Any]],
+        top_k: int = 10,
+        text_key: str = "text",
+        first_stage_words: Optional[int] = None,
+        margin: Optional[float] = None,
+        head_extra: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Two-stage rerank that skips full-length scoring where it cannot change
+        the result.
+
+        1. All candidates are scored on their first first_stage_words words
+           (a fraction of the cost of the full 512-token pass).
+        2. Leading positions whose score margin to the next candidate is at
+           least `margin` are settled. If the settled run covers top_k, no
+           full-length scoring happens (early exit).
+        3. Otherwise the uncertain head (the next candidates up to
+           top_k + head_extra) is rescored at full length and ranked by those
+           scores; the rest is pruned.
+
+        Each result carries rerank_stage: "first" (finalized by the truncated
+        pass) or "full" (rescored at full length).
+        """
+        self._lazy_init()
+        if not self.model:
+            return chunks[:top_k]
+        if not chunks:
+            return []
+
+        if first_stage_words is None:
+            first_stage_words = settings.get("reranker.cascade.first_stage_words", 96)
+        if margin is None:
+            margin = settings.get("reranker.cascade.margin", 0.15)
+        if head_extra is None:
+            head_extra = settings.get("reranker.cascade.head_extra", 2)
+
+        try:
+            truncated = [
+                {
+                    "id": chunk.get("id", ""),
+                    text_key: " ".join(chunk.get(text_key, "").split()[:first_stage_words])
+                }
+                for chunk in chunks
+            ]
+            first = self.score(query, truncated, text_key)
+            order = sorted(range(len(chunks)), key=lambda i: first[i], reverse=True)
+
+            settled = 0
+            while (
+                settled < min(top_k, len(order) - 1)
+                and first[order[settled]] - first[order[settled + 1]] >= margin
+            ):
+                settled += 1
+            if settled >= len(order) - 1:
+                # The last candidate has nothing left to compete with
+                settled = len(order)
+
+            head = order[settled : top_k + head_extra] if settled < top_k else []
+            full = self.score(query, [chunks[i] for i in head], text_key) if head else []
+
+            ranked = [(i, first[i], "first") for i in order[:settled]]
+            ranked += sorted(
+                ((i, score, "full") for i, score in zip(head, full)),
+                key=lambda x: x[1],
+                reverse=True
+            )
+            finalized = set(order[:settled]) | set(head)
+            ranked += [(i, first[i], "first") for i in order if i not in finalized]
+
+            self.cascade_stats["requests"] += 1
+            self.cascade_stats["early_exits"] += 0 if head else 1
+            self.cascade_stats["first_stage_pairs"] += len(chunks)
+            self.cascade_stats["full_pairs"] += len(head)
+
+            reranked = []
+            for i, score, stage in ranked[:top_k]:
+                chunk_copy = chunks[i].copy()
+                chunk_copy["reranker_score"] = float(score)
+                chunk_copy["rerank_stage"] = stage
+                reranked.append(chunk_copy)
+
+            logger.debug(
+                f"Cascade reranked {len(chunks)} chunks: {settled} settled, "
+                f"{len(head)} rescored at full length"
+            )
+            return reranked
+
+        except Exception as e:
+            logger.error(f"Cascade reranking failed: {e}")
+            logger.warning("Falling back to original chunks")
+            return chunks[:top_k]
+
     def get_stats(self) -> Dict[str, Any]:
         """
         Get reranker statistics.
@@ -183,11 +483,15 @@ class Reranker:
 
         return {
             "status": "ready" if self.model else "disabled",
+            "backend": "torch",
             "model": self.model_name,
             "model_path": self.model_path,
             "max_length": self.max_length,
             "device": self.device,
-            "backend_available": SENTENCE_TRANSFORMERS_AVAILABLE
+            "backend_available": SENTENCE_TRANSFORMERS_AVAILABLE,
+            "score_cache": self.score_cache.get_stats() if self.score_cache else None,
+            "batcher": self.batcher.get_stats() if self.batcher else None,
+            "cascade": dict(self.cascade_stats)
         }
 
 
@@ -208,6 +512,17 @@ class NoOpReranker:
         """Return original chunks, truncated to top_k."""
         return chunks[:top_k]
 
+    def cascade_rerank(
+        self,
+        query: str,
+        chunks: List[Dict[str, Any]],
+        top_k: int = 10,
+        text_key: str = "text",
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """Return original chunks, truncated to top_k."""
+        return chunks[:top_k]
+
     def get_stats(self) -> Dict[str, Any]:
         """Return disabled status."""
         return {
@@ -220,7 +535,9 @@ class NoOpReranker:
 # Factory function
 def create_reranker(
     enabled: bool = True,
-    model_name: str = "mmarco-mMiniLM-L12"
+    model_name: str = "mmarco-mMiniLM-L12",
+    backend: Optional[str] = None,
+    remote: Optional[bool] = None
 ) -> Reranker | NoOpReranker:
     """
     Factory to create reranker instance.
@@ -228,6 +545,10 @@ def create_reranker(
     Args:
         enabled: Whether to enable reranking
         model_name: Model identifier
+        backend: "torch" (sentence-transformers) or "onnx" (int8 ONNX Runtime);
+            default from reranker.backend in settings
+        remote: Score on the shared model server; default: if a model server
+            socket is configured (MODEL_SERVER_SOCKET)
 
     Returns:
         Reranker or NoOpReranker
@@ -236,6 +557,21 @@ def create_reranker(
         logger.info("Reranker disabled via config")
         return NoOpReranker()
 
+    from src.parser.model_server import RemoteReranker, model_server_socket
+
+    if remote is None:
+        remote = bool(model_server_socket())
+    if remote:
+        return RemoteReranker(model_name=model_name)
+
+    backend = backend or settings.get("reranker.backend", "torch")
+    if backend == "onnx":
+        from src.parser.onnx_reranker import ONNX_AVAILABLE, OnnxReranker
+
+        if ONNX_AVAILABLE:
+            return OnnxReranker(model_name=model_name)
+        logger.warning("onnxruntime not available, falling back to torch backend")
+
     if not SENTENCE_TRANSFORMERS_AVAILABLE:
         logger.warning("sentence-transformers not available, using NoOpReranker")
         return NoOpReranker()
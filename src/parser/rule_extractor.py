@@ -1,12 +1,20 @@
+import asyncio
 import json
 import os
+import threading
+import time
 import requests
 import logging
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional
 from dotenv import load_dotenv
+from src.config_loader import settings
 from src.models.schemas import RequirementRuleResult, RequirementRule
-from src.llm import get_llm_provider, BaseLLMProvider
+from src.llm import get_llm_provider, AsyncBaseLLMProvider, BaseLLMProvider
+from src.llm.base_provider import LLMResponse
+from src.llm.http_client import create_session
+from src.parser.rule_store import RuleStore
 
 load_dotenv()
 
@@ -14,7 +22,39 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Shared by single and batched extraction prompts
+RULE_INSTRUCTIONS = """Analysiere Texte aus deutschen Zuwendungsrichtlinien und extrahiere prozessuale Regeln.
+        Suche speziell nach:
+        1. Vergaberechtlichen Schwellenwerten (z.B. Beträge in Euro, ab denen Angebote eingeholt werden müssen).
+        2. Berichtspflichten (Zeitpunkte, Formate für Verwendungsnachweise oder Berichte).
+        3. Definitionen von zuwendungsfähigen Ausgaben (Was darf abgerechnet werden?).
+        4. Formular-Strukturen (Hinweise auf notwendige Anlagen oder spezifische Felder).
+
+        Jede Regel ist ein Objekt mit folgenden Feldern:
+        - "category": (Vergabe, Bericht, Ausgaben, Formular)
+        - "rule": (Kurze Beschreibung der Regel)
+        - "value": (Spezifischer Schwellenwert oder Frist, falls vorhanden)"""
+
+
+class RuleExtractionError(Exception):
+    """Raised in strict mode when no provider produced a valid result."""
+
+    def __init__(self, message: str, answered: bool = False):
+        super().__init__(message)
+        # True if a provider answered but the answer was invalid; False for
+        # transport errors and rate limits
+        self.answered = answered
+
+
 class RuleExtractor:
+    # Status codes that mean "slow down", not "this chunk failed"
+    RETRY_STATUS = (429, 502, 503, 504)
+
+    # Bump when answer_prompt() changes, so cached answers are not reused
+    ANSWER_PROMPT_VERSION = "answer-v1"
+    ANSWER_UNAVAILABLE = "Answer generation unavailable (No LLM Provider configured)."
+    ANSWER_FAILED = "Antwort konnte nicht generiert werden (LLM Fehler)."
+
     def __init__(self, provider: Optional[BaseLLMProvider] = None):
         """
         Initialize RuleExtractor with LLM provider.
@@ -39,17 +79,55 @@ class RuleExtractor:
         self.model = os.getenv("IONOS_MODEL", "openai/gpt-oss-120b")
         self.mistral_api_key = os.getenv("MISTRAL_API_KEY")
 
-    def generate_answer(self, query: str, context: List[str]) -> str:
-        """
-        Generates an answer based on the query and provided context chunks.
+        # One pooled session for all extraction calls (keep-alive across threads)
+        self.session = create_session(settings.get("rules.max_workers", 8))
+        self.max_retries = settings.get("rules.max_retries", 5)
 
-        Uses provider-agnostic LLM abstraction layer.
-        """
-        if not self.provider:
-            return "Answer generation unavailable (No LLM Provider configured)."
+        # Shared backoff: a 429 on one thread pauses all threads
+        self._backoff_until = 0.0
+        self._backoff_lock = threading.Lock()
+        self.usage = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0}
 
+    @staticmethod
+    def _retry_after_seconds(response: requests.Response, attempt: int) -> float:
+        header = response.headers.get("Retry-After")
+        if header:
+            try:
+                return max(0.0, float(header))
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(header).timestamp() - time.time())
+                except Exception:
+                    pass
+        return min(60.0, 2.0 ** attempt)
+
+    def _wait_for_backoff(self):
+        with self._backoff_lock:
+            wait = self._backoff_until - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+    def _post_with_backoff(self, url: str, headers: Dict[str, str], payload: Dict[str, Any]):
+        for attempt in range(self.max_retries):
+            self._wait_for_backoff()
+            response = self.session.post(url, headers=headers, json=payload, timeout=60)
+            if response.status_code not in self.RETRY_STATUS:
+                return response
+
+            delay = self._retry_after_seconds(response, attempt)
+            with self._backoff_lock:
+                self._backoff_until = max(self._backoff_until, time.monotonic() + delay)
+            logger.warning(
+                f"IONOS API returned {response.status_code}, backing off {delay:.1f}s "
+                f"({attempt + 1}/{self.max_retries})"
+            )
+        raise RuleExtractionError(f"Rate limited after {self.max_retries} attempts")
+
+    @staticmethod
+    def answer_prompt(query: str, context: List[str]) -> str:
+        """RAG answer prompt shared by generate_answer() and the streaming endpoints."""
         context_str = "\n\n".join(context)
-        prompt = f"""
+        return f"""
         Du bist ein Experte für deutsche Verwaltungsvorschriften und Nebenbestimmungen (ANBest-P, BNBest-P, AZA, etc.).
         Beantworte die folgende Frage basierend auf den bereitgestellten Kontext-Informationen.
         Der Kontext enthält primäre Textabschnitte sowie verknüpfte Informationen aus dem Knowledge Graph (Markiert mit [REFERENCE] oder [WARNING]).
@@ -67,152 +145,390 @@ class RuleExtractor:
         Antwort (präzise, auf Deutsch, unter Berücksichtigung von Querverweisen):
         """
 
+    def generate_answer(self, query: str, context: List[str]) -> str:
+        """
+        Generates an answer based on the query and provided context chunks.
+
+        Uses provider-agnostic LLM abstraction layer.
+        """
+        if not self.provider:
+            return self.ANSWER_UNAVAILABLE
+
+        prompt = self.answer_prompt(query, context)
+
         try:
             response = self.provider.generate(prompt, max_tokens=500, temperature=0.3)
             return response.content
 
         except Exception as e:
             logger.error(f"LLM generation failed: {e}")
-            return "Antwort konnte nicht generiert werden (LLM Fehler)."
+            return self.ANSWER_FAILED
+
+    async def agenerate(self, prompt: str, **kwargs) -> LLMResponse:
+        """Awaits the provider without blocking the event loop."""
+        if isinstance(self.provider, AsyncBaseLLMProvider):
+            return await self.provider.agenerate(prompt, **kwargs)
+        return await asyncio.to_thread(self.provider.generate, prompt, **kwargs)
+
+    async def agenerate_answer(self, query: str, context: List[str]) -> str:
+        """Async variant of generate_answer() for the API."""
+        if not self.provider:
+            return self.ANSWER_UNAVAILABLE
+
+        try:
+            response = await self.agenerate(
+                self.answer_prompt(query, context), max_tokens=500, temperature=0.3
+            )
+            return response.content
+
+        except Exception as e:
+            logger.error(f"LLM generation failed: {e}")
+            return self.ANSWER_FAILED
+
+    def _ionos_json(self, prompt: str) -> str:
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+        payload = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "response_format": {"type": "json_object"},
+        }
+
+        logger.debug(f"Sending request to IONOS API ({self.model})...")
+        response = self._post_with_backoff(self.api_url, headers, payload)
+        if response.status_code == 401:
+            raise RuleExtractionError(
+                "IONOS API Key Unauthorized (401). Check permissions for the model hub."
+            )
+        response.raise_for_status()
+        result = response.json()
+        self._record_usage(result.get("usage") or {})
+        return result["choices"][0]["message"]["content"]
+
+    def _mistral_json(self, prompt: str) -> str:
+        from mistralai import Mistral
+
+        logger.info("Using Mistral fallback...")
+        client = Mistral(api_key=self.mistral_api_key)
+        response = client.chat.complete(
+            model="mistral-large-latest",
+            messages=[{"role": "user", "content": prompt}],
+            response_format={"type": "json_object"},
+        )
+        content = response.choices[0].message.content
+        if not (content and isinstance(content, str)):
+            raise RuleExtractionError("Mistral returned empty content")
+        return content
+
+    def _record_usage(self, usage: Dict[str, Any]):
+        with self._backoff_lock:
+            self.usage["requests"] += 1
+            self.usage["prompt_tokens"] += usage.get("prompt_tokens", 0) or 0
+            self.usage["completion_tokens"] += usage.get("completion_tokens", 0) or 0
+
+    def _complete_and_parse(self, prompt: str, parse: Callable[[str], Any]) -> Any:
+        """
+        Sends a JSON-mode prompt to IONOS, falling back to Mistral, and returns
+        parse(content) of the first provider whose answer parses.
+        """
+        providers = []
+        if self.api_key:
+            providers.append(("IONOS Extraction", self._ionos_json))
+        if self.mistral_api_key:
+            providers.append(("Mistral Fallback Extraction", self._mistral_json))
+
+        answered = False
+        for name, complete in providers:
+            try:
+                content = complete(prompt)
+            except Exception as e:
+                logger.error(f"{name} failed: {e}")
+                continue
+            answered = True
+            try:
+                return parse(content)
+            except Exception as e:
+                logger.error(f"{name} returned an invalid answer: {e}")
+
+        raise RuleExtractionError("All providers failed.", answered=answered)
 
-    def extract_rules(self, text: str) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _parse_single(content: str) -> List[Dict[str, Any]]:
+        validated = RequirementRuleResult.model_validate_json(content)
+        return [rule.model_dump() for rule in validated.rules]
+
+    def extract_rules(self, text: str, strict: bool = False) -> List[Dict[str, Any]]:
+        """
+        Extracts process rules from a chunk text.
+
+        Args:
+            strict: Raise RuleExtractionError instead of returning [] when all
+                providers fail, so callers can tell "no rules" from "failed".
+        """
         if not self.api_key and not self.mistral_api_key:
+            if strict:
+                raise RuleExtractionError("No API Keys found (IONOS/Mistral).")
             logger.warning("No API Keys found. Skipping LLM extraction.")
             return []
 
         prompt = f"""
-        Analysiere den folgenden Text aus einer deutschen Zuwendungsrichtlinie und extrahiere prozessuale Regeln.
-        Suche speziell nach:
-        1. Vergaberechtlichen Schwellenwerten (z.B. Beträge in Euro, ab denen Angebote eingeholt werden müssen).
-        2. Berichtspflichten (Zeitpunkte, Formate für Verwendungsnachweise oder Berichte).
-        3. Definitionen von zuwendungsfähigen Ausgaben (Was darf abgerechnet werden?).
-        4. Formular-Strukturen (Hinweise auf notwendige Anlagen oder spezifische Felder).
+        {RULE_INSTRUCTIONS}
+
+        Gib die Ergebnisse als JSON-Objekt mit dem Key "rules" (Liste von Regeln) zurück.
 
-        Gib die Ergebnisse als JSON-Liste von Objekten zurück mit dem Key "rules". Jedes Objekt in der Liste muss folgende Felder haben:
-        - "category": (Vergabe, Bericht, Ausgaben, Formular)
-        - "rule": (Kurze Beschreibung der Regel)
-        - "value": (Spezifischer Schwellenwert oder Frist, falls vorhanden)
-        
         Text:
         {text}
         """
 
-        # Try IONOS first
-        if self.api_key:
+        try:
+            return self._complete_and_parse(prompt, self._parse_single)
+        except RuleExtractionError:
+            if strict:
+                raise
+            return []
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        # ~4 characters per token for German prose; good enough for packing
+        return len(text) // 4 + 1
+
+    @classmethod
+    def pack_batches(
+        cls, texts: List[str], token_budget: int, max_chunks: int
+    ) -> List[List[int]]:
+        """Greedily groups text indices so each batch stays within the token budget."""
+        batches: List[List[int]] = []
+        current: List[int] = []
+        used = 0
+        for i, text in enumerate(texts):
+            tokens = cls.estimate_tokens(text)
+            if current and (used + tokens > token_budget or len(current) >= max_chunks):
+                batches.append(current)
+                current, used = [], 0
+            current.append(i)
+            used += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    @staticmethod
+    def _parse_batch(content: str) -> Dict[str, Any]:
+        """Returns {local_id: raw rules payload}; validation happens per chunk."""
+        data = json.loads(content)
+        results = data.get("results", data) if isinstance(data, dict) else data
+        if isinstance(results, dict):
+            return results
+        return {
+            str(item.get("id")): item.get("rules")
+            for item in results
+            if isinstance(item, dict) and "id" in item
+        }
+
+    def extract_rules_batch(
+        self, texts: List[str], strict: bool = False
+    ) -> List[Optional[List[Dict[str, Any]]]]:
+        """
+        Extracts rules for several chunks in one JSON-mode request.
+
+        Chunks are labelled with short local ids (c1, c2, ...). Each chunk's
+        answer is validated on its own through RequirementRuleResult; only
+        chunks with a missing or invalid answer are retried individually. If
+        no provider answered at all (transport error, rate limit), nothing is
+        retried: one request per chunk would only multiply the failure.
+
+        Returns one entry per input text: the rules, or None if extraction
+        failed for that chunk (strict mode) / [] (non-strict mode).
+        """
+        if len(texts) == 1:
             try:
-                headers = {
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                }
-                payload = {
-                    "model": self.model,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "response_format": {"type": "json_object"},
-                }
-
-                logger.info(f"Sending request to IONOS API ({self.model})...")
-                response = requests.post(
-                    self.api_url,
-                    headers=headers,
-                    json=payload,
-                    timeout=60,
-                )
+                return [self.extract_rules(texts[0], strict=strict)]
+            except RuleExtractionError:
+                return [None]
 
-                if response.status_code == 401:
-                    logger.error(
-                        "IONOS API Key Unauthorized (401). Check permissions for the model hub."
-                    )
-                else:
-                    response.raise_for_status()
-                    result = response.json()
-                    content = result["choices"][0]["message"]["content"]
-                    validated = RequirementRuleResult.model_validate_json(content)
-                    return [rule.model_dump() for rule in validated.rules]
-            except Exception as e:
-                logger.error(f"IONOS Extraction failed: {e}")
+        ids = [f"c{i + 1}" for i in range(len(texts))]
+        sections = "\n\n".join(f"[{cid}]\n{text}" for cid, text in zip(ids, texts))
+        prompt = f"""
+        {RULE_INSTRUCTIONS}
 
-        # Try Mistral fallback
-        if self.mistral_api_key:
+        Du erhältst mehrere Textabschnitte, jeweils eingeleitet durch eine ID in eckigen Klammern.
+        Extrahiere die Regeln für jeden Abschnitt getrennt.
+        Gib ein JSON-Objekt mit dem Key "results" zurück: eine Liste mit genau einem Eintrag pro Abschnitt
+        im Format {{"id": "<ID>", "rules": [...]}}. Abschnitte ohne Regeln erhalten "rules": [].
+
+        Abschnitte:
+        {sections}
+        """
+
+        try:
+            answers = self._complete_and_parse(prompt, self._parse_batch)
+        except RuleExtractionError as e:
+            if not e.answered:
+                logger.warning(f"Batch of {len(texts)} failed ({e}), leaving it for the next run.")
+                return [None if strict else [] for _ in texts]
+            answers = {}
+
+        results: List[Optional[List[Dict[str, Any]]]] = []
+        retried = 0
+        for cid, text in zip(ids, texts):
             try:
-                from mistralai import Mistral
-
-                logger.info("Using Mistral fallback...")
-                client = Mistral(api_key=self.mistral_api_key)
-                response = client.chat.complete(
-                    model="mistral-large-latest",
-                    messages=[{"role": "user", "content": prompt}],
-                    response_format={"type": "json_object"},
+                validated = RequirementRuleResult.model_validate(
+                    {"rules": answers[cid]}
                 )
-                content = response.choices[0].message.content
-                if content and isinstance(content, str):
-                    validated = RequirementRuleResult.model_validate_json(content)  # type: ignore
-                    return [rule.model_dump() for rule in validated.rules]
-                return []
-            except Exception as e:
-                logger.error(f"Mistral Fallback Extraction failed: {e}")
+                results.append([rule.model_dump() for rule in validated.rules])
+            except Exception:
+                retried += 1
+                try:
+                    results.append(self.extract_rules(text, strict=strict))
+                except RuleExtractionError:
+                    results.append(None)
 
-        return []
+        if retried:
+            logger.info(f"Batch of {len(texts)}: retried {retried} chunks individually.")
+        return results
 
 
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 
-def process_graph_rules(graph_path: Path):
-    if not graph_path.exists():
-        logger.error(f"Graph file not found: {graph_path}")
-        return
+def _is_chunk(node: Dict[str, Any]) -> bool:
+    return node.get("type") == "chunk" or node.get("node_type") == "chunk"
+
 
+def merge_rules_into_graph(graph_path: Path, store: RuleStore) -> int:
+    """
+    Writes stored rules onto all chunk nodes in one pass. The graph is read
+    fresh so that concurrent graph updates since the extraction started are
+    kept. Returns the number of chunks that received rules.
+    """
     with open(graph_path, "r", encoding="utf-8") as f:
         data = json.load(f)
 
-    extractor = RuleExtractor()
-    nodes = data.get("nodes", [])
+    merged = 0
+    for node in data.get("nodes", []):
+        if not _is_chunk(node):
+            continue
+        rules = store.get(RuleStore.text_hash(node.get("text", "")))
+        if rules is not None:
+            node["rules"] = rules
+            merged += 1
+
+    # Atomic write pattern: the API may reload the graph at any time
+    temp_path = graph_path.with_suffix(".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(temp_path, graph_path)
+    return merged
 
-    chunks_to_process = []
-    for i, node in enumerate(nodes):
-        if node.get("type") == "chunk":
-            if "rules" in node and isinstance(node["rules"], list):
-                continue
-            text = node.get("text", "")
-            if len(text) > 80:
-                chunks_to_process.append(node)
 
-    if not chunks_to_process:
-        logger.info("No new chunks to process.")
-        return
+def process_graph_rules(
+    graph_path: Path,
+    store_path: Optional[Path] = None,
+    max_workers: Optional[int] = None,
+    batch: bool = True,
+):
+    """
+    Extracts rules for all chunks whose text is not in the rule store yet.
 
-    logger.info(
-        f"Starting rule extraction for {len(chunks_to_process)} chunks in {graph_path}"
-    )
+    Results go to the append-only RuleStore as they arrive, so an interrupted
+    run loses at most the requests in flight. Identical texts are extracted
+    once. The graph is written a single time at the end.
 
-    save_interval = 20
-    chunk_count = 0
+    With batch=True several chunks share one request (see extract_rules_batch).
+    """
+    if not graph_path.exists():
+        logger.error(f"Graph file not found: {graph_path}")
+        return
 
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        future_to_node = {
-            executor.submit(extractor.extract_rules, node.get("text", "")): node
-            for node in chunks_to_process
-        }
+    store = RuleStore(
+        store_path or Path(settings.get("paths.rule_store", "data/rule_store.jsonl"))
+    )
+    max_workers = max_workers or settings.get("rules.max_workers", 8)
 
-        for future in as_completed(future_to_node):
-            node = future_to_node[future]
-            try:
-                rules = future.result()
-                node["rules"] = rules
-                chunk_count += 1
-
-                if chunk_count % save_interval == 0:
-                    with open(graph_path, "w", encoding="utf-8") as f:
-                        json.dump(data, f, indent=2, ensure_ascii=False)
-                    logger.info(f"Intermediate save: {chunk_count} chunks processed.")
-            except Exception as e:
-                logger.error(f"Rule extraction for chunk {node['id']} failed: {e}")
+    with open(graph_path, "r", encoding="utf-8") as f:
+        nodes = json.load(f).get("nodes", [])
+
+    # text hash -> text, for texts not extracted yet
+    pending: Dict[str, str] = {}
+    seeded = 0
+    for node in nodes:
+        if not _is_chunk(node):
+            continue
+        text = node.get("text", "")
+        if len(text) <= 80:
+            continue
+        key = RuleStore.text_hash(text)
+        if key in store or key in pending:
+            continue
+        if isinstance(node.get("rules"), list):
+            # Rules extracted before the store existed
+            store.put(key, node["rules"], model="graph")
+            seeded += 1
+            continue
+        pending[key] = text
+    del nodes
+
+    if seeded:
+        logger.info(f"Seeded rule store with {seeded} existing graph results.")
+
+    if pending:
+        extractor = RuleExtractor()
+        keys = list(pending)
+        texts = [pending[key] for key in keys]
+        batches = (
+            RuleExtractor.pack_batches(
+                texts,
+                token_budget=settings.get("rules.batch_token_budget", 6000),
+                max_chunks=settings.get("rules.batch_max_chunks", 12),
+            )
+            if batch
+            else [[i] for i in range(len(texts))]
+        )
+        logger.info(
+            f"Starting rule extraction for {len(pending)} unique chunk texts in "
+            f"{len(batches)} requests ({max_workers} workers, store: {store.path})"
+        )
+
+        done = 0
+        failed = 0
+        next_report = 100
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_batch = {
+                executor.submit(
+                    extractor.extract_rules_batch, [texts[i] for i in indices], True
+                ): indices
+                for indices in batches
+            }
+
+            for future in as_completed(future_to_batch):
+                indices = future_to_batch[future]
+                try:
+                    results = future.result()
+                except Exception as e:
+                    results = [None] * len(indices)
+                    logger.error(f"Rule extraction batch failed: {e}")
+
+                for i, rules in zip(indices, results):
+                    if rules is None:
+                        # Not stored: the next run retries this text
+                        failed += 1
+                        continue
+                    store.put(keys[i], rules, model=extractor.model)
+                    done += 1
+                if done >= next_report:
+                    logger.info(f"Progress: {done}/{len(pending)} chunks extracted.")
+                    next_report = (done // 100 + 1) * 100
+
+        logger.info(
+            f"Extraction finished: {done} extracted, {failed} failed. "
+            f"Token usage: {extractor.usage}"
+        )
+    else:
+        logger.info("No new chunks to process.")
 
-    with open(graph_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    logger.info(
-        f"Full run complete. Updated graph with extracted rules for {chunk_count} additional chunks."
-    )
+    merged = merge_rules_into_graph(graph_path, store)
+    logger.info(f"Merged rules into {merged} chunks of {graph_path}.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,93 @@
+"""
+Append-only store for LLM-extracted rules, keyed by chunk text hash.
+
+Rule extraction is slow and costs tokens, so results are persisted outside the
+graph: one JSON line per extracted chunk text. Keying by the text (not the
+chunk id) means re-chunking or re-numbering documents does not trigger new
+extractions as long as the text itself is unchanged.
+
+Layout:
+    data/rule_store.jsonl
+    {"text_hash": "...", "rules": [...], "model": "...", "extracted_at": "..."}
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RuleStore:
+    """
+    Example:
+        >>> store = RuleStore(Path("data/rule_store.jsonl"))
+        >>> key = RuleStore.text_hash(chunk_text)
+        >>> if key not in store:
+        ...     store.put(key, extractor.extract_rules(chunk_text))
+    """
+
+    def __init__(self, path: Path = Path("data/rule_store.jsonl")):
+        self.path = path
+        self._rules: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        """SHA256 of the whitespace-normalized chunk text."""
+        normalized = re.sub(r"\s+", " ", text).strip()
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        skipped = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn last line after a crash
+                    skipped += 1
+                    continue
+                self._rules[record["text_hash"]] = record.get("rules", [])
+        logger.info(
+            f"RuleStore: Loaded {len(self._rules)} entries from {self.path}"
+            + (f" (skipped {skipped} corrupt lines)" if skipped else "")
+        )
+
+    def __contains__(self, text_hash: str) -> bool:
+        return text_hash in self._rules
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def get(self, text_hash: str) -> Optional[List[Dict[str, Any]]]:
+        return self._rules.get(text_hash)
+
+    def put(
+        self,
+        text_hash: str,
+        rules: List[Dict[str, Any]],
+        model: Optional[str] = None,
+    ):
+        """Appends one result; it is on disk before put() returns."""
+        record = {
+            "text_hash": text_hash,
+            "rules": rules,
+            "model": model,
+            "extracted_at": datetime.now().isoformat(),
+        }
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+            self._rules[text_hash] = rules
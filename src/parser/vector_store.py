@@ -1,8 +1,10 @@
 import json
 import logging
 import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Sequence
 
 try:
     import chromadb
@@ -13,12 +15,18 @@ except Exception:
 
 import requests
 import numpy as np
+from src.config_loader import settings
 from src.parser.embedding_engine import EmbeddingEngine
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def chunk_doc_id(chunk_id: str) -> str:
+    """Document id of a chunk (chunk ids are "{doc_id}_chunk_{n}")."""
+    return chunk_id.split("_chunk_")[0]
+
+
 class RestChromaClient:
     """Minimal REST client to bypass broken chromadb package on Python 3.14"""
 
@@ -113,6 +121,11 @@ class RestCollection:
         resp = requests.post(url, json=payload)
         resp.raise_for_status()
 
+    def delete(self, ids):
+        url = f"{self.client.base_url_v2}/tenants/default_tenant/databases/default_database/collections/{self.id}/delete"
+        resp = requests.post(url, json={"ids": ids})
+        resp.raise_for_status()
+
     def count(self) -> int:
         url = f"{self.client.base_url_v2}/tenants/default_tenant/databases/default_database/collections/{self.id}"
         resp = requests.get(url)
@@ -219,6 +232,11 @@ class LiteCollection:
             }
         self._save()
 
+    def delete(self, ids):
+        removed = [pid for pid in ids if self.data.pop(pid, None) is not None]
+        if removed:
+            self._save()
+
     def query(
         self, query_embeddings, n_results, where=None, where_document=None, include=None
     ):
@@ -269,6 +287,9 @@ class LiteCollection:
                 if "$in" in v:
                     if val not in v["$in"]:
                         return False
+                if "$nin" in v:
+                    if val in v["$nin"]:
+                        return False
             else:
                 # Equality
                 if val != v:
@@ -301,9 +322,76 @@ class LiteChromaClient:
         return LiteCollection(name, self.file_path)
 
 
+class ChunkCache:
+    """
+    In-process LRU of chunk texts and metadata keyed by chunk id, so search
+    never hydrates candidates with one vector-store round trip per chunk.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._chunks: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+
+    def get_many(self, ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        found = {}
+        with self._lock:
+            for chunk_id in ids:
+                chunk = self._chunks.get(chunk_id)
+                if chunk is None:
+                    self.misses += 1
+                    continue
+                self._chunks.move_to_end(chunk_id)
+                self.hits += 1
+                found[chunk_id] = chunk
+        return found
+
+    def put_many(
+        self,
+        ids: Sequence[str],
+        documents: Sequence[Optional[str]],
+        metadatas: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+    ):
+        metadatas = metadatas or [None] * len(ids)
+        with self._lock:
+            for chunk_id, text, metadata in zip(ids, documents, metadatas):
+                if text is None:
+                    continue
+                self._chunks[chunk_id] = {"text": text, "metadata": metadata or {}}
+                self._chunks.move_to_end(chunk_id)
+            while len(self._chunks) > self.max_entries:
+                self._chunks.popitem(last=False)
+
+    def discard(self, ids: Sequence[str]):
+        with self._lock:
+            for chunk_id in ids:
+                self._chunks.pop(chunk_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._chunks.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._chunks),
+                "hits": self.hits,
+                "misses": self.misses,
+                "batched_fetches": self.fetches,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
 class VectorStore:
     def __init__(self, db_path: str = "data/chroma_db"):
         self.embedding_engine = EmbeddingEngine()
+        self.chunk_cache = ChunkCache(
+            settings.get("vector_store.chunk_cache_size", 10000)
+        )
 
         # Check if we should use HTTP client (for Podman/Docker)
         self.host = os.getenv("CHROMA_HOST")
@@ -349,6 +437,51 @@ class VectorStore:
             name="chunks", metadata={"hnsw:space": "cosine"}
         )
 
+    def remember_chunks(self, query_results: Dict[str, Any]):
+        """Caches the documents returned by collection.query() (first query only)."""
+        ids = (query_results.get("ids") or [[]])[0]
+        documents = (query_results.get("documents") or [[]])[0]
+        metadatas = (query_results.get("metadatas") or [[]])[0]
+        if ids and documents:
+            self.chunk_cache.put_many(ids, documents, metadatas or None)
+
+    def get_chunks(self, ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Text and metadata of the given chunks: cached ones from memory, the
+        rest with a single batched get(). Chunks that cannot be fetched are
+        missing from the result.
+        """
+        found = self.chunk_cache.get_many(ids)
+        missing = [chunk_id for chunk_id in dict.fromkeys(ids) if chunk_id not in found]
+        if not missing:
+            return found
+
+        try:
+            result = self.collection.get(ids=missing) or {}
+        except Exception as e:
+            logger.warning(f"Fetching {len(missing)} chunks from vector store failed: {e}")
+            return found
+        self.chunk_cache.fetches += 1
+
+        fetched_ids = result.get("ids") or []
+        documents = result.get("documents") or [None] * len(fetched_ids)
+        metadatas = result.get("metadatas") or [None] * len(fetched_ids)
+        self.chunk_cache.put_many(fetched_ids, documents, metadatas)
+        for chunk_id, text, metadata in zip(fetched_ids, documents, metadatas):
+            if text is not None:
+                found[chunk_id] = {"text": text, "metadata": metadata or {}}
+        return found
+
+    def delete_chunks(self, ids: List[str]):
+        """Removes chunk embeddings, e.g. of a document that changed upstream."""
+        if not ids:
+            return
+        self.chunk_cache.discard(ids)
+        batch_size = 500
+        for i in range(0, len(ids), batch_size):
+            self.collection.delete(ids=ids[i : i + batch_size])
+        logger.info(f"Removed {len(ids)} stale chunks from vector store.")
+
     def add_chunks_from_graph(self, graph_path: Path):
         if not graph_path.exists():
             logger.error(f"Graph file not found: {graph_path}")
@@ -382,7 +515,7 @@ class VectorStore:
 
             for n in batch:
                 meta = {
-                    "doc_id": n["id"].split("_chunk_")[0],
+                    "doc_id": chunk_doc_id(n["id"]),
                     "context": n.get("context", ""),
                 }
                 metadatas.append(meta)
@@ -0,0 +1,579 @@
+"""
+Streaming ingest pipeline: crawl -> parse -> graph -> embed -> index.
+
+Instead of running crawl, parse, vector indexing and BM25 rebuild as separate
+batch steps, documents flow through bounded queues between stage threads:
+
+    source   follows the crawler manifests (ManifestJournal.tail), optionally
+             while EasyCrawler is still crawling in a background thread
+    parse    Docling parse (cached) + citation extraction
+    graph    GraphBuilder update + incremental reference edges
+    embed    chunk embeddings in batches
+    index    vector upsert + incremental BM25, checkpoint per document
+
+Bounded queues give back-pressure: a slow embedding API throttles parsing
+instead of piling up parsed documents in memory. Each stage records metrics;
+finished documents are checkpointed in data/pipeline_state.json so a restart
+only processes what is still missing.
+
+Usage:
+    python -m src.streaming_pipeline                # ingest existing manifests
+    python -m src.streaming_pipeline --crawl --all  # crawl + ingest concurrently
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from src.config_loader import settings
+from src.discovery.manifest_journal import ManifestJournal
+from src.graph.graph_builder import GraphBuilder
+from src.models.ministry_registry import MinistryRegistry
+from src.main_pipeline import document_metadata, parse_chunks, resolve_pdf_path
+from src.parser.bm25_index import BM25Index
+from src.parser.docling_engine import DoclingEngine
+from src.parser.parse_cache import ParseCache
+from src.parser.query_expander import LocalQueryExpander
+from src.parser.vector_store import VectorStore
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+# End-of-stream marker passed down the queues
+_DONE = object()
+
+
+@dataclass
+class DocumentItem:
+    """A document travelling through the pipeline."""
+
+    raw_dir: Path
+    ministerium: str
+    nr: str
+    file_info: Dict[str, Any]
+    chunks: List[Dict[str, Any]] = field(default_factory=list)
+    chunk_ids: List[str] = field(default_factory=list)
+    embeddings: List[List[float]] = field(default_factory=list)
+    stale_chunk_ids: List[str] = field(default_factory=list)
+    # Document already in the graph with this hash: skip parsing, only index
+    reuse_graph: bool = False
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class StageMetrics:
+    """Thread-safe counters for one pipeline stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.processed = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, error: bool = False):
+        with self._lock:
+            self.busy_seconds += seconds
+            if error:
+                self.errors += 1
+            else:
+                self.processed += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "processed": self.processed,
+                "errors": self.errors,
+                "busy_seconds": round(self.busy_seconds, 2),
+                "avg_seconds": round(self.busy_seconds / self.processed, 3)
+                if self.processed
+                else 0.0,
+            }
+
+
+class Stage:
+    """
+    Worker threads consuming one queue and feeding the next.
+
+    handler(item) returns the item to pass on, or None to drop it. An optional
+    on_idle callback runs whenever no item arrived for idle_timeout seconds
+    and once more before the end-of-stream marker is forwarded.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[DocumentItem], Optional[DocumentItem]],
+        in_queue: queue.Queue,
+        out_queue: Optional[queue.Queue],
+        workers: int = 1,
+        on_idle: Optional[Callable[[], None]] = None,
+        idle_timeout: float = 5.0,
+    ):
+        self.name = name
+        self.handler = handler
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+        self.workers = max(1, workers)
+        self.on_idle = on_idle
+        self.idle_timeout = idle_timeout
+        self.metrics = StageMetrics(name)
+        self._active = self.workers
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f"{self.name}-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def join(self):
+        for thread in self._threads:
+            thread.join()
+
+    def _work(self):
+        while True:
+            try:
+                item = self.in_queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                if self.on_idle:
+                    self.on_idle()
+                continue
+
+            if item is _DONE:
+                break
+
+            start = time.monotonic()
+            try:
+                result = self.handler(item)
+                self.metrics.record(time.monotonic() - start)
+            except Exception as e:
+                self.metrics.record(time.monotonic() - start, error=True)
+                logger.error(f"[{self.name}] {item.nr} failed: {e}")
+                continue
+
+            if result is not None and self.out_queue is not None:
+                self.out_queue.put(result)
+
+        with self._lock:
+            self._active -= 1
+            last = self._active == 0
+        if not last:
+            # Let sibling workers see the marker too
+            self.in_queue.put(_DONE)
+        else:
+            if self.on_idle:
+                self.on_idle()
+            if self.out_queue is not None:
+                self.out_queue.put(_DONE)
+
+
+class PipelineState:
+    """Resume checkpoint: content hash of every fully indexed document."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.documents: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        if path.exists():
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.documents = json.load(f).get("documents", {})
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable pipeline state {path}: {e}")
+
+    @staticmethod
+    def key(ministerium: str, nr: str) -> str:
+        return f"{ministerium}:{nr}"
+
+    def is_done(self, ministerium: str, nr: str, file_hash: str) -> bool:
+        with self._lock:
+            return self.documents.get(self.key(ministerium, nr)) == file_hash
+
+    def mark_done(self, ministerium: str, nr: str, file_hash: str):
+        with self._lock:
+            self.documents[self.key(ministerium, nr)] = file_hash
+
+    def save(self, metrics: Dict[str, Any]):
+        with self._lock:
+            payload = {
+                "updated_at": datetime.now().isoformat(),
+                "documents": dict(self.documents),
+                "metrics": metrics,
+            }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+
+
+class StreamingPipeline:
+    """
+    Orchestrates the stage threads.
+
+    Example:
+        >>> pipeline = StreamingPipeline()
+        >>> pipeline.run(crawl=True, ministries=["bmwe"])
+    """
+
+    def __init__(
+        self,
+        raw_dir: Optional[Path] = None,
+        graph_path: Optional[Path] = None,
+        bm25_path: Optional[Path] = None,
+        state_path: Optional[Path] = None,
+    ):
+        self.raw_dir = raw_dir or Path(settings.get("paths.raw_data", "data/raw"))
+        self.graph_path = graph_path or Path(
+            settings.get("paths.knowledge_graph", "data/knowledge_graph.json")
+        )
+        self.bm25_path = bm25_path or Path(
+            settings.get("paths.bm25_index", "data/bm25_index.pkl")
+        )
+        self.thesaurus_path = Path(
+            settings.get("paths.query_thesaurus", "data/query_thesaurus.json")
+        )
+        self.state = PipelineState(
+            state_path
+            or Path(settings.get("paths.pipeline_state", "data/pipeline_state.json"))
+        )
+
+        self.queue_size = settings.get("pipeline.queue_size", 16)
+        self.parse_workers = settings.get("pipeline.parse_workers", 1)
+        self.embed_workers = settings.get("pipeline.embed_workers", 2)
+        self.embed_batch_size = settings.get("pipeline.embed_batch_size", 50)
+        self.flush_interval = settings.get("pipeline.flush_interval_seconds", 60)
+        self.poll_interval = settings.get("pipeline.poll_interval_seconds", 2.0)
+
+        self.engine = DoclingEngine(
+            cache=ParseCache(
+                Path(settings.get("paths.parse_cache", "data/parse_cache"))
+            )
+        )
+        self.builder = GraphBuilder()
+        self.builder.load_graph(self.graph_path)
+        self.store = VectorStore(settings.get("paths.chroma_db", "data/chroma_db"))
+        self.bm25 = BM25Index(self.graph_path, self.bm25_path, allow_empty=True)
+
+        # The graph stage mutates the builder while the index stage saves it
+        self._graph_lock = threading.Lock()
+        # Guards BM25 and pending checkpoints (re-entrant: _index may flush)
+        self._flush_lock = threading.RLock()
+        self._pending_done: List[DocumentItem] = []
+        self._graph_dirty = False
+        self._bm25_dirty = False
+        self._last_flush = time.monotonic()
+        self.latencies: List[float] = []
+        self.stages: List[Stage] = []
+
+    # --- Source -----------------------------------------------------------
+
+    def _manifest_dirs(self, ministries: Optional[List[str]]) -> List[Path]:
+        if ministries:
+            return [
+                self.raw_dir / MinistryRegistry.get_canonical_name(m).lower()
+                for m in ministries
+            ]
+        if not self.raw_dir.exists():
+            return []
+        return sorted(d for d in self.raw_dir.iterdir() if d.is_dir())
+
+    def _follow_manifest(
+        self,
+        raw_dir: Path,
+        out_queue: queue.Queue,
+        crawl_done: Optional[threading.Event],
+    ):
+        """Source: feeds new/changed entries of one ministry into the parse queue."""
+        journal = ManifestJournal(raw_dir)
+        ministerium = None
+        stop = crawl_done.is_set if crawl_done else None
+
+        for nr, entry in journal.tail(poll_interval=self.poll_interval, stop=stop):
+            if not entry.get("filename", "").endswith(".pdf"):
+                continue
+            if ministerium is None:
+                # The journal's run marker names the ministry before any file entry.
+                # Read-only: the crawler owns the journal and may be appending.
+                ministerium = journal.load(repair=False).get("ministerium", "unbekannt")
+            if self.state.is_done(ministerium, nr, entry["hash"]):
+                continue
+            out_queue.put(DocumentItem(raw_dir, ministerium, nr, entry))
+
+    # --- Stage handlers -----------------------------------------------------
+
+    def _known_hash(self, nr: str) -> Optional[str]:
+        with self._graph_lock:
+            if nr in self.builder.graph:
+                return self.builder.graph.nodes[nr].get("hash")
+        return None
+
+    def _parse(self, item: DocumentItem) -> Optional[DocumentItem]:
+        file_hash = item.file_info["hash"]
+        if self._known_hash(item.nr) == file_hash:
+            # Already in the graph (e.g. built by main_pipeline); only indexes may lag
+            item.reuse_graph = True
+            return item
+
+        pdf_path = resolve_pdf_path(item.raw_dir, item.file_info)
+        if pdf_path is None:
+            return None
+        item.chunks = parse_chunks(self.engine, pdf_path, file_hash)
+        return item
+
+    def _update_graph(self, item: DocumentItem) -> DocumentItem:
+        nr = item.nr
+        with self._graph_lock:
+            if item.reuse_graph:
+                self.builder.add_document(
+                    nr, document_metadata(item.file_info, item.ministerium)
+                )
+                graph = self.builder.graph
+                item.chunk_ids = [
+                    v
+                    for _, v, d in graph.out_edges(nr, data=True)
+                    if d.get("relation") == "HAS_CHUNK"
+                ]
+                item.chunks = [graph.nodes[cid] for cid in item.chunk_ids]
+            else:
+                item.stale_chunk_ids = self.builder.remove_chunks(nr)
+                self.builder.add_document(
+                    nr, document_metadata(item.file_info, item.ministerium)
+                )
+                item.chunk_ids = [f"{nr}_chunk_{i}" for i in range(len(item.chunks))]
+                for chunk_id, chunk in zip(item.chunk_ids, item.chunks):
+                    self.builder.add_chunk(nr, chunk_id, chunk)
+            self.builder.create_reference_edges()
+            self._graph_dirty = True
+        return item
+
+    def _embed(self, item: DocumentItem) -> DocumentItem:
+        if item.reuse_graph and item.chunk_ids:
+            existing = self.store.collection.get(ids=item.chunk_ids)
+            if len(existing.get("ids", [])) == len(item.chunk_ids):
+                item.embeddings = []
+                return item
+
+        texts = [chunk.get("text", "") for chunk in item.chunks]
+        item.embeddings = []
+        for i in range(0, len(texts), self.embed_batch_size):
+            batch = texts[i : i + self.embed_batch_size]
+            item.embeddings.extend(self.store.embedding_engine.get_embeddings(batch))
+        return item
+
+    def _index(self, item: DocumentItem) -> DocumentItem:
+        if item.stale_chunk_ids:
+            self.store.delete_chunks(item.stale_chunk_ids)
+
+        if item.embeddings:
+            self.store.collection.upsert(
+                ids=item.chunk_ids,
+                embeddings=item.embeddings,
+                documents=[chunk.get("text", "") for chunk in item.chunks],
+                metadatas=[
+                    {"doc_id": item.nr, "context": chunk.get("context", "")}
+                    for chunk in item.chunks
+                ],
+            )
+
+        with self._flush_lock:
+            if item.stale_chunk_ids:
+                self.bm25.remove_documents(item.stale_chunk_ids, refresh=False)
+            indexed = set(self.bm25.chunk_ids) if item.reuse_graph else set()
+            new_ids = [cid for cid in item.chunk_ids if cid not in indexed]
+            if new_ids:
+                texts = {cid: c.get("text", "") for cid, c in zip(item.chunk_ids, item.chunks)}
+                self.bm25.add_documents(
+                    new_ids, [texts[cid] for cid in new_ids], refresh=False
+                )
+            self._bm25_dirty = self._bm25_dirty or bool(new_ids or item.stale_chunk_ids)
+            self._pending_done.append(item)
+
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self._flush()
+        return item
+
+    # --- Checkpointing ------------------------------------------------------
+
+    def _flush(self):
+        """
+        Persists graph, BM25 and the resume checkpoint, in that order. Documents
+        are only checkpointed once everything they touched is on disk.
+        """
+        with self._flush_lock:
+            if not (self._pending_done or self._graph_dirty or self._bm25_dirty):
+                return
+            pending, self._pending_done = self._pending_done, []
+            with self._graph_lock:
+                if self._graph_dirty:
+                    self.builder.save_graph(self.graph_path)
+                    self._graph_dirty = False
+            if self._bm25_dirty:
+                self.bm25.refresh()
+                self.bm25.save()
+                self._bm25_dirty = False
+
+            now = time.monotonic()
+            for item in pending:
+                self.state.mark_done(item.ministerium, item.nr, item.file_info["hash"])
+                self.latencies.append(now - item.enqueued_at)
+            self.state.save(self.metrics())
+            self._last_flush = now
+
+        if pending:
+            logger.info(
+                f"Checkpoint: {len(pending)} documents searchable "
+                f"({self.bm25.get_stats().get('num_chunks', 0)} chunks in BM25)"
+            )
+
+    def _build_thesaurus(self):
+        """Rebuilds the query thesaurus if the graph changed since the last one."""
+        if (
+            self.thesaurus_path.exists()
+            and self.graph_path.exists()
+            and self.thesaurus_path.stat().st_mtime >= self.graph_path.stat().st_mtime
+        ):
+            return
+        start = time.monotonic()
+        with self._graph_lock, self._flush_lock:
+            expander = LocalQueryExpander.build(
+                self.builder.graph, self.bm25.tokenized_corpus
+            )
+        expander.save(self.thesaurus_path)
+        logger.info(f"Query thesaurus rebuilt in {time.monotonic() - start:.1f}s")
+
+    def metrics(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            stage.name: {**stage.metrics.to_dict(), "queued": stage.in_queue.qsize()}
+            for stage in self.stages
+        }
+        if self.latencies:
+            stats["end_to_end_seconds"] = {
+                "avg": round(sum(self.latencies) / len(self.latencies), 2),
+                "max": round(max(self.latencies), 2),
+            }
+        return stats
+
+    # --- Orchestration ------------------------------------------------------
+
+    def _crawl(
+        self, ministries: Optional[List[str]], limit_per_cat: Optional[int], done: threading.Event
+    ):
+        from src.discovery.easy_crawler import EasyCrawler
+
+        output_dir = self.raw_dir.parent
+        try:
+            if ministries:
+                for ministry in ministries:
+                    crawler = EasyCrawler(
+                        output_dir, ministerium=ministry, limit_per_cat=limit_per_cat
+                    )
+                    asyncio.run(crawler.run())
+            else:
+                asyncio.run(
+                    EasyCrawler.crawl_all(output_dir, limit_per_cat=limit_per_cat)
+                )
+        except Exception as e:
+            logger.error(f"Crawl failed: {e}")
+        finally:
+            done.set()
+
+    def run(
+        self,
+        crawl: bool = False,
+        ministries: Optional[List[str]] = None,
+        limit_per_cat: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Runs all stages until the sources are exhausted; returns the metrics."""
+        parse_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        graph_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        embed_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        index_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        self.stages = [
+            Stage("parse", self._parse, parse_q, graph_q, workers=self.parse_workers),
+            Stage("graph", self._update_graph, graph_q, embed_q),
+            Stage("embed", self._embed, embed_q, index_q, workers=self.embed_workers),
+            Stage("index", self._index, index_q, None, on_idle=self._flush),
+        ]
+        for stage in self.stages:
+            stage.start()
+
+        crawl_done = None
+        crawl_thread = None
+        if crawl:
+            from src.discovery.easy_crawler import EasyCrawler
+
+            crawl_done = threading.Event()
+            crawl_thread = threading.Thread(
+                target=self._crawl,
+                args=(ministries, limit_per_cat, crawl_done),
+                name="crawl",
+                daemon=True,
+            )
+            crawl_thread.start()
+            dirs = self._manifest_dirs(ministries or EasyCrawler.KNOWN_MINISTRIES)
+        else:
+            dirs = self._manifest_dirs(ministries)
+
+        sources = [
+            threading.Thread(
+                target=self._follow_manifest,
+                args=(raw_dir, parse_q, crawl_done),
+                name=f"source-{raw_dir.name}",
+                daemon=True,
+            )
+            for raw_dir in dirs
+        ]
+        for source in sources:
+            source.start()
+        for source in sources:
+            source.join()
+        if crawl_thread:
+            crawl_thread.join()
+
+        parse_q.put(_DONE)
+        for stage in self.stages:
+            stage.join()
+        self._build_thesaurus()
+
+        metrics = self.metrics()
+        logger.info(f"Pipeline finished: {json.dumps(metrics)}")
+        return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming ingest pipeline")
+    parser.add_argument(
+        "--crawl", action="store_true", help="Crawl Easy-Online while ingesting"
+    )
+    parser.add_argument(
+        "--ministry",
+        action="append",
+        default=None,
+        help="Restrict to a ministry (repeatable); default: all",
+    )
+    parser.add_argument(
+        "--limit", type=int, default=None, help="Limit files per category (crawl)"
+    )
+    args = parser.parse_args()
+
+    StreamingPipeline().run(
+        crawl=args.crawl, ministries=args.ministry, limit_per_cat=args.limit
+    )
+
+
+if __name__ == "__main__":
+    main()